@@ -0,0 +1,211 @@
+"""Benchmark every pipeline stage on synthetic scale-up datasets.
+
+Stages timed (best of --repeat, stdout of the stage suppressed):
+
+  margins        build_presidential_margins.main on the synthetic input
+  flip.analyze   build_flip_results.analyze_year over every year
+  flip.knapsack  build_flip_results.compute_knapsack, classic mode of the last year
+  flip.kbest     build_flip_results.compute_kbest_tables (k-best + Pareto) over every year
+  stops          build_stop_colors.build_stop_rows
+  tables         site_builder.tables.render_table, one table per unit (like the pages)
+  ranker         site_builder.ranker.build_payload (STATE_FILTER widened to the synthetic units)
+  plot1/2/3      do_all_plots._build_plot1 / _build_plot2 / _build_plot3_two_party for one unit
+
+Each run is appended to benchmarks/history.json with the git commit, so scaling
+curves (units x years) and regressions are visible over time. --check compares
+against the median of earlier runs for the same stage/level/years and exits
+non-zero when a stage got slower than --threshold.
+
+Run:
+  python benchmarks/run_benchmarks.py [--levels states,districts] [--years 7,28] [--repeat 3] [--check]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import synthetic  # noqa: E402
+
+HISTORY = os.path.join(ROOT, "benchmarks", "history.json")
+STAGES = ["margins", "flip.analyze", "flip.knapsack", "flip.kbest", "stops", "tables", "ranker", "plot1", "plot2", "plot3"]
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def bench_dataset(level, n_years, stages, repeat, workdir):
+    """Time the requested stages on one synthetic dataset; returns {stage: seconds}."""
+    import build_presidential_margins
+    import build_flip_results
+    import build_stop_colors
+    from site_builder import tables, ranker
+    from site_builder.io_utils import read_csv
+
+    rows = synthetic.generate(level, n_years)
+    infile = os.path.join(workdir, f"{level}_{n_years}_input.csv")
+    outfile = os.path.join(workdir, f"{level}_{n_years}_margins.csv")
+    synthetic.write_rows(rows, infile)
+    missing_old = os.path.join(workdir, "no_old_margins.csv")
+
+    def margins():
+        build_presidential_margins.main(validate=False, infile=infile, outfile=outfile, old_margins=missing_old)
+
+    # later stages consume the margins output
+    with contextlib.redirect_stdout(io.StringIO()):
+        margins()
+    results = {}
+    if "margins" in stages:
+        results["margins"] = best_of(margins, repeat)
+
+    by_year = build_flip_results.group_by_year(build_flip_results.load_rows(outfile))
+    if "flip.analyze" in stages:
+        results["flip.analyze"] = best_of(lambda: [build_flip_results.analyze_year(by_year[y]) for y in sorted(by_year)], repeat)
+    if "flip.knapsack" in stages:
+        last = by_year[max(by_year)]
+        res = build_flip_results.analyze_year(last)
+        units = [r for r in last if r.party_win != res["runner_party"] and r.electoral_votes > 0]
+        target = max(0, res["need"] - res["runner_ev"])
+        results["flip.knapsack"] = best_of(lambda: build_flip_results.compute_knapsack(units, target), repeat)
+    if "flip.kbest" in stages:
+        flip_rows = [r for y in sorted(by_year) for r in by_year[y]]
+        results["flip.kbest"] = best_of(lambda: build_flip_results.compute_kbest_tables(flip_rows), repeat)
+
+    if "stops" in stages:
+        margin_rows = build_stop_colors.load_margins([outfile])
+        results["stops"] = best_of(lambda: build_stop_colors.build_stop_rows(margin_rows), repeat)
+
+    site_rows = read_csv(__import__("pathlib").Path(outfile))
+    if "tables" in stages:
+        basic_cols, _, _ = tables.split_columns_into_three(list(site_rows[0].keys()))
+        grouped = tables.group_by_abbr(site_rows)
+        results["tables"] = best_of(lambda: [tables.render_table(g, basic_cols) for g in grouped.values()], repeat)
+    if "ranker" in stages:
+        saved = ranker.STATE_FILTER
+        ranker.STATE_FILTER = {r["abbr"] for r in site_rows}
+        try:
+            results["ranker"] = best_of(lambda: ranker.build_payload(site_rows), repeat)
+        finally:
+            ranker.STATE_FILTER = saved
+
+    plot_stages = [s for s in ("plot1", "plot2", "plot3") if s in stages]
+    if plot_stages:
+        import matplotlib
+        matplotlib.use("Agg")
+        import pandas as pd
+        import do_all_plots
+        df = pd.read_csv(outfile)
+        unit = next(a for a in df["abbr"].unique() if a != "NATIONAL")
+        unit_df = df[df["abbr"] == unit].copy()
+        plot_dir = os.path.join(workdir, "plots")
+        os.makedirs(plot_dir, exist_ok=True)
+        builders = {
+            "plot1": lambda: do_all_plots._build_plot1(unit, unit_df, plot_dir),
+            "plot2": lambda: do_all_plots._build_plot2(unit, unit_df, plot_dir),
+            "plot3": lambda: do_all_plots._build_plot3_two_party(unit, unit_df, plot_dir),
+        }
+        for s in plot_stages:
+            results[s] = best_of(builders[s], repeat)
+
+    return len(rows), results
+
+
+def load_history(path=HISTORY):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def baseline(history, stage, level, n_years, window=5):
+    """Median of the last `window` recorded timings for a stage/level/years."""
+    times = [r["seconds"] for run in history for r in run["results"]
+             if r["stage"] == stage and r["level"] == level and r["years"] == n_years]
+    return statistics.median(times[-window:]) if times else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pipeline stages on synthetic scale-up data")
+    parser.add_argument("--levels", default="states,districts", help=f"Comma-separated levels from {list(synthetic.LEVELS)}")
+    parser.add_argument("--years", default="7,28", help="Comma-separated year counts")
+    parser.add_argument("--stages", default=",".join(STAGES), help="Comma-separated stages to run")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage; the best time is recorded")
+    parser.add_argument("--history", default=HISTORY, help="JSON history file to append to")
+    parser.add_argument("--no-save", action="store_true", help="Don't append this run to the history")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if any stage is slower than --threshold x its baseline")
+    parser.add_argument("--threshold", type=float, default=1.3, help="Regression threshold vs. median of earlier runs")
+    args = parser.parse_args()
+
+    levels = [l.strip() for l in args.levels.split(",") if l.strip()]
+    years = [int(y) for y in args.years.split(",") if y.strip()]
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    history = load_history(args.history)
+
+    results = []
+    regressions = []
+    print(f"{'stage':<14} {'level':<10} {'units':>6} {'years':>5} {'rows':>8} {'seconds':>10} {'vs base':>8}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for level in levels:
+            for n_years in years:
+                n_rows, timings = bench_dataset(level, n_years, stages, args.repeat, workdir)
+                for stage in stages:
+                    if stage not in timings:
+                        continue
+                    secs = timings[stage]
+                    base = baseline(history, stage, level, n_years)
+                    ratio = secs / base if base else None
+                    results.append({"stage": stage, "level": level, "units": synthetic.LEVELS[level],
+                                    "years": n_years, "rows": n_rows, "seconds": secs})
+                    if ratio and ratio > args.threshold:
+                        regressions.append((stage, level, n_years, ratio))
+                    print(f"{stage:<14} {level:<10} {synthetic.LEVELS[level]:>6} {n_years:>5} {n_rows:>8} "
+                          f"{secs:>10.4f} {f'{ratio:.2f}x' if ratio else '-':>8}")
+
+    if not args.no_save:
+        history.append({
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "repeat": args.repeat,
+            "results": results,
+        })
+        with open(args.history, "w", encoding="utf-8") as f:
+            json.dump(history, f, indent=1)
+        print(f"Appended run to {args.history}")
+
+    if regressions:
+        print("⚠️  Regressions:")
+        for stage, level, n_years, ratio in regressions:
+            print(f"  {stage} @ {level}/{n_years}y: {ratio:.2f}x baseline")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
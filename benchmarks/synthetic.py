@@ -0,0 +1,135 @@
+"""Synthetic scale-up datasets for the pipeline benchmarks.
+
+Generates rows in the build_presidential_margins.py input schema
+(year,abbr,D_votes,R_votes,T_votes,total_votes,electoral_votes plus a NATIONAL row per
+year) at a chosen unit granularity and number of years.
+
+Margins are drawn from the real presidential_margins.csv so the distribution stays
+realistic: each unit gets a persistent lean sampled from the real relative margins,
+each year adds the real national margin for a cycle plus cycle-to-cycle noise, and
+third-party shares are resampled from the real shares. Vote totals are lognormal and
+scaled so the national total stays near a real one regardless of unit count.
+
+Electoral votes: every unit gets 1, and the rest of max(538, n_units) is spread in
+proportion to votes, so the knapsack grows with the unit count as it would with a
+finer-grained map.
+"""
+import csv
+import os
+
+import numpy as np
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REFERENCE_CSV = os.path.join(ROOT, "presidential_margins.csv")
+
+STATES = [
+    "AL", "AK", "AZ", "AR", "CA", "CO", "CT", "DE", "DC", "FL", "GA", "HI", "ID", "IL", "IN",
+    "IA", "KS", "KY", "LA", "ME", "MD", "MA", "MI", "MN", "MS", "MO", "MT", "NE", "NV", "NH",
+    "NJ", "NM", "NY", "NC", "ND", "OH", "OK", "OR", "PA", "RI", "SC", "SD", "TN", "TX", "UT",
+    "VT", "VA", "WA", "WV", "WI", "WY",
+]
+
+# units per level, roughly the real counts
+LEVELS = {
+    "states": 51,
+    "districts": 436,
+    "counties": 3143,
+}
+
+FIELDS = ["year", "abbr", "D_votes", "R_votes", "T_votes", "total_votes", "electoral_votes"]
+
+
+def load_reference(path=REFERENCE_CSV):
+    """Real distributions: national margin per year, pooled relative margins and third-party shares."""
+    national = {}
+    relative = []
+    third = []
+    totals = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for r in csv.DictReader(f):
+            year = int(r["year"])
+            if r["abbr"] == "NATIONAL":
+                national[year] = float(r["pres_margin"])
+                totals[year] = int(r["total_votes"])
+            elif "-0" not in r["abbr"]:
+                relative.append(float(r["relative_margin"]))
+                third.append(float(r["third_party_share"]))
+    years = sorted(national)
+    return {
+        "national": np.array([national[y] for y in years]),
+        "national_totals": np.array([totals[y] for y in years], dtype=float),
+        "relative": np.array(relative),
+        "third": np.array(third),
+    }
+
+
+def unit_names(level, n_units):
+    if level == "states" and n_units <= len(STATES):
+        return STATES[:n_units]
+    per_state = -(-n_units // len(STATES))
+    tag = "C" if level == "counties" else ""
+    width = 3 if level == "counties" else 2
+    names = [f"{st}-{tag}{k:0{width}d}" for st in STATES for k in range(1, per_state + 1)]
+    return names[:n_units]
+
+
+def allocate_ev(weights, total_ev):
+    """1 EV per unit, remainder by largest remainder on weights."""
+    n = len(weights)
+    extra = max(0, total_ev - n)
+    share = weights / weights.sum() * extra
+    ev = np.floor(share).astype(int)
+    short = extra - ev.sum()
+    if short > 0:
+        ev[np.argsort(-(share - ev), kind="stable")[:short]] += 1
+    return ev + 1
+
+
+def generate(level="states", n_years=28, n_units=None, seed=0, reference=None):
+    """Return a list of input rows (dicts) for n_units units over n_years cycles."""
+    rng = np.random.default_rng(seed)
+    ref = reference or load_reference()
+    n_units = n_units or LEVELS[level]
+    names = unit_names(level, n_units)
+
+    lean = rng.choice(ref["relative"], size=n_units)
+    size = rng.lognormal(mean=0.0, sigma=0.9, size=n_units)
+    ev = allocate_ev(size, max(538, n_units))
+
+    rows = []
+    for i in range(n_years):
+        year = 1916 + 4 * i
+        k = i % len(ref["national"])
+        national = ref["national"][k]
+        total_scale = ref["national_totals"][k]
+
+        margin = np.clip(national + lean + rng.normal(0.0, 0.03, n_units), -0.95, 0.95)
+        third = np.clip(rng.choice(ref["third"], size=n_units), 0.0, 0.5)
+        totals = size * rng.lognormal(0.0, 0.05, n_units)
+        totals = np.maximum(100, np.round(totals / totals.sum() * total_scale)).astype(np.int64)
+
+        major = totals * (1.0 - third)
+        D = np.clip(np.round((major + margin * totals) / 2), 0, None).astype(np.int64)
+        R = np.clip(np.round(major - D), 0, None).astype(np.int64)
+        T = totals - D - R
+
+        for j in range(n_units):
+            rows.append({
+                "year": year, "abbr": names[j],
+                "D_votes": int(D[j]), "R_votes": int(R[j]), "T_votes": int(T[j]),
+                "total_votes": int(totals[j]), "electoral_votes": int(ev[j]),
+            })
+        rows.append({
+            "year": year, "abbr": "NATIONAL",
+            "D_votes": int(D.sum()), "R_votes": int(R.sum()), "T_votes": int(T.sum()),
+            "total_votes": int(totals.sum()), "electoral_votes": int(ev.sum()),
+        })
+    return rows
+
+
+def write_rows(rows, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=FIELDS)
+        w.writeheader()
+        w.writerows(rows)
@@ -0,0 +1,182 @@
+"""Build presidential margins for every congressional district and year.
+
+Reads election_data/presidential_elections_by_district_1968-2020.csv (one row per
+district per year) and computes, for each district-year:
+
+- pres_margin, two_party_margin, third_party_share (same definitions as
+  build_presidential_margins.py)
+- the national values for the year (summed over all districts) and the district's
+  margins relative to them
+- deltas against the previous dataset year for the same district label
+
+Everything is computed with group-wise pandas operations (no per-row Python), so the
+cost scales with the number of district-years, not with years x districts lookups.
+
+Output is partitioned by year so the site and plots only load the years they show:
+
+  docs/district_margins/manifest.json     years, row counts, columns, file names
+  docs/district_margins/<year>.csv        one file per year
+
+Use load_district_margins() to read it back lazily.
+
+Note: district lines are redrawn after each census, so a delta compares a district
+label with the same label in the previous cycle, not the same territory.
+"""
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+ROOT = Path(__file__).resolve().parent
+IN_CSV = ROOT / "election_data" / "presidential_elections_by_district_1968-2020.csv"
+OUT_DIR = ROOT / "docs" / "district_margins"
+MANIFEST = "manifest.json"
+
+VOTE_COLS = ["D_votes", "R_votes", "T_votes", "total_votes"]
+MARGIN_COLS = ["pres_margin", "two_party_margin", "third_party_share"]
+DELTA_COLS = ["D_votes", "R_votes", "total_votes", "pres_margin", "relative_margin",
+              "two_party_margin", "two_party_relative_margin", "third_party_share"]
+
+OUT_COLUMNS = [
+    "year", "abbr", "state", "district",
+    "D_votes", "R_votes", "T_votes", "total_votes",
+    "D_delta", "R_delta", "total_delta",
+    "pres_margin", "pres_margin_delta",
+    "national_margin", "national_margin_delta",
+    "relative_margin", "relative_margin_delta",
+    "third_party_share", "third_party_national_share", "third_party_relative_share",
+    "third_party_share_delta",
+    "two_party_margin", "two_party_margin_delta",
+    "two_party_national_margin", "two_party_national_margin_delta",
+    "two_party_relative_margin", "two_party_relative_margin_delta",
+    "winner",
+]
+
+
+def district_label(district: pd.Series) -> pd.Series:
+    """'AL' stays 'AL'; numeric districts are padded to two digits ('1' -> '01')."""
+    d = district.astype(str).str.strip()
+    return d.where(~d.str.fullmatch(r"\d+"), d.str.zfill(2))
+
+
+def add_margins(df: pd.DataFrame) -> pd.DataFrame:
+    """Add pres_margin, two_party_margin and third_party_share columns (vectorized)."""
+    D = df["D_votes"].to_numpy(dtype=float)
+    R = df["R_votes"].to_numpy(dtype=float)
+    T = df["T_votes"].to_numpy(dtype=float)
+    total = df["total_votes"].to_numpy(dtype=float)
+    two_party = D + R
+    total_safe = np.where(total != 0, total, 1.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        df["two_party_margin"] = np.where(two_party > 0, (D - R) / two_party, 0.0)
+    df["pres_margin"] = (D - R) / total_safe
+    df["third_party_share"] = np.where(total > 0, T / total_safe, 0.0)
+    return df
+
+
+def load_districts(path=IN_CSV) -> pd.DataFrame:
+    df = pd.read_csv(path, dtype={"year": int, "state": str, "district": str})
+    for c in VOTE_COLS:
+        df[c] = pd.to_numeric(df[c], errors="coerce").fillna(0).astype(np.int64)
+    df["district"] = district_label(df["district"])
+    df["abbr"] = df["state"] + "-" + df["district"]
+    return df
+
+
+def compute_district_margins(df: pd.DataFrame) -> pd.DataFrame:
+    """Compute margins, national/relative values and cycle deltas for every district-year."""
+    df = add_margins(df[["year", "abbr", "state", "district"] + VOTE_COLS].copy())
+
+    # national values per year from summed district votes
+    national = add_margins(df.groupby("year", sort=True)[VOTE_COLS].sum().reset_index())
+    national = national[["year"] + MARGIN_COLS].rename(columns={
+        "pres_margin": "national_margin",
+        "two_party_margin": "two_party_national_margin",
+        "third_party_share": "third_party_national_share",
+    })
+    df = df.merge(national, on="year", how="left")
+    df["relative_margin"] = df["pres_margin"] - df["national_margin"]
+    df["two_party_relative_margin"] = df["two_party_margin"] - df["two_party_national_margin"]
+    df["third_party_relative_share"] = df["third_party_share"] - df["third_party_national_share"]
+
+    # deltas vs the previous dataset year (not the previous row for the label), like
+    # build_presidential_margins: a label missing last cycle gets 0 deltas
+    years = national["year"].to_numpy()
+    prev_year = pd.Series(np.r_[-1, years[:-1]], index=years)
+    df["prev_year"] = df["year"].map(prev_year)
+    prev = df[["year", "abbr"] + DELTA_COLS].rename(columns={"year": "prev_year"})
+    df = df.merge(prev, on=["prev_year", "abbr"], how="left", suffixes=("", "_prev"))
+
+    for col, out in [("D_votes", "D_delta"), ("R_votes", "R_delta"), ("total_votes", "total_delta")]:
+        df[out] = (df[col] - df[f"{col}_prev"]).fillna(0).astype(np.int64)
+    for col in ["pres_margin", "relative_margin", "two_party_margin", "two_party_relative_margin", "third_party_share"]:
+        df[f"{col}_delta"] = (df[col] - df[f"{col}_prev"]).fillna(0.0)
+
+    national_delta = national.set_index("year")[["national_margin", "two_party_national_margin"]].diff().fillna(0.0)
+    df["national_margin_delta"] = df["year"].map(national_delta["national_margin"])
+    df["two_party_national_margin_delta"] = df["year"].map(national_delta["two_party_national_margin"])
+
+    # winner letter: largest raw vote count, D/R ties broken by pres_margin sign
+    D, R, T = (df[c].to_numpy() for c in ["D_votes", "R_votes", "T_votes"])
+    df["winner"] = np.select(
+        [(T > D) & (T > R), D > R, R > D, (T == D) & (D == R)],
+        ["T", "D", "R", "T"],
+        default=np.where(df["pres_margin"] >= 0, "D", "R"),
+    )
+    return df.sort_values(["year", "abbr"], kind="stable")[OUT_COLUMNS].reset_index(drop=True)
+
+
+def write_partitioned(df: pd.DataFrame, out_dir=OUT_DIR) -> dict:
+    """Write one CSV per year plus manifest.json; returns the manifest."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    files = {}
+    rows = {}
+    for year, part in df.groupby("year", sort=True):
+        name = f"{year}.csv"
+        part.to_csv(out_dir / name, index=False, float_format="%.12f", lineterminator="\n")
+        files[str(year)] = name
+        rows[str(year)] = len(part)
+    manifest = {
+        "years": [int(y) for y in sorted(df["year"].unique())],
+        "files": files,
+        "rows": rows,
+        "columns": list(df.columns),
+    }
+    (out_dir / MANIFEST).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest
+
+
+def load_district_margins(years=None, out_dir=OUT_DIR) -> pd.DataFrame:
+    """
+    Lazily load district margins: only the per-year files for `years` are read
+    (all years when None). Unknown years are ignored.
+    """
+    out_dir = Path(out_dir)
+    manifest = json.loads((out_dir / MANIFEST).read_text(encoding="utf-8"))
+    wanted = manifest["years"] if years is None else [int(y) for y in years]
+    parts = [
+        pd.read_csv(out_dir / manifest["files"][str(y)], dtype={"state": str, "district": str})
+        for y in wanted if str(y) in manifest["files"]
+    ]
+    if not parts:
+        return pd.DataFrame(columns=manifest["columns"])
+    return pd.concat(parts, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build per-year congressional district margin files")
+    parser.add_argument("--input", default=str(IN_CSV), help="District-level results CSV")
+    parser.add_argument("--out-dir", default=str(OUT_DIR), help="Output directory for per-year CSVs and manifest")
+    args = parser.parse_args()
+
+    margins = compute_district_margins(load_districts(args.input))
+    manifest = write_partitioned(margins, args.out_dir)
+    print(f"Wrote {len(margins):,} district rows for {len(manifest['years'])} years to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,72 +11,67 @@ Outputs:
 
 Notes:
 - We treat units as states plus ME/NE districts (use abbr as-is, including ME-01, etc.).
-- For a unit won by party P in the original results, votes_to_flip = floor((winner_votes - runner_up_votes)/2) + 1.
+- For a unit won by party P in the original results, votes_to_flip = floor((winner_votes - runner_up_votes)/2) + 1
+  (precomputed on the unit_records.UnitYear records the solver works on).
 - We solve a 0/1 knapsack minimizing votes flipped to reach target EVs.
+- Flips are priced by three cost models (COST_MODELS): persuasion (switched voters,
+  votes_to_flip; the classic/no_majority columns), turnout (added runner-up voters,
+  margin + 1) and hybrid (params.FLIP_HYBRID_PERSUASION_SHARE of the effort switching).
+  All six model x mode knapsacks of a year are solved in one batched DP pass
+  (compute_knapsack_batch); the turnout/hybrid results are extra flip_results.csv
+  columns and flip_details.csv rows with mode '<mode>_<model>'.
+- docs/flip_kbest.csv (--kbest, default KBEST_K) adds the k cheapest distinct minimal flip
+  sets per year and mode, and the Pareto frontier of (votes flipped, units flipped), so
+  near-equal alternatives (2004: OH vs NM+IA+NV+NE-02) aren't hidden behind the optimum.
 """
 
 from __future__ import annotations
 
 import csv
+import functools
+import hashlib
+import heapq
+import json
 import math
 import os
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import params
+import pipeline_trace
+import unit_records
 
 DOCS_CSV = os.path.join('presidential_margins.csv')
 OUT_SUMMARY = os.path.join('docs', 'flip_results.csv')
 OUT_DETAILS = os.path.join('docs', 'flip_details.csv')
+OUT_KBEST = os.path.join('docs', 'flip_kbest.csv')
+KBEST_K = 20
+COST_MODELS = ('persuasion', 'turnout', 'hybrid')
+MODES = ('classic', 'no_majority')
+FLIP_CACHE_DIR = Path("election_data/cache/flip_years")
+FLIP_CACHE_VERSION = 1  # bump whenever solver output changes for the same inputs and sources
+# solver sources hashed into every cache key, so editing them invalidates memoized years
+FLIP_CACHE_SOURCES = (__file__, unit_records.__file__)
 
 
 def load_rows(path: str):
-    rows = []
+    """UnitYear records (unit_records.py) for every row of the margins CSV."""
     with open(path, newline='', encoding='utf-8') as f:
-        for r in csv.DictReader(f):
-            # normalize numeric fields
-            def num(k, default=0):
-                v = r.get(k)
-                if v is None or v == '':
-                    return default
-                try:
-                    return float(v)
-                except Exception:
-                    return default
-            row = {
-                'year': int(float(r['year'])),
-                'abbr': r['abbr'],
-                'D_votes': int(num('D_votes', 0)),
-                'R_votes': int(num('R_votes', 0)),
-                'T_votes': int(num('T_votes', 0)),
-                'total_votes': int(num('total_votes', 0)),
-                'electoral_votes': int(num('electoral_votes', 0)),
-            }
-            # derive winner by votes among D/R/T; ties break toward current winner label if present
-            d, r_, t = row['D_votes'], row['R_votes'], row['T_votes']
-            if d >= r_ and d >= t:
-                row['party_win'] = 'D'
-                row['winner_votes'] = d
-                row['runner_up_votes'] = max(r_, t)
-            elif r_ >= d and r_ >= t:
-                row['party_win'] = 'R'
-                row['winner_votes'] = r_
-                row['runner_up_votes'] = max(d, t)
-            else:
-                row['party_win'] = 'T'
-                row['winner_votes'] = t
-                row['runner_up_votes'] = max(d, r_)
-            rows.append(row)
-    return rows
-
-
-def group_by_year(rows):
-    by = defaultdict(list)
-    for r in rows:
-        by[r['year']].append(r)
-    return dict(by)
+        return unit_records.from_margin_rows(csv.DictReader(f))
+
+
+def rows_from_margins(margin_rows):
+    """Same records as load_rows(), from in-memory build_presidential_margins.compute_margins() rows."""
+    return unit_records.from_margin_rows(margin_rows)
+
+
+group_by_year = unit_records.group_by_year
 
 
 def compute_knapsack(units, target_ev):
     """
-    units: list of dicts with keys {abbr, ev, votes_to_flip, total_votes}
+    units: UnitYear records (abbr, electoral_votes, votes_to_flip, total_votes)
     target_ev: minimal electoral votes to accumulate from flipped units
 
     Returns (chosen_units, min_votes, achieved_ev)
@@ -85,15 +80,15 @@ def compute_knapsack(units, target_ev):
         return [], 0, 0
     
     n = len(units)
-    if n == 0 or target_ev > sum(u['ev'] for u in units):
+    if n == 0 or target_ev > sum(u.electoral_votes for u in units):
         return [], math.inf, 0
 
     # Sort by efficiency for deterministic results
-    units_sorted = sorted(units, key=lambda u: (u['votes_to_flip'] / max(1, u['ev']), u['abbr']))
+    units_sorted = sorted(units, key=lambda u: (u.votes_to_flip / max(1, u.electoral_votes), u.abbr))
     
     # Use 2D DP: dp[i][v] = min votes to get exactly v EVs using first i items
     INF = 10**18
-    max_ev = sum(u['ev'] for u in units_sorted)
+    max_ev = sum(u.electoral_votes for u in units_sorted)
     
     # Initialize DP table
     dp = [[INF] * (max_ev + 1) for _ in range(n + 1)]
@@ -102,8 +97,8 @@ def compute_knapsack(units, target_ev):
     # Fill DP table
     for i in range(1, n + 1):
         u = units_sorted[i - 1]
-        ev = u['ev']
-        votes = u['votes_to_flip']
+        ev = u.electoral_votes
+        votes = u.votes_to_flip
         
         for v in range(max_ev + 1):
             # Don't take item i
@@ -132,30 +127,241 @@ def compute_knapsack(units, target_ev):
             # We took item i
             u = units_sorted[i - 1]
             chosen.append(u)
-            v -= u['ev']
+            v -= u.electoral_votes
         i -= 1
     
     return chosen, best_cost, best_v
 
 
-def analyze_year(rows_for_year):
+def flip_cost(u, model='persuasion', share=None):
+    """Votes to flip unit u under a cost model (see params.FLIP_HYBRID_PERSUASION_SHARE)."""
+    if model == 'persuasion':
+        return u.votes_to_flip
+    margin = u.winner_votes - u.runner_up_votes
+    if model == 'turnout':
+        return margin + 1
+    if model == 'hybrid':
+        share = params.FLIP_HYBRID_PERSUASION_SHARE if share is None else share
+        # x voters, share*x switched (2 each) and the rest added (1 each): (1 + share) x >= margin + 1
+        return int(math.ceil((margin + 1) / (1 + share)))
+    raise ValueError(f"Unknown flip cost model: {model!r}")
+
+
+def compute_knapsack_batch(units, problems):
+    """
+    Solve several knapsacks over one unit table in a single DP pass.
+
+    problems: [(costs, target_ev)] with costs[i] the price of units[i] for that problem,
+    or None when the unit can't be used. Each problem gives exactly what
+    compute_knapsack(available units priced by costs, target_ev) would: the same unit
+    order (cost per EV, then abbr), tie-breaking and reconstruction, so the persuasion
+    problems reproduce the classic results. The DP rows of all problems advance together
+    (one NumPy update per unit). Returns [(chosen_units, min_votes, achieved_ev)].
+    """
+    import numpy as np
+    INF = 10**18
+    n, P = len(units), len(problems)
+    max_ev = sum(u.electoral_votes for u in units)
+    ev_arr = np.array([u.electoral_votes for u in units], dtype=np.int64)
+
+    orders = []
+    cost_arr = np.full((P, n), INF, dtype=np.int64)
+    for j, (costs, _) in enumerate(problems):
+        avail = [i for i in range(n) if costs[i] is not None]
+        avail.sort(key=lambda i: (costs[i] / max(1, units[i].electoral_votes), units[i].abbr))
+        # unavailable units go last at INF cost: never taken, so they can't change the others
+        orders.append(avail + [i for i in range(n) if costs[i] is None])
+        for i in avail:
+            cost_arr[j, i] = costs[i]
+    order_arr = np.array(orders, dtype=np.int64).reshape(P, n)
+    step_ev = ev_arr[order_arr]
+    step_cost = np.take_along_axis(cost_arr, order_arr, axis=1)
+
+    dp = np.full((P, max_ev + 1), INF, dtype=np.int64)
+    dp[:, 0] = 0
+    take = np.zeros((n, P, max_ev + 1), dtype=bool)
+    v = np.arange(max_ev + 1)
+    for i in range(n):
+        src = v[None, :] - step_ev[:, i][:, None]
+        ok = src >= 0
+        cand = np.take_along_axis(dp, np.where(ok, src, 0), axis=1) + step_cost[:, i][:, None]
+        better = ok & (cand < dp)
+        take[i] = better
+        dp = np.where(better, cand, dp)
+
+    results = []
+    for j, (_, target_ev) in enumerate(problems):
+        if target_ev <= 0:
+            results.append(([], 0, 0))
+            continue
+        if target_ev > max_ev:
+            results.append(([], math.inf, 0))
+            continue
+        seg = dp[j, target_ev:]
+        k = int(seg.argmin())
+        best_cost = int(seg[k])
+        if best_cost >= INF:
+            results.append(([], math.inf, 0))
+            continue
+        best_v = target_ev + k
+        chosen = []
+        i, vv = n, best_v
+        while i > 0 and vv > 0:
+            if take[i - 1, j, vv]:
+                u = units[orders[j][i - 1]]
+                chosen.append(u)
+                vv -= u.electoral_votes
+            i -= 1
+        results.append((chosen, best_cost, best_v))
+    return results
+
+
+def _flip_order(units):
+    """Units largest-EV first; see compute_kbest."""
+    return sorted(units, key=lambda u: (-u.electoral_votes, u.abbr))
+
+
+def _completion_costs(order, target_ev):
+    """
+    h[i][d] = min votes to gain at least d EVs from order[i:] (a suffix knapsack;
+    INF when impossible). Exact lower bound on finishing any partial solution.
+    """
+    import numpy as np
+    INF = 10**18
+    d = np.arange(target_ev + 1)
+    h = [None] * (len(order) + 1)
+    last = np.full(target_ev + 1, INF, dtype=np.int64)
+    last[0] = 0
+    h[len(order)] = last.tolist()
+    for i in range(len(order) - 1, -1, -1):
+        u = order[i]
+        last = np.minimum(last, np.minimum(last[np.maximum(d - u.electoral_votes, 0)] + u.votes_to_flip, INF))
+        h[i] = last.tolist()
+    return h, INF
+
+
+def compute_kbest(units, target_ev, k=KBEST_K):
+    """
+    The k cheapest distinct minimal flip sets reaching target_ev (no unit can be
+    dropped), as [(votes, ev, [units])], cheapest first.
+
+    Units are taken largest-EV first and a set is finished by the unit that crosses
+    target_ev, which is then its smallest unit, so every finished set is minimal and
+    each is built exactly once. Partial sets are expanded best-first on cost plus the
+    exact cheapest completion (_completion_costs), so finished sets come off the heap
+    in cost order and only about k * len(units) states are touched.
+    """
+    if target_ev <= 0:
+        return [(0, 0, [])]
+    if target_ev > sum(u.electoral_votes for u in units):
+        return []
+    order = _flip_order(units)
+    n = len(order)
+    h, INF = _completion_costs(order, target_ev)
+
+    # (bound, ids, finished, cost, next unit, evs so far); ties break on unit indices
+    heap = [(h[0][target_ev], (), False, 0, 0, 0)]
+    out = []
+    while heap and len(out) < k:
+        bound, ids, finished, cost, i, v = heapq.heappop(heap)
+        if finished:
+            out.append((cost, v, [order[j] for j in ids]))
+            continue
+        if i >= n:
+            continue
+        u = order[i]
+        c2 = cost + u.votes_to_flip
+        if v + u.electoral_votes >= target_ev:
+            heapq.heappush(heap, (c2, ids + (i,), True, c2, i + 1, v + u.electoral_votes))
+        elif h[i + 1][target_ev - v - u.electoral_votes] < INF:
+            v2 = v + u.electoral_votes
+            heapq.heappush(heap, (c2 + h[i + 1][target_ev - v2], ids + (i,), False, c2, i + 1, v2))
+        if h[i + 1][target_ev - v] < INF:
+            heapq.heappush(heap, (cost + h[i + 1][target_ev - v], ids, False, cost, i + 1, v))
+    return out
+
+
+def compute_pareto(units, target_ev, max_units=None):
+    """
+    Pareto frontier of (votes flipped, units flipped) over flip sets reaching target_ev:
+    for each unit count, the cheapest set, kept only if it beats every smaller set.
+    Returns [(votes, ev, [units])] by increasing unit count (decreasing votes).
+
+    Layered knapsack dp[count, ev] (EVs capped at target_ev) updated one unit at a time
+    for all counts at once; dominated sets drop out, so frontier sets are minimal.
+    Counts stop at max_units, the size of the cheapest set (anything larger is
+    dominated by it); computed with compute_kbest when not given.
+    """
+    import numpy as np
+    if target_ev <= 0:
+        return [(0, 0, [])]
+    if target_ev > sum(u.electoral_votes for u in units):
+        return []
+    if max_units is None:
+        max_units = len(compute_kbest(units, target_ev, 1)[0][2])
+    order = _flip_order(units)
+    n, T, m = len(order), target_ev, min(max_units, len(order))
+    INF = np.iinfo(np.int64).max // 4
+    dp = np.full((m + 1, T + 1), INF, dtype=np.int64)
+    dp[0, 0] = 0
+    take = np.zeros((n, m + 1, T + 1), dtype=bool)
+    cap_src = np.zeros((n, m + 1), dtype=np.int64)  # source EV cell of a take into the capped cell
+    rows = np.arange(m)
+    for i, u in enumerate(order):
+        ev, votes = u.electoral_votes, u.votes_to_flip
+        prev = dp[:-1]
+        cand = np.full((m, T + 1), INF, dtype=np.int64)
+        if ev < T:
+            cand[:, ev:T] = prev[:, :T - ev] + votes
+        # every cell at or past T - ev lands in the capped cell T
+        lo = max(T - ev, 0)
+        j = prev[:, lo:].argmin(axis=1)
+        cand[:, T] = prev[rows, lo + j] + votes
+        cap_src[i, 1:] = lo + j
+        better = cand < dp[1:]
+        take[i, 1:] = better
+        dp[1:] = np.where(better, cand, dp[1:])
+
+    out = []
+    best = INF
+    for count in range(1, m + 1):
+        cost = int(dp[count, T])
+        if cost >= best:
+            continue
+        best = cost
+        chosen, c, v = [], count, T
+        for i in range(n - 1, -1, -1):
+            if c == 0:
+                break
+            if take[i, c, v]:
+                chosen.append(order[i])
+                v = int(cap_src[i, c]) if v == T else v - order[i].electoral_votes
+                c -= 1
+        out.append((cost, sum(u.electoral_votes for u in chosen), chosen[::-1]))
+    return out
+
+
+def flip_problems(rows_for_year):
+    """
+    EV standing of a year and its two flip problems:
+    (info dict, {'classic': (units, target_ev), 'no_majority': (units, target_ev)}).
+    """
     # Determine aggregate party EVs using winner labels per unit
     ev_by_party = defaultdict(int)
     total_ev = 0
-    year = rows_for_year[0]['year'] if rows_for_year else 0
+    year = rows_for_year[0].year if rows_for_year else 0
     
     for r in rows_for_year:
-        ev = int(r['electoral_votes'] or 0)
+        ev = r.electoral_votes
         total_ev += ev
         
-        # Special case for Alabama 1960: if AL won by D or T, allocate 5 D + 6 O instead of 11 to winner
-        if year == 1960 and r['abbr'] == 'AL' and r['party_win'] in ('D', 'T'):
-            ev_by_party['D'] += 5
-            ev_by_party['T'] += 6  # Use 'T' for Others/third-party
-        elif year == 1948 and r['abbr'] == 'AL' and r['party_win'] in ('D', 'T'):
-            ev_by_party['T'] += 11  # All 11 to Dixiecrats (Strom Thurmond)
+        # Alabama's split slates (unit_records.SPLIT_SLATES): 1960 D/T = 5 D + 6 T, 1948 D/T = 11 T
+        if (year, r.abbr) in unit_records.SPLIT_SLATES:
+            for party, v in zip(unit_records.PARTIES, unit_records.allocation(r, r.party_win)):
+                if v:
+                    ev_by_party[party] += v
         else:
-            ev_by_party[r['party_win']] += ev
+            ev_by_party[r.party_win] += ev
     
     need = total_ev // 2 + 1
 
@@ -171,106 +377,300 @@ def analyze_year(rows_for_year):
         runner_party, runner_ev = ('D' if winner_party != 'D' else 'R'), 0
 
     # Build candidate flipping set: units not currently won by runner_party
-    units = []
-    for r in rows_for_year:
-        if r['party_win'] == runner_party:
-            continue
-        ev = int(r['electoral_votes'] or 0)
-        if ev <= 0:
-            continue
-        # minimal popular votes to change unit winner to runner_party
-        margin = int(r['winner_votes'] - r['runner_up_votes'])
-        votes_to_flip = margin // 2 + 1
-        units.append({
-            'year': r['year'],
-            'abbr': r['abbr'],
-            'ev': ev,
-            'votes_to_flip': votes_to_flip,
-            'total_votes': int(r['total_votes'] or 0),
-            'from_party': r['party_win'],
-        })
+    # (each record's votes_to_flip is the minimal popular votes to change its winner)
+    units = [r for r in rows_for_year if r.party_win != runner_party and r.electoral_votes > 0]
 
     # Mode classic: make runner reach need
     target_ev_classic = max(0, need - runner_ev)
-    chosen_c, cost_c, ev_c = compute_knapsack(units, target_ev_classic)
 
     # Mode no_majority: reduce winner below need by flipping from the winner regardless of runner gains
     # Equivalent to flipping at least winner_ev - (need - 1) EV away from winner
     target_away = max(0, winner_ev - (need - 1))
     # restrict to units currently held by winner_party (those flips reduce winner's EV)
-    units_from_winner = [u for u in units if u['from_party'] == winner_party]
-    chosen_n, cost_n, ev_n = compute_knapsack(units_from_winner, target_away)
+    units_from_winner = [u for u in units if u.party_win == winner_party]
 
-    return {
+    info = {
+        'year': year,
         'winner_party': winner_party,
         'winner_ev': winner_ev,
         'runner_party': runner_party,
         'runner_ev': runner_ev,
         'need': need,
-        'classic': {'cost': int(cost_c if math.isfinite(cost_c) else -1), 'ev': ev_c, 'units': chosen_c},
-        'no_majority': {'cost': int(cost_n if math.isfinite(cost_n) else -1), 'ev': ev_n, 'units': chosen_n},
         'total_ev': total_ev,
     }
+    return info, {'classic': (units, target_ev_classic), 'no_majority': (units_from_winner, target_away)}
+
+
+def analyze_year(rows_for_year, share=None):
+    info, problems = flip_problems(rows_for_year)
+    year = info['year']
+
+    # every mode x cost model over the classic unit table (no_majority's units are a subset)
+    units, _ = problems['classic']
+    batch, keys = [], []
+    for mode in MODES:
+        mode_units, target = problems[mode]
+        allowed = {id(u) for u in mode_units}
+        for model in COST_MODELS:
+            costs = [flip_cost(u, model, share) if id(u) in allowed else None for u in units]
+            batch.append((costs, target))
+            keys.append((mode, model))
+    with pipeline_trace.span("knapsack", cat="solve", year=year, units=len(units), problems=len(batch)):
+        solved = compute_knapsack_batch(units, batch)
+
+    res = {
+        'winner_party': info['winner_party'],
+        'winner_ev': info['winner_ev'],
+        'runner_party': info['runner_party'],
+        'runner_ev': info['runner_ev'],
+        'need': info['need'],
+        'total_ev': info['total_ev'],
+        'models': {},
+    }
+    for (mode, model), (chosen, cost, ev) in zip(keys, solved):
+        out = {'cost': int(cost if math.isfinite(cost) else -1), 'ev': ev, 'units': chosen}
+        res['models'][(mode, model)] = out
+        if model == 'persuasion':
+            res[mode] = out
+    return res
+
+
+SUMMARY_FIELDS = [
+    'year','winner_party','winner_ev','runner_party','runner_ev','need',
+    'classic_min_votes','classic_ev','classic_states',
+    'no_majority_min_votes','no_majority_ev','no_majority_states','total_ev'
+] + [f'{mode}_{model}_{col}' for model in COST_MODELS[1:] for mode in MODES
+     for col in ('min_votes', 'ev', 'states')] + ['hybrid_persuasion_share']
+DETAIL_FIELDS = ['year','mode','abbr','ev','votes_to_flip','pct_of_state_votes']
+KBEST_FIELDS = ['year','mode','kind','rank','votes','ev','states','units']
+
+
+def year_flip_rows(year_rows, share=None):
+    """(summary_row, detail_rows) of one year for docs/flip_results.csv / flip_details.csv."""
+    share = params.FLIP_HYBRID_PERSUASION_SHARE if share is None else share
+    year = year_rows[0].year
+    res = analyze_year(year_rows, share)
+
+    summary = {
+        'year': year,
+        'winner_party': res['winner_party'],
+        'winner_ev': res['winner_ev'],
+        'runner_party': res['runner_party'],
+        'runner_ev': res['runner_ev'],
+        'need': res['need'],
+        'classic_min_votes': res['classic']['cost'],
+        'classic_ev': res['classic']['ev'],
+        'classic_states': len(res['classic']['units']),
+        'no_majority_min_votes': res['no_majority']['cost'],
+        'no_majority_ev': res['no_majority']['ev'],
+        'no_majority_states': len(res['no_majority']['units']),
+        'total_ev': res['total_ev'],
+    }
+    for (mode, model), r in res['models'].items():
+        if model != 'persuasion':
+            summary.update({
+                f'{mode}_{model}_min_votes': r['cost'],
+                f'{mode}_{model}_ev': r['ev'],
+                f'{mode}_{model}_states': len(r['units']),
+            })
+    summary['hybrid_persuasion_share'] = share
+
+    # per-unit details for each mode (persuasion first, as 'classic' / 'no_majority')
+    details = []
+    for model in COST_MODELS:
+        for mode in MODES:
+            for u in res['models'][(mode, model)]['units']:
+                votes = flip_cost(u, model, share)
+                details.append({
+                    'year': year,
+                    'mode': mode if model == 'persuasion' else f'{mode}_{model}',
+                    'abbr': u.abbr,
+                    'ev': u.electoral_votes,
+                    'votes_to_flip': votes,
+                    'pct_of_state_votes': round(100.0 * (votes / u.total_votes) if u.total_votes else 0.0, 3),
+                })
+    return summary, details
+
+
+def year_kbest_rows(year_rows, k=KBEST_K):
+    """docs/flip_kbest.csv rows of one year: kind 'kbest' (k cheapest sets) and 'pareto' per mode."""
+    _, problems = flip_problems(year_rows)
+    year = year_rows[0].year
+    out = []
+    for mode in MODES:
+        units, target = problems[mode]
+        with pipeline_trace.span("kbest", cat="solve", year=year, mode=mode, units=len(units), target=target, k=k):
+            kbest = compute_kbest(units, target, k)
+            solutions = {'kbest': kbest, 'pareto': compute_pareto(units, target, len(kbest[0][2]) if kbest else None)}
+        for kind, sols in solutions.items():
+            for rank, (votes, ev, chosen) in enumerate(sols, 1):
+                out.append({
+                    'year': year,
+                    'mode': mode,
+                    'kind': kind,
+                    'rank': rank,
+                    'votes': votes,
+                    'ev': ev,
+                    'states': len(chosen),
+                    'units': ' '.join(u.abbr for u in sorted(chosen, key=lambda u: u.abbr)),
+                })
+    return out
 
 
-def main():
-    rows = load_rows(DOCS_CSV)
+def compute_flip_tables(rows, share=None):
+    """Solve every year; returns (summary_rows, detail_rows) as written to docs/flip_*.csv."""
     by = group_by_year(rows)
-
-    # Build outputs
     summary_rows = []
     detail_rows = []
+    for year in sorted(by.keys()):
+        summary, details = year_flip_rows(by[year], share)
+        summary_rows.append(summary)
+        detail_rows.extend(details)
+    return summary_rows, detail_rows
 
+
+def compute_kbest_tables(rows, k=KBEST_K):
+    """Rows for docs/flip_kbest.csv: kind 'kbest' (k cheapest sets) and 'pareto' per year and mode."""
+    by = group_by_year(rows)
+    out = []
     for year in sorted(by.keys()):
-        year_rows = by[year]
-        res = analyze_year(year_rows)
-
-        summary_rows.append({
-            'year': year,
-            'winner_party': res['winner_party'],
-            'winner_ev': res['winner_ev'],
-            'runner_party': res['runner_party'],
-            'runner_ev': res['runner_ev'],
-            'need': res['need'],
-            'classic_min_votes': res['classic']['cost'],
-            'classic_ev': res['classic']['ev'],
-            'classic_states': len(res['classic']['units']),
-            'no_majority_min_votes': res['no_majority']['cost'],
-            'no_majority_ev': res['no_majority']['ev'],
-            'no_majority_states': len(res['no_majority']['units']),
-            'total_ev': res['total_ev'],
-        })
-
-        # per-unit details for each mode
-        for mode in ('classic', 'no_majority'):
-            for u in res[mode]['units']:
-                detail_rows.append({
-                    'year': year,
-                    'mode': mode,
-                    'abbr': u['abbr'],
-                    'ev': u['ev'],
-                    'votes_to_flip': u['votes_to_flip'],
-                    'pct_of_state_votes': round(100.0 * (u['votes_to_flip'] / u['total_votes']) if u['total_votes'] else 0.0, 3),
-                })
+        out.extend(year_kbest_rows(by[year], k))
+    return out
 
-    # write CSVs
-    os.makedirs('docs', exist_ok=True)
-    with open(OUT_SUMMARY, 'w', newline='', encoding='utf-8') as f:
-        w = csv.DictWriter(f, fieldnames=[
-            'year','winner_party','winner_ev','runner_party','runner_ev','need',
-            'classic_min_votes','classic_ev','classic_states',
-            'no_majority_min_votes','no_majority_ev','no_majority_states','total_ev'
-        ])
+
+def solve_year(year_rows, share=None, kbest=KBEST_K):
+    """Every output row of one year: {'summary': row, 'details': [...], 'kbest': [...]}."""
+    summary, details = year_flip_rows(year_rows, share)
+    return {'summary': summary, 'details': details,
+            'kbest': year_kbest_rows(year_rows, kbest) if kbest else []}
+
+
+@functools.lru_cache(maxsize=None)
+def solver_source_hash():
+    """sha256 of the FLIP_CACHE_SOURCES file contents."""
+    h = hashlib.sha256()
+    for path in FLIP_CACHE_SOURCES:
+        with open(path, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def year_cache_key(year_rows, share, kbest):
+    """Hash of a year's unit table (as the solvers see it), the solver settings and sources."""
+    table = [(u.year, u.abbr, u.electoral_votes, u.D_votes, u.R_votes, u.T_votes, u.total_votes,
+              u.party_win, u.votes_to_flip) for u in year_rows]
+    payload = json.dumps([FLIP_CACHE_VERSION, solver_source_hash(), share, kbest, table], separators=(',', ':'))
+    return f"{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:24]}-v{FLIP_CACHE_VERSION}"
+
+
+def year_cache_path(cache_dir, year, key):
+    return Path(cache_dir) / f"{year}-{key}.json"
+
+
+def _solve_year_job(args):
+    """Worker task: solve one year."""
+    year, year_rows, share, kbest = args
+    return year, solve_year(year_rows, share, kbest)
+
+
+def solve_years(rows, share=None, kbest=KBEST_K, jobs=None, cache_dir=FLIP_CACHE_DIR, use_cache=True):
+    """
+    (summary_rows, detail_rows, kbest_rows, solved_years) for every year: memoized years
+    come from cache_dir, the rest are solved (in a process pool when jobs > 1) and stored.
+    """
+    share = params.FLIP_HYBRID_PERSUASION_SHARE if share is None else share
+    by = group_by_year(rows)
+    years = sorted(by.keys())
+    results, keys, missing = {}, {}, []
+    for year in years:
+        if use_cache:
+            keys[year] = year_cache_key(by[year], share, kbest)
+            path = year_cache_path(cache_dir, year, keys[year])
+            if path.exists():
+                with open(path, encoding='utf-8') as f:
+                    results[year] = json.load(f)
+                continue
+        missing.append(year)
+
+    tasks = [(year, by[year], share, kbest) for year in missing]
+    jobs = jobs or min(len(tasks), os.cpu_count() or 1)
+    with pipeline_trace.span("flip.solve", years=len(tasks), jobs=jobs):
+        if jobs <= 1 or len(tasks) <= 1:
+            solved = map(_solve_year_job, tasks)
+        else:
+            pool = ProcessPoolExecutor(max_workers=jobs)
+            solved = pool.map(_solve_year_job, tasks)
+        try:
+            for year, res in solved:
+                results[year] = res
+                if use_cache:
+                    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+                    # one entry per year: drop the stale ones
+                    for old in Path(cache_dir).glob(f"{year}-*.json"):
+                        old.unlink()
+                    with open(year_cache_path(cache_dir, year, keys[year]), 'w', encoding='utf-8') as f:
+                        json.dump(res, f)
+        finally:
+            if jobs > 1 and len(tasks) > 1:
+                pool.shutdown()
+
+    summary_rows = [results[y]['summary'] for y in years]
+    detail_rows = [r for y in years for r in results[y]['details']]
+    kbest_rows = [r for y in years for r in results[y]['kbest']]
+    return summary_rows, detail_rows, kbest_rows, missing
+
+
+def write_kbest_table(kbest_rows, out_kbest=OUT_KBEST):
+    os.makedirs(os.path.dirname(out_kbest) or '.', exist_ok=True)
+    with open(out_kbest, 'w', newline='', encoding='utf-8') as f:
+        w = csv.DictWriter(f, fieldnames=KBEST_FIELDS)
+        w.writeheader()
+        w.writerows(kbest_rows)
+
+
+def write_flip_tables(summary_rows, detail_rows, out_summary=OUT_SUMMARY, out_details=OUT_DETAILS):
+    os.makedirs(os.path.dirname(out_summary) or '.', exist_ok=True)
+    with open(out_summary, 'w', newline='', encoding='utf-8') as f:
+        w = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
         w.writeheader()
         w.writerows(summary_rows)
 
-    with open(OUT_DETAILS, 'w', newline='', encoding='utf-8') as f:
-        w = csv.DictWriter(f, fieldnames=['year','mode','abbr','ev','votes_to_flip','pct_of_state_votes'])
+    with open(out_details, 'w', newline='', encoding='utf-8') as f:
+        w = csv.DictWriter(f, fieldnames=DETAIL_FIELDS)
         w.writeheader()
         w.writerows(detail_rows)
 
+
+def main(kbest=KBEST_K, share=None, jobs=None, use_cache=True):
+    with pipeline_trace.span("flip.load") as sp:
+        rows = load_rows(DOCS_CSV)
+        sp.set(rows=len(rows))
+    summary_rows, detail_rows, kbest_rows, solved = solve_years(rows, share, kbest, jobs, use_cache=use_cache)
+    if use_cache:
+        print(f"Solved {len(solved)} year(s), {len(summary_rows) - len(solved)} from cache ({FLIP_CACHE_DIR})")
+
+    # write CSVs
+    with pipeline_trace.span("flip.write", rows=len(detail_rows)):
+        write_flip_tables(summary_rows, detail_rows)
     print(f"Wrote {OUT_SUMMARY} ({len(summary_rows)} years) and {OUT_DETAILS} ({len(detail_rows)} rows)")
 
+    if kbest:
+        with pipeline_trace.span("flip.write_kbest", rows=len(kbest_rows)):
+            write_kbest_table(kbest_rows)
+        print(f"Wrote {OUT_KBEST} ({len(kbest_rows)} rows, k={kbest})")
+
 
 if __name__ == '__main__':
-    main()
+    import argparse
+    parser = argparse.ArgumentParser(description="Compute minimal vote flips per year")
+    parser.add_argument("--kbest", type=int, default=KBEST_K,
+                        help=f"Alternatives per year/mode in {OUT_KBEST} (default {KBEST_K}; 0 skips it)")
+    parser.add_argument("--hybrid-share", type=float, default=None,
+                        help=f"Persuasion share of the hybrid cost model (default {params.FLIP_HYBRID_PERSUASION_SHARE})")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes for solving years (1 = serial)")
+    parser.add_argument("--no-cache", action="store_true", help=f"Re-solve every year, ignoring {FLIP_CACHE_DIR}")
+    parser.add_argument("--trace", help="Write a Chrome trace-event JSON of the solves here")
+    args = parser.parse_args()
+    if args.trace:
+        pipeline_trace.enable(args.trace)
+    main(args.kbest, args.hybrid_share, args.jobs, not args.no_cache)
@@ -2,6 +2,8 @@ import csv
 import os
 from collections import defaultdict
 from params import COLORS
+import electoral_votes as ev_lookup
+import pipeline_trace
 import utils
 
 
@@ -27,15 +29,61 @@ def safe_float(x):
         return 0.0
 
 
-def main():
-    root = os.path.dirname(__file__)
-    # use the combined wikipedia-derived totals as requested
-    infile = os.path.join(root, "election_data", "wikipedia", "wikipedia_presidential_elections_combined.csv")
-    old_margins = os.path.join(root, "presidential_margins_old.csv")
-    outfile = os.path.join(root, "presidential_margins.csv")
+ROOT = os.path.dirname(__file__)
+DEFAULT_INPUT = os.path.join(ROOT, "election_data", "wikipedia", "wikipedia_presidential_elections_combined.csv")
+DEFAULT_OLD_MARGINS = os.path.join(ROOT, "presidential_margins_old.csv")
+DEFAULT_OUTPUT = os.path.join(ROOT, "presidential_margins.csv")
+
+FIELDNAMES = [
+    'year', 'abbr', 'D_votes', 'R_votes', 'T_votes', 'total_votes', 'electoral_votes',
+    'D_delta', 'R_delta', 'total_delta',
+    'pres_margin', 'pres_margin_delta',
+    'national_margin', 'national_margin_delta',
+    'relative_margin', 'relative_margin_delta',
+    'third_party_share', 'third_party_national_share', 'third_party_relative_share',
+    'two_party_margin', 'two_party_margin_delta',
+    'two_party_national_margin', 'two_party_national_margin_delta',
+    'two_party_relative_margin', 'two_party_relative_margin_delta',
+    'color',
+    'pres_margin_str', 'pres_margin_delta_str',
+    'national_margin_str', 'national_margin_delta_str',
+    'relative_margin_str', 'relative_margin_delta_str',
+    'third_party_share_str', 'third_party_national_share_str', 'third_party_relative_share_str',
+    'two_party_margin_str', 'two_party_margin_delta_str',
+    'two_party_national_margin_str', 'two_party_national_margin_delta_str',
+    'two_party_relative_margin_str', 'two_party_relative_margin_delta_str',
+]
+
+# written as fixed 12-digit decimals; a missing delta (first year of a unit) is written as '0'
+FIXED_FIELDS = (
+    'pres_margin', 'pres_margin_delta',
+    'national_margin', 'national_margin_delta',
+    'relative_margin', 'relative_margin_delta',
+)
+
+# display columns: (third_party, text for a missing value)
+LEAN_STR_COLUMNS = {
+    'pres_margin_str': (False, '0'),
+    'pres_margin_delta_str': (False, '0'),
+    'national_margin_str': (False, '0'),
+    'national_margin_delta_str': (False, '0'),
+    'relative_margin_str': (False, '0'),
+    'relative_margin_delta_str': (False, '0'),
+    'two_party_margin_str': (False, '0'),
+    'two_party_margin_delta_str': (False, '0.0'),
+    'two_party_national_margin_str': (False, '0.0'),
+    'two_party_national_margin_delta_str': (False, '0.0'),
+    'two_party_relative_margin_str': (False, '0.0'),
+    'two_party_relative_margin_delta_str': (False, '0.0'),
+    'third_party_share_str': (True, '0.0'),
+    'third_party_national_share_str': (True, '0.0'),
+    'third_party_relative_share_str': (True, '0.0'),
+}
+
 
+def read_input(infile=DEFAULT_INPUT):
+    """Read the combined totals CSV into typed rows (int votes)."""
     rows = []
-    years = set()
     with open(infile, newline='', encoding='utf-8') as f:
         reader = csv.DictReader(f)
         for r in reader:
@@ -48,7 +96,17 @@ def main():
             # capture electoral_votes if present
             r2['electoral_votes'] = safe_int(r.get('electoral_votes', 0))
             rows.append(r2)
-            years.add(r2['year'])
+    return rows
+
+
+def compute_margins(rows, old_margins=DEFAULT_OLD_MARGINS, root=ROOT):
+    """
+    Compute the margins table from read_input() rows.
+
+    Returns typed rows (floats and ints, FIXED_FIELDS deltas None when there is no
+    previous year); format_row() turns one into the strings written to the CSV.
+    """
+    years = {r['year'] for r in rows}
 
     # index by (abbr) -> list of rows sorted by year
     by_state = defaultdict(list)
@@ -81,6 +139,7 @@ def main():
     # Prepare output rows sorted by year then abbr
     years_sorted = sorted(years)
     out_rows = []
+    str_overrides = {}  # out_rows index -> pres_margin_str
 
     # If old margins file exists, read electoral votes for 2024 to override
     override_ev_2024 = {}
@@ -97,46 +156,10 @@ def main():
                     ev = safe_int(row.get('electoral_votes', 0))
                     override_ev_2024[ab] = ev
 
-    # load historical electoral college allocations
-    electoral_map = {}  # key: (year, abbr) -> electoral_votes
-    ec_file = os.path.join(root, "election_data", "Electoral_College.csv")
-    if os.path.exists(ec_file):
-        with open(ec_file, newline='', encoding='utf-8') as f:
-            rdr = csv.DictReader(f)
-            for row in rdr:
-                try:
-                    y = int(row.get('year') or 0)
-                except Exception:
-                    y = 0
-                ab = row.get('abbr')
-                ev = safe_int(row.get('electoral_votes', 0))
-                if ab:
-                    electoral_map[(y, ab)] = ev
-
-    def compute_electoral_votes(year, abbr):
-        # Special handling for Maine (ME) and Nebraska (NE) which have district allocations
-        base = abbr.split('-')[0]
-        # Maine: starting 1972, ME-AL gets 2, ME-01/02 get 1; else ME-AL gets all and districts 0
-        if base == 'ME':
-            total = electoral_map.get((year, 'ME'), 0)
-            if abbr == 'ME-AL':
-                return 2 if year >= 1972 else total
-            if abbr.startswith('ME-'):
-                return 1 if year >= 1972 else 0
-            return total
-        # Nebraska: starting 1992, NE-AL gets 2, NE-01/02/03 get 1; else NE-AL gets all and districts 0
-        if base == 'NE':
-            total = electoral_map.get((year, 'NE'), 0)
-            if abbr == 'NE-AL':
-                return 2 if year >= 1992 else total
-            if abbr.startswith('NE-'):
-                return 1 if year >= 1992 else 0
-            return total
-        # default: try exact match then try base abbr (strip district)
-        ev = electoral_map.get((year, abbr))
-        if ev is None:
-            ev = electoral_map.get((year, base), 0)
-        return ev or 0
+    # historical electoral college allocations (ME/NE district rules applied in the matrix)
+    ev_matrix = ev_lookup.load_matrix(
+        os.path.join(root, "docs", "ev_matrix.json"),
+        os.path.join(root, "election_data", "electoral_college.csv"))
 
     # helper to get previous margin for a state
     for year in years_sorted:
@@ -191,8 +214,8 @@ def main():
             two_party_relative_delta = two_party_relative - prev_two_party_relative if prev_two_party_relative is not None else None
             two_party_national_delta = two_party_national - prev_two_party_national if prev_two_party_national is not None else None
 
-            # determine electoral votes from Electoral_College.csv (with ME/NE special-casing)
-            electoral_votes = compute_electoral_votes(year, abbr) or r.get('electoral_votes', 0)
+            # determine electoral votes from the EV matrix (electoral_college.csv)
+            electoral_votes = ev_matrix.get(year, abbr) or r.get('electoral_votes', 0)
 
             # compute vote deltas (difference from previous available year for this abbr)
             if prev_row is not None:
@@ -219,44 +242,44 @@ def main():
                 'total_votes': r['total_votes'],
                 'electoral_votes': electoral_votes,
                 
-                'pres_margin': f"{pres:.12f}",
-                'pres_margin_delta': f"{pres_delta:.12f}" if pres_delta is not None else '0',
-                # Default pres margin string is D+/R+ based on pres value. It may be overridden
-                # for historic third-party wins below.
-                'pres_margin_str': utils.lean_str(pres),
-                'pres_margin_delta_str': utils.lean_str(pres_delta),
+                'pres_margin': pres,
+                'pres_margin_delta': pres_delta,
+                # *_str columns hold the raw value here; format_lean_columns() formats them all
+                # at once. pres_margin_str may be overridden for historic third-party wins below.
+                'pres_margin_str': pres,
+                'pres_margin_delta_str': pres_delta,
                 
-                'national_margin': f"{national_margin['margin']:.12f}",
-                'national_margin_delta': f"{national_delta:.12f}" if national_delta is not None else '0',
-                'national_margin_str': utils.lean_str(national_margin['margin']),
-                'national_margin_delta_str': utils.lean_str(national_delta),
+                'national_margin': national_margin['margin'],
+                'national_margin_delta': national_delta,
+                'national_margin_str': national_margin['margin'],
+                'national_margin_delta_str': national_delta,
                 
-                'relative_margin': f"{relative_pres:.12f}",
-                'relative_margin_delta': f"{relative_delta:.12f}" if relative_delta is not None else '0',
-                'relative_margin_str': utils.lean_str(relative_pres),
-                'relative_margin_delta_str': utils.lean_str(relative_delta),
+                'relative_margin': relative_pres,
+                'relative_margin_delta': relative_delta,
+                'relative_margin_str': relative_pres,
+                'relative_margin_delta_str': relative_delta,
                 
                 'two_party_margin': r.get('two_party_margin', 0.0),
-                'two_party_margin_str': utils.lean_str(r.get('two_party_margin', 0.0)),
+                'two_party_margin_str': r.get('two_party_margin', 0.0),
                 'two_party_margin_delta': two_party_pres_delta if two_party_pres_delta is not None else 0.0,
-                'two_party_margin_delta_str': utils.lean_str(two_party_pres_delta) if two_party_pres_delta is not None else '0.0',
+                'two_party_margin_delta_str': two_party_pres_delta,
                 
                 'two_party_national_margin': two_party_national if two_party_national is not None else 0.0,
-                'two_party_national_margin_str': utils.lean_str(two_party_national) if two_party_national is not None else '0.0',
+                'two_party_national_margin_str': two_party_national,
                 'two_party_national_margin_delta': two_party_national_delta if two_party_national_delta is not None else 0.0,
-                'two_party_national_margin_delta_str': utils.lean_str(two_party_national_delta) if two_party_national_delta is not None else '0.0',
+                'two_party_national_margin_delta_str': two_party_national_delta,
                 
                 'two_party_relative_margin': two_party_relative if two_party_relative is not None else 0.0,
-                'two_party_relative_margin_str': utils.lean_str(two_party_relative) if two_party_relative is not None else '0.0',
+                'two_party_relative_margin_str': two_party_relative,
                 'two_party_relative_margin_delta': two_party_relative_delta if two_party_relative_delta is not None else 0.0,
-                'two_party_relative_margin_delta_str': utils.lean_str(two_party_relative_delta) if two_party_relative_delta is not None else '0.0',
+                'two_party_relative_margin_delta_str': two_party_relative_delta,
                 
                 'third_party_share': third_party if third_party is not None else 0.0,
-                'third_party_share_str': utils.lean_str(third_party, third_party=True) if third_party is not None else '0.0',
+                'third_party_share_str': third_party,
                 'third_party_national_share': third_party_national if third_party_national is not None else 0.0,
-                'third_party_national_share_str': utils.lean_str(third_party_national, third_party=True) if third_party_national is not None else '0.0',
+                'third_party_national_share_str': third_party_national,
                 'third_party_relative_share': third_party_relative if third_party_relative is not None else 0.0,
-                'third_party_relative_share_str': utils.lean_str(third_party_relative, third_party=True) if third_party_relative is not None else '0.0',
+                'third_party_relative_share_str': third_party_relative,
                 # color will be assigned below based on the winner
                 'color': None,
             }
@@ -296,49 +319,85 @@ def main():
                     t_margin = (tv - lead_major) / tot if tot > 0 else 0.0
                     # Format as T+/- with one decimal percentage (consistent with other margin strings)
                     sign = '+' if t_margin >= 0 else '-'
-                    out['pres_margin_str'] = f"T{sign}{abs(t_margin * 100):.1f}"
+                    str_overrides[len(out_rows)] = f"T{sign}{abs(t_margin * 100):.1f}"
                 elif year == 1948 and abbr == 'AL':
                     # Strom Thurmond (Dixiecrat) won AL; show his margin vs Dewey (D - R) / total but displayed as T+X.X
                     tot = r['total_votes'] if r['total_votes'] else 1
                     d_margin = (dv - rv) / tot if tot > 0 else 0.0
-                    out['pres_margin_str'] = f"T{sign}{abs(d_margin * 100):.1f}"
+                    str_overrides[len(out_rows)] = f"T{sign}{abs(d_margin * 100):.1f}"
             except Exception:
                 # If anything goes wrong, leave the default pres_margin_str
                 pass
             out_rows.append(out)
 
-    # write CSV
-    fieldnames = [
-        'year', 'abbr', 'D_votes', 'R_votes', 'T_votes', 'total_votes', 'electoral_votes',
-        'D_delta', 'R_delta', 'total_delta',
-        'pres_margin', 'pres_margin_delta',
-        'national_margin', 'national_margin_delta',
-        'relative_margin', 'relative_margin_delta',
-        'third_party_share', 'third_party_national_share', 'third_party_relative_share',
-        'two_party_margin', 'two_party_margin_delta',
-        'two_party_national_margin', 'two_party_national_margin_delta',
-        'two_party_relative_margin', 'two_party_relative_margin_delta',
-        'color',
-        'pres_margin_str', 'pres_margin_delta_str',
-        'national_margin_str', 'national_margin_delta_str',
-        'relative_margin_str', 'relative_margin_delta_str',
-        'third_party_share_str', 'third_party_national_share_str', 'third_party_relative_share_str',
-        'two_party_margin_str', 'two_party_margin_delta_str',
-        'two_party_national_margin_str', 'two_party_national_margin_delta_str',
-        'two_party_relative_margin_str', 'two_party_relative_margin_delta_str',
-    ]
+    format_lean_columns(out_rows)
+    for i, s in str_overrides.items():
+        out_rows[i]['pres_margin_str'] = s
 
+    # apply 2024 overrides from old margins if present
+    for r in out_rows:
+        if r['year'] == 2024 and r['abbr'] in override_ev_2024:
+            r['electoral_votes'] = override_ev_2024[r['abbr']]
+    return out_rows
+
+
+def format_lean_columns(out_rows):
+    """Replace the raw values in every LEAN_STR_COLUMNS column with utils.lean_str text."""
+    for col, (third_party, none_str) in LEAN_STR_COLUMNS.items():
+        strs = utils.lean_str_array([r[col] for r in out_rows], third_party=third_party, none_str=none_str)
+        for r, s in zip(out_rows, strs.tolist()):
+            r[col] = s
+
+
+def format_row(r):
+    """The CSV representation of one compute_margins() row, as strings."""
+    out = {}
+    for k in FIELDNAMES:
+        v = r.get(k)
+        if k in FIXED_FIELDS:
+            out[k] = f"{v:.12f}" if v is not None else '0'
+        else:
+            out[k] = '' if v is None else str(v)
+    return out
+
+
+def write_margins(out_rows, outfile=DEFAULT_OUTPUT):
     with open(outfile, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
         writer.writeheader()
         for r in out_rows:
-            # apply 2024 overrides from old margins if present
-            if r['year'] == 2024 and r['abbr'] in override_ev_2024:
-                r['electoral_votes'] = override_ev_2024[r['abbr']]
-            writer.writerow(r)
+            writer.writerow(format_row(r))
+
+
+def main(validate=True, infile=None, outfile=None, old_margins=None):
+    # use the combined wikipedia-derived totals as requested
+    infile = infile or DEFAULT_INPUT
+    old_margins = old_margins or DEFAULT_OLD_MARGINS
+    outfile = outfile or DEFAULT_OUTPUT
+
+    # fail fast on bad ingests before anything is written (see validate_votes.py)
+    if validate:
+        from validate_votes import validate_or_exit
+        with pipeline_trace.span("margins.validate"):
+            validate_or_exit(infile)
 
+    with pipeline_trace.span("margins.read") as sp:
+        rows = read_input(infile)
+        sp.set(rows=len(rows))
+    with pipeline_trace.span("margins.compute") as sp:
+        out_rows = compute_margins(rows, old_margins)
+        sp.set(rows=len(out_rows))
+    with pipeline_trace.span("margins.write", rows=len(out_rows)):
+        write_margins(out_rows, outfile)
     print(f"Wrote {len(out_rows)} rows to {outfile}")
 
 
 if __name__ == '__main__':
-    main()
+    import argparse
+    parser = argparse.ArgumentParser(description="Build presidential_margins.csv from the combined Wikipedia totals")
+    parser.add_argument("--skip-validation", action="store_true", help="Don't run validate_votes.py checks first")
+    parser.add_argument("--trace", help="Write a Chrome trace-event JSON of the build stages here")
+    args = parser.parse_args()
+    if args.trace:
+        pipeline_trace.enable(args.trace)
+    main(validate=not args.skip_validation)
@@ -0,0 +1,206 @@
+"""
+Uniform-swing scenario cube: every year x a fine national-margin (pv) grid x every unit.
+
+For a scenario pv, a unit's shares move the way build_stop_colors classifies tester
+stops: D + (pv - nat) / 2, R - (pv - nat) / 2, T unchanged, and the largest share
+wins. That keeps the 1968-style third-party window (T carries a unit while neither
+shifted major-party share passes it) without looking up stops. The 'two_party' rule is
+the plain sign of relative_margin + pv (ev_distribution / tester shift; ties go to the
+side pv moved towards).
+
+Output (default election_data/cache/scenario_cube/; load_cube() rebuilds it when the
+margins CSV is newer or the grid step / rules differ from the ones asked for):
+
+  winners.npy   int8 (rule, year, pv, unit): 0 = no such unit that year, 1 D, 2 R, 3 T
+  ev_totals.npy int16 (rule, year, pv, party): D / R / T electoral votes, allocated
+                through unit_records.allocation (Alabama's 1948 / 1960 split slates)
+  meta.json     rules, years, units, pv grid (start, step, count), codes, source
+
+Both .npy files open memory-mapped (np.load(mmap_mode='r')), so callers slice e.g.
+cube.winners_at(2016, 0.01) without recomputation. The default grid (0.05-pt steps
+across +/-TESTER_PV_CAP) is about 6 MB.
+
+Usage:
+  python build_scenario_cube.py
+  python build_scenario_cube.py --step 0.001 --rules three_way
+  python build_scenario_cube.py --lookup 1968 0.05
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+import params
+import pipeline_trace
+import unit_records
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_INPUT = unit_records.DEFAULT_INPUT
+DEFAULT_OUT_DIR = os.path.join(ROOT, "election_data", "cache", "scenario_cube")
+DEFAULT_STEP = 0.0005
+PARTIES = unit_records.PARTIES
+RULES = ('three_way', 'two_party')
+NO_UNIT = 0  # winner code of a unit that doesn't exist in a year; parties are 1 + PARTIES index
+
+
+def pv_grid(step=DEFAULT_STEP, cap=params.TESTER_PV_CAP):
+    n = int(round(cap / step))
+    return np.round(np.arange(-n, n + 1) * step, 10)
+
+
+def year_winners(records, pvs, rule='three_way'):
+    """(units, winner codes (pv, unit)) for one year's records over the pv grid."""
+    units = [r for r in records if r.abbr and not r.is_national]
+    pvs = np.asarray(pvs, dtype=float)
+    if rule == 'two_party':
+        m = np.array([u.relative_margin for u in units])[None, :] + pvs[:, None]
+        nat = next((r.national_margin for r in records if r.is_national), 0.0)
+        tie = np.where(pvs >= nat, 1, 2)[:, None]
+        codes = np.where(m > 0, 1, np.where(m < 0, 2, tie))
+        return units, codes.astype(np.int8)
+    if rule != 'three_way':
+        raise ValueError(f"Unknown rule: {rule!r} ({', '.join(RULES)})")
+    total = np.array([u.total_votes for u in units], dtype=float)
+    safe = np.where(total > 0, total, 1.0)
+    shares = np.array([[u.D_votes, u.R_votes, u.T_votes] for u in units], dtype=float).reshape(-1, 3)
+    shares = np.where(total[:, None] > 0, shares / safe[:, None], 0.0)
+    shift = (pvs[:, None] - np.array([u.national_margin for u in units])[None, :]) / 2
+    stacked = np.stack([shares[:, 0] + shift, shares[:, 1] - shift,
+                        np.broadcast_to(shares[:, 2], shift.shape)])
+    # argmax keeps the first maximum, like max() over D, R, T in build_stop_colors
+    return units, (stacked.argmax(axis=0) + 1).astype(np.int8)
+
+
+def build_cube(records_by_year, pvs, rules=RULES):
+    """(winners, ev_totals, years, units) arrays for every rule, year and pv."""
+    years = sorted(records_by_year)
+    unit_names = sorted({r.abbr for y in years for r in records_by_year[y] if r.abbr and not r.is_national})
+    col = {u: j for j, u in enumerate(unit_names)}
+    winners = np.zeros((len(rules), len(years), len(pvs), len(unit_names)), dtype=np.int8)
+    ev_totals = np.zeros((len(rules), len(years), len(pvs), len(PARTIES)), dtype=np.int16)
+    for k, rule in enumerate(rules):
+        for i, year in enumerate(years):
+            with pipeline_trace.span("cube.year", cat="solve", rule=rule, year=year):
+                units, codes = year_winners(records_by_year[year], pvs, rule)
+                cols = [col[u.abbr] for u in units]
+                winners[k, i][:, cols] = codes
+                # alloc[u, carrier] = (D, R, T) EVs unit u gives when `carrier` carries it
+                alloc = np.array([[unit_records.allocation(u, p) for p in PARTIES] for u in units],
+                                 dtype=np.int64).reshape(len(units), len(PARTIES), len(PARTIES))
+                ev_totals[k, i] = alloc[np.arange(len(units))[None, :], codes - 1].sum(axis=1)
+    return winners, ev_totals, years, unit_names
+
+
+def write_cube(out_dir, winners, ev_totals, meta):
+    os.makedirs(out_dir, exist_ok=True)
+    for name, arr in (("winners.npy", winners), ("ev_totals.npy", ev_totals)):
+        mm = np.lib.format.open_memmap(os.path.join(out_dir, name), mode='w+', dtype=arr.dtype, shape=arr.shape)
+        mm[...] = arr
+        mm.flush()
+        del mm
+    with open(os.path.join(out_dir, "meta.json"), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=1)
+
+
+class ScenarioCube:
+    """Memory-mapped cube plus the index lookups needed to slice it."""
+
+    def __init__(self, out_dir=DEFAULT_OUT_DIR):
+        with open(os.path.join(out_dir, "meta.json"), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.winners = np.load(os.path.join(out_dir, "winners.npy"), mmap_mode='r')
+        self.ev_totals = np.load(os.path.join(out_dir, "ev_totals.npy"), mmap_mode='r')
+        self.rules = self.meta["rules"]
+        self.years = self.meta["years"]
+        self.units = self.meta["units"]
+        self.year_index = {y: i for i, y in enumerate(self.years)}
+        self.unit_index = {u: j for j, u in enumerate(self.units)}
+
+    @property
+    def pvs(self):
+        g = self.meta["pv"]
+        return np.round(g["start"] + np.arange(g["count"]) * g["step"], 10)
+
+    def pv_index(self, pv):
+        """Nearest grid index of a national margin (clamped to the grid)."""
+        g = self.meta["pv"]
+        return int(min(max(round((pv - g["start"]) / g["step"]), 0), g["count"] - 1))
+
+    def _idx(self, year, rule):
+        return self.rules.index(rule), self.year_index[year]
+
+    def winners_at(self, year, pv, rule='three_way'):
+        """{unit: 'D' | 'R' | 'T'} at the grid point nearest pv."""
+        k, i = self._idx(year, rule)
+        row = self.winners[k, i, self.pv_index(pv)]
+        return {u: PARTIES[c - 1] for u, c in zip(self.units, row.tolist()) if c != NO_UNIT}
+
+    def ev_at(self, year, pv, rule='three_way'):
+        """{'D': ev, 'R': ev, 'T': ev} at the grid point nearest pv."""
+        k, i = self._idx(year, rule)
+        return dict(zip(PARTIES, self.ev_totals[k, i, self.pv_index(pv)].tolist()))
+
+    def unit_series(self, year, abbr, rule='three_way'):
+        """Winner codes of one unit along the whole pv grid."""
+        k, i = self._idx(year, rule)
+        return self.winners[k, i, :, self.unit_index[abbr]]
+
+
+def main(infile=DEFAULT_INPUT, out_dir=DEFAULT_OUT_DIR, step=DEFAULT_STEP, rules=RULES):
+    by_year = unit_records.load_by_year(infile, stage="cube")
+    pvs = pv_grid(step)
+    t0 = time.perf_counter()
+    with pipeline_trace.span("cube.compute", years=len(by_year), pvs=len(pvs), rules=len(rules)):
+        winners, ev_totals, years, units = build_cube(by_year, pvs, rules)
+    elapsed = time.perf_counter() - t0
+    meta = {
+        "rules": list(rules),
+        "years": years,
+        "units": units,
+        "pv": {"start": float(pvs[0]), "step": step, "count": len(pvs)},
+        "parties": list(PARTIES),
+        "codes": {"0": "no unit", **{str(i + 1): p for i, p in enumerate(PARTIES)}},
+        "source": os.path.relpath(infile, ROOT),
+        "source_mtime": os.path.getmtime(infile),
+    }
+    with pipeline_trace.span("cube.write"):
+        write_cube(out_dir, winners, ev_totals, meta)
+    size = (winners.nbytes + ev_totals.nbytes) / 1e6
+    print(f"Wrote {'x'.join(map(str, winners.shape))} cube ({size:.1f} MB) to {out_dir} in {elapsed * 1000:.0f} ms")
+    return meta
+
+
+def load_cube(out_dir=DEFAULT_OUT_DIR, infile=DEFAULT_INPUT, step=DEFAULT_STEP, rules=RULES):
+    """
+    The cube in out_dir, rebuilt first when missing, older than the margins CSV, or built
+    with another grid step or rule list.
+    """
+    meta_path = os.path.join(out_dir, "meta.json")
+    stale = not os.path.exists(meta_path) or os.path.getmtime(infile) > os.path.getmtime(meta_path)
+    if not stale:
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        stale = meta["pv"]["step"] != step or meta["rules"] != list(rules)
+    if stale:
+        main(infile, out_dir, step, rules)
+    return ScenarioCube(out_dir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Year x pv x unit uniform-swing winner cube (memory-mapped .npy)")
+    unit_records.add_engine_args(parser, years=False)
+    parser.add_argument("--out-dir", default=DEFAULT_OUT_DIR, help="Output directory")
+    parser.add_argument("--step", type=float, default=DEFAULT_STEP, help=f"pv grid step (default {DEFAULT_STEP})")
+    parser.add_argument("--rules", nargs="+", choices=RULES, default=list(RULES), help="Winner rules to evaluate")
+    parser.add_argument("--lookup", nargs=2, type=float, metavar=("YEAR", "PV"), help="Print EV totals from the cube and exit")
+    args = unit_records.parse_engine_args(parser)
+    if args.lookup:
+        cube = load_cube(args.out_dir, args.input, args.step, tuple(args.rules))
+        year, pv = int(args.lookup[0]), args.lookup[1]
+        for rule in cube.rules:
+            print(rule, cube.ev_at(year, pv, rule))
+    else:
+        main(args.input, args.out_dir, args.step, tuple(args.rules))
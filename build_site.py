@@ -1,13 +1,24 @@
 """Thin wrapper to build the static site using the modular site_builder package."""
 
+import argparse
+
+import pipeline_trace
 from site_builder.main import build_site
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the static site into docs/")
+    parser.add_argument("--trace", help="Write a Chrome trace-event JSON of the build (stages and pages) here")
+    args = parser.parse_args()
+    if args.trace:
+        pipeline_trace.enable(args.trace)
+
     # Build stop colors CSV before generating site
     try:
         import build_stop_colors
-        build_stop_colors.main()
+        with pipeline_trace.span("stop_colors"):
+            build_stop_colors.main()
     except Exception as e:
         print(f"Warning: stop colors CSV not generated: {e}")
-    build_site()
\ No newline at end of file
+    with pipeline_trace.span("site"):
+        build_site()
\ No newline at end of file
@@ -4,18 +4,14 @@ from collections import defaultdict
 from typing import Dict, List, Tuple
 
 import params
+import pipeline_trace
+import unit_records
 
 
 EPS = 1e-4
 PV_CAP = params.TESTER_PV_CAP  # max abs PV shift to consider
 STOP_KEY_PREC = 6  # decimals for stop key matching in JS
-
-
-def parse_float(x, default=0.0):
-    try:
-        return float(x)
-    except Exception:
-        return default
+FIELDNAMES = ['year', 'stop', 'stop_key', 'effective_pv', 'unit', 'winner', 'result_color_name', 'color_css']
 
 
 def load_margins(path_candidates: List[str]) -> List[Dict]:
@@ -27,28 +23,29 @@ def load_margins(path_candidates: List[str]) -> List[Dict]:
 
 
 def build_stop_rows(rows: List[Dict]) -> List[Dict]:
+    """Stop rows for margins rows (csv strings or typed compute_margins() rows)."""
     # Group by year and build stops mirroring tester.js logic
-    by_year: Dict[int, List[Dict]] = defaultdict(list)
+    by_year: Dict[int, List[unit_records.UnitYear]] = defaultdict(list)
     for r in rows:
         try:
-            y = int(r.get('year') or 0)
+            rec = unit_records.from_margin_row(r)
         except Exception:
             continue
-        if not y:
+        if not rec.year:
             continue
-        by_year[y].append(r)
+        by_year[rec.year].append(rec)
 
     out: List[Dict] = []
     for year, lst in by_year.items():
         # Extract nat margin
         nat = None
         for r in lst:
-            if r.get('abbr') in ('NATIONAL', 'NAT'):
-                nat = parse_float(r.get('national_margin'))
+            if r.is_national:
+                nat = r.national_margin
                 break
         if nat is None:
             # fallback: average of national_margin fields if present
-            ms = [parse_float(r.get('national_margin')) for r in lst if r.get('national_margin')]
+            ms = [r.national_margin for r in lst if r.national_margin]
             nat = sum(ms) / len(ms) if ms else 0.0
 
         # Build stops
@@ -64,15 +61,16 @@ def build_stop_rows(rows: List[Dict]) -> List[Dict]:
         stop_to_eff[nat] = nat
 
         # helper to classify and append an output row for a single unit/stop
-        def classify_and_append(s: float, eff: float, r: Dict):
-            abbr = r.get('abbr')
-            rm = parse_float(r.get('relative_margin'))
-            tp = parse_float(r.get('third_party_share'))
-            nat = parse_float(r.get('national_margin'))
+        def classify_and_append(s: float, eff: float, r: unit_records.UnitYear):
+            abbr = r.abbr
+            rm = r.relative_margin
+            tp = r.third_party_share
+            nat = r.national_margin
+            total = r.total_votes
             original_margins = {
-                'D': parse_float(r['D_votes']) / parse_float(r.get('total_votes')) if r.get('total_votes') else 0,
-                'R': parse_float(r['R_votes']) / parse_float(r.get('total_votes')) if r.get('total_votes') else 0,
-                'T': parse_float(r['T_votes']) / parse_float(r.get('total_votes')) if r.get('total_votes') else 0,
+                'D': r.D_votes / total if total else 0,
+                'R': r.R_votes / total if total else 0,
+                'T': r.T_votes / total if total else 0,
             }
             original_winner = max(original_margins, key=lambda k: original_margins.get(k, 0))
             a_local = 3 * tp - 1
@@ -125,11 +123,11 @@ def build_stop_rows(rows: List[Dict]) -> List[Dict]:
             })
 
         for r in lst:
-            abbr = r.get('abbr')
-            if not abbr or abbr in ('NATIONAL', 'NAT'):
+            abbr = r.abbr
+            if not abbr or r.is_national:
                 continue
-            rm = parse_float(r.get('relative_margin'))
-            t = parse_float(r.get('third_party_share'))
+            rm = r.relative_margin
+            t = r.third_party_share
             a = 3 * t - 1
             if abbr == 'AL' and year == 1948:
                 a = 0.0
@@ -168,26 +166,40 @@ def build_stop_rows(rows: List[Dict]) -> List[Dict]:
     return out
 
 
+def write_stop_rows(out_rows: List[Dict], outfile: str):
+    with open(outfile, 'w', newline='', encoding='utf-8') as f:
+        w = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        w.writeheader()
+        w.writerows(out_rows)
+
+
 def main():
     root = os.path.dirname(__file__)
     # Prefer root CSV, fall back to docs CSV
-    rows = load_margins([
-        os.path.join(root, 'presidential_margins.csv'),
-        os.path.join(root, 'docs', 'presidential_margins.csv'),
-    ])
-    out_rows = build_stop_rows(rows)
+    with pipeline_trace.span("stops.load") as sp:
+        rows = load_margins([
+            os.path.join(root, 'presidential_margins.csv'),
+            os.path.join(root, 'docs', 'presidential_margins.csv'),
+        ])
+        sp.set(rows=len(rows))
+    with pipeline_trace.span("stops.build") as sp:
+        out_rows = build_stop_rows(rows)
+        sp.set(rows=len(out_rows))
 
     # Ensure docs exists
     docs_dir = os.path.join(root, 'docs')
     os.makedirs(docs_dir, exist_ok=True)
     outfile = os.path.join(docs_dir, 'stop_colors.csv')
-    with open(outfile, 'w', newline='', encoding='utf-8') as f:
-        w = csv.DictWriter(f, fieldnames=['year', 'stop', 'stop_key', 'effective_pv', 'unit', 'winner', 'result_color_name', 'color_css'])
-        w.writeheader()
-        for r in out_rows:
-            w.writerow(r)
+    with pipeline_trace.span("stops.write", rows=len(out_rows)):
+        write_stop_rows(out_rows, outfile)
     print(f"Wrote {len(out_rows)} rows to {outfile}")
 
 
 if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Precompute tester stop colors (docs/stop_colors.csv)")
+    parser.add_argument("--trace", help="Write a Chrome trace-event JSON of the build stages here")
+    args = parser.parse_args()
+    if args.trace:
+        pipeline_trace.enable(args.trace)
     main()
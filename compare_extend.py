@@ -5,12 +5,15 @@ compare_extend.py
 Small CLI tool to:
 - compare two CSV files on shared keys (default: year + state_po) and report cell-level discrepancies
 - extend/create a new CSV for a given year range (start year .. 2024) using a larger source file
+- diff two CSVs column-wise with numeric tolerances (see diff_engine.py); preferred over
+  `check` for large files and for spotting fractional drift
 
 Usage examples (PowerShell):
     python compare_extend.py check --a presidential_margins.csv --b 1900_2024_election_results.fixed.csv --out diffs.csv
     python compare_extend.py extend --source 1900_2024_election_results.fixed.csv --start-year 1972 --out presidential_margins_1972_2024.csv
+    python compare_extend.py diff --a presidential_margins.csv --b presidential_margins_v1.csv --atol 1e-9 --out diffs.csv
 
-The script uses only Python stdlib (csv, argparse) so no extra dependencies are required.
+check and extend use only the Python stdlib (csv, argparse); diff needs pandas/numpy.
 """
 import argparse
 import csv
@@ -182,8 +185,38 @@ def main():
     pe.add_argument('--cols', help='Optional comma-separated list of columns to keep (in order)')
     pe.add_argument('--end-year', type=int, default=2024, help='End year (default: 2024)')
 
+    pd_ = sub.add_parser('diff', help='Columnar, tolerance-aware diff of two CSVs (per-column summary + detail)')
+    pd_.add_argument('--a', required=True, help='First CSV file (A)')
+    pd_.add_argument('--b', required=True, help='Second CSV file (B)')
+    pd_.add_argument('--keys', default='year,abbr', help='Comma-separated key columns (default: year,abbr)')
+    pd_.add_argument('--atol', type=float, default=1e-9, help='Absolute tolerance for numeric cells (default: 1e-9)')
+    pd_.add_argument('--rtol', type=float, default=0.0, help='Relative tolerance for numeric cells (default: 0)')
+    pd_.add_argument('--cols', help='Optional comma-separated list of columns to compare (default: all shared)')
+    pd_.add_argument('--out', help='Optional path to stream the detailed diff CSV to')
+    pd_.add_argument('--summary-json', help='Optional path to write the per-column summary as JSON')
+    pd_.add_argument('--block-size', type=int, default=50_000, help='Rows compared per block')
+
     args = p.parse_args()
-    if args.cmd == 'check':
+    if args.cmd == 'diff':
+        import json
+        from diff_engine import diff_files, format_summary
+        keys = [k.strip() for k in args.keys.split(',') if k.strip()]
+        cols = [c.strip() for c in args.cols.split(',') if c.strip()] if args.cols else None
+        try:
+            summary = diff_files(args.a, args.b, keys, out_path=args.out, atol=args.atol, rtol=args.rtol,
+                                 columns=cols, block_size=args.block_size)
+        except Exception as e:
+            print('Error:', e)
+            sys.exit(3)
+        print(format_summary(summary))
+        if args.out:
+            print(f"Wrote discrepancies to {args.out}")
+        if args.summary_json:
+            with open(args.summary_json, 'w', encoding='utf-8') as f:
+                json.dump(summary.as_dict(), f, indent=2)
+            print(f"Wrote summary to {args.summary_json}")
+        sys.exit(0 if summary.differing_cells == 0 else 2)
+    elif args.cmd == 'check':
         keys = [k.strip() for k in args.keys.split(',') if k.strip()]
         try:
             diffs = compare_files(args.a, args.b, keys, out_path=args.out)
@@ -0,0 +1,203 @@
+"""
+Cheapest way to deny every party an Electoral College majority (forcing a House
+contingent election), with three-way units.
+
+build_flip_results collapses each year to winner vs runner-up. Here every unit can
+go to any of D, R, T. Moving unit u from its winner w to party x switches a voters
+from w and b from the remaining party o to x, as few as possible in total such that
+
+  x + a + b > w - a   and   x + a + b > o - b
+
+In a close three-way unit taking voters from both is cheaper than from w alone (w=100,
+o=99, x=0: 34 + 33 = 67 instead of 100). Alabama's split slates come from
+unit_records.SPLIT_SLATES (1960 D/T = 5 D + 6 T, 1948 D/T = 11 T, an R win = all R).
+
+A 2-D DP over (final D EVs, final R EVs) (T is the rest) starts at the actual result
+and takes each unit's moves as NumPy-sliced minimum updates, limited to the box of
+states reachable so far; the answer is the cheapest cell where D, R and T are all
+below the majority.
+
+Output: docs/contingent_flip.csv (one row per year) and
+docs/contingent_flip_details.csv (the moved units, with the switches from the winner
+and from the other party).
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+import pipeline_trace
+import unit_records
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_INPUT = unit_records.DEFAULT_INPUT
+DEFAULT_OUTPUT = os.path.join(ROOT, "docs", "contingent_flip.csv")
+DEFAULT_DETAILS = os.path.join(ROOT, "docs", "contingent_flip_details.csv")
+FIELDNAMES = ['year', 'total_ev', 'need', 'D_ev', 'R_ev', 'T_ev', 'min_votes',
+              'D_ev_after', 'R_ev_after', 'T_ev_after', 'units_moved', 'moves']
+DETAIL_FIELDS = ['year', 'abbr', 'ev', 'from_party', 'to_party', 'votes', 'from_winner', 'from_other']
+INF = 10**18
+
+PARTIES = unit_records.PARTIES
+allocation = unit_records.allocation
+
+
+def _ceil_div(n, d):
+    return -(-n // d)
+
+
+def switches(u, to_party):
+    """(from_winner, from_other): fewest switched voters that make to_party carry the unit."""
+    votes = {'D': u.D_votes, 'R': u.R_votes, 'T': u.T_votes}
+    w = votes[u.party_win]
+    x = votes[to_party]
+    o = votes[next(p for p in PARTIES if p not in (u.party_win, to_party))]
+
+    def required(s):
+        # least (a, b) for a total of s switches: x + s > w - a and x + s > o - b
+        return max(0, w - x - s + 1), max(0, o - x - s + 1)
+
+    # sum(required(s)) is piecewise linear and non-increasing in s, so the least s with
+    # sum(required(s)) <= s is at one of the breakpoints or piece solutions below
+    candidates = [_ceil_div(w + o - 2 * x + 2, 3), _ceil_div(w - x + 1, 2), o - x + 1, w - x + 1]
+    s = min(c for c in candidates if c >= 0 and sum(required(c)) <= c)
+    a, b = required(s)
+    return s - b, b  # any slack goes to the winner's voters
+
+
+def move_cost(u, to_party):
+    """Switched voters (from the winner and the other party) for to_party to carry the unit."""
+    return sum(switches(u, to_party))
+
+
+def solve_year(records):
+    """Summary row and move rows for one year's UnitYear records."""
+    # smallest units first: the reachable box (and the work per unit) grows as late as possible
+    units = sorted((r for r in records if not r.is_national and r.electoral_votes > 0),
+                   key=lambda u: (u.electoral_votes, u.abbr))
+    year = records[0].year
+    base = [0, 0, 0]
+    options = []  # per unit: [(to_party, dD, dR, cost)]
+    for u in units:
+        cur = allocation(u, u.party_win)
+        for k in range(3):
+            base[k] += cur[k]
+        opts = []
+        for x in PARTIES:
+            if x == u.party_win:
+                continue
+            new = allocation(u, x)
+            dD, dR = new[0] - cur[0], new[1] - cur[1]
+            if dD == 0 and dR == 0:
+                continue  # same slate either way (AL D/T)
+            opts.append((x, dD, dR, move_cost(u, x)))
+        options.append(opts)
+    total = sum(base)
+    need = total // 2 + 1
+
+    # most D / R EVs the units from k on can still take away; a state with more than
+    # need - 1 + that can't end below the majority, so the box stops there
+    drop_d = [0] * (len(units) + 1)
+    drop_r = [0] * (len(units) + 1)
+    for k in range(len(units) - 1, -1, -1):
+        drop_d[k] = drop_d[k + 1] + max([0] + [-o[1] for o in options[k]])
+        drop_r[k] = drop_r[k + 1] + max([0] + [-o[2] for o in options[k]])
+
+    n = total + 1
+    dp = np.full((n, n), INF, dtype=np.int64)
+    dp[base[0], base[1]] = 0
+    choice = np.zeros((len(units), n, n), dtype=np.int8)
+    # reachable bounding box; each unit's moves are sliced minimum updates inside it
+    lo_d = hi_d = base[0]
+    lo_r = hi_r = base[1]
+    for k, opts in enumerate(options):
+        if not opts:
+            continue
+        box_d = slice(lo_d, hi_d + 1)
+        box_r = slice(lo_r, hi_r + 1)
+        src = dp[box_d, box_r].copy()  # this unit's moves read the grid before it
+        for o, (_, dD, dR, cost) in enumerate(opts, 1):
+            # target box of this move, clipped to the grid
+            t_lo_d, t_lo_r = max(lo_d + dD, 0), max(lo_r + dR, 0)
+            t_hi_d, t_hi_r = min(hi_d + dD, total), min(hi_r + dR, total)
+            if t_lo_d > t_hi_d or t_lo_r > t_hi_r:
+                continue
+            cand = src[t_lo_d - dD - lo_d:t_hi_d - dD - lo_d + 1, t_lo_r - dR - lo_r:t_hi_r - dR - lo_r + 1] + cost
+            tgt = dp[t_lo_d:t_hi_d + 1, t_lo_r:t_hi_r + 1]
+            better = cand < tgt
+            tgt[better] = cand[better]
+            choice[k, t_lo_d:t_hi_d + 1, t_lo_r:t_hi_r + 1][better] = o
+        lo_d = max(0, min([lo_d] + [lo_d + o[1] for o in opts]))
+        hi_d = min(total, need - 1 + drop_d[k + 1], max([hi_d] + [hi_d + o[1] for o in opts]))
+        lo_r = max(0, min([lo_r] + [lo_r + o[2] for o in opts]))
+        hi_r = min(total, need - 1 + drop_r[k + 1], max([hi_r] + [hi_r + o[2] for o in opts]))
+        if lo_d > hi_d or lo_r > hi_r:
+            break  # nothing reachable can still end below the majority
+
+    # D < need, R < need and T = total - D - R < need
+    d = np.arange(total + 1)[:, None]
+    r = np.arange(total + 1)[None, :]
+    ok = (d < need) & (r < need) & (total - d - r < need) & (total - d - r >= 0)
+    masked = np.where(ok, dp, INF)
+    flat = int(masked.argmin())
+    i, j = divmod(flat, total + 1)
+    cost = int(masked[i, j])
+
+    row = {'year': year, 'total_ev': total, 'need': need,
+           'D_ev': base[0], 'R_ev': base[1], 'T_ev': base[2]}
+    moves = []
+    if cost >= INF:
+        row.update({'min_votes': -1, 'D_ev_after': '', 'R_ev_after': '', 'T_ev_after': '',
+                    'units_moved': 0, 'moves': ''})
+        return row, moves
+    row.update({'min_votes': cost, 'D_ev_after': i, 'R_ev_after': j, 'T_ev_after': total - i - j})
+    for k in range(len(units) - 1, -1, -1):
+        o = int(choice[k, i, j])
+        if o:
+            x, dD, dR, c = options[k][o - 1]
+            u = units[k]
+            from_winner, from_other = switches(u, x)
+            moves.append({'year': year, 'abbr': u.abbr, 'ev': u.electoral_votes,
+                          'from_party': u.party_win, 'to_party': x, 'votes': c,
+                          'from_winner': from_winner, 'from_other': from_other})
+            i, j = i - dD, j - dR
+    moves.sort(key=lambda m: (m['votes'], m['abbr']))
+    row['units_moved'] = len(moves)
+    row['moves'] = ' '.join(f"{m['abbr']}:{m['from_party']}>{m['to_party']}" for m in moves)
+    return row, moves
+
+
+def compute(records_by_year):
+    rows, details = [], []
+    for year in sorted(records_by_year):
+        with pipeline_trace.span("contingent.solve", cat="solve", year=year):
+            row, moves = solve_year(records_by_year[year])
+        rows.append(row)
+        details.extend(moves)
+    return rows, details
+
+
+def write_rows(rows, details, outfile=DEFAULT_OUTPUT, details_out=DEFAULT_DETAILS):
+    unit_records.write_csv(rows, FIELDNAMES, outfile)
+    unit_records.write_csv(details, DETAIL_FIELDS, details_out)
+
+
+def main(infile=DEFAULT_INPUT, outfile=DEFAULT_OUTPUT, details_out=DEFAULT_DETAILS, years=None):
+    by_year = unit_records.load_by_year(infile, years, "contingent")
+    t0 = time.perf_counter()
+    rows, details = compute(by_year)
+    elapsed = time.perf_counter() - t0
+    with pipeline_trace.span("contingent.write", rows=len(rows)):
+        write_rows(rows, details, outfile, details_out)
+    print(f"Wrote {outfile} ({len(rows)} years) and {details_out} ({len(details)} rows) in {elapsed * 1000:.0f} ms")
+    return rows, details
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cheapest flips that deny every party a majority (docs/contingent_flip*.csv)")
+    unit_records.add_engine_args(parser, DEFAULT_OUTPUT, "Summary CSV")
+    parser.add_argument("--details-out", default=DEFAULT_DETAILS, help="Moved-units CSV")
+    args = unit_records.parse_engine_args(parser)
+    main(args.input, args.out, args.details_out, args.year)
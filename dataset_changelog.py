@@ -0,0 +1,207 @@
+"""Row-digest changelog between two builds of a keyed CSV (default: presidential_margins.csv).
+
+Every row gets a content digest (blake2b over its values for the columns both
+versions share). The two versions are compared in a single streaming pass: both
+files are sorted by (year, abbr) as written by the builders, so a merge-join over
+two csv readers sees each row once and keeps only the current pair in memory. If
+either file turns out not to be sorted, the comparison falls back to an in-memory
+key index.
+
+Only rows whose digests differ are compared column by column. The changelog is JSON:
+
+  {"old": ..., "new": ..., "keys": ["year", "abbr"],
+   "counts": {"added": n, "removed": n, "modified": n, "unchanged": n},
+   "added": [[1968, "AL"], ...], "removed": [...],
+   "modified": [{"key": [1968, "AL"], "columns": ["D_votes", ...]}, ...],
+   "columns_added": [...], "columns_removed": [...]}
+
+Downstream stages read it with load_changelog() / affected_units() / affected_years()
+to limit their work to the units that changed (e.g. `do_all_plots.py --changelog`).
+
+Run:
+  python dataset_changelog.py OLD.csv NEW.csv [--out changelog.json]
+"""
+import argparse
+import csv
+import hashlib
+import json
+from pathlib import Path
+
+
+KEY_COLS = ("year", "abbr")
+DEFAULT_CHANGELOG = Path("presidential_margins.changelog.json")
+
+
+class UnsortedInput(Exception):
+    """Raised by the streaming pass when a file is not sorted by its keys."""
+
+
+def row_digest(row, columns):
+    h = hashlib.blake2b(digest_size=16)
+    h.update("\x1f".join(row.get(c) or "" for c in columns).encode("utf-8"))
+    return h.digest()
+
+
+def _key(row, key_cols):
+    # year sorts numerically, like the builders write it
+    return tuple(int(row[c]) if c == "year" else row[c] for c in key_cols)
+
+
+def _iter_keyed(reader, key_cols, check_sorted):
+    prev = None
+    for row in reader:
+        key = _key(row, key_cols)
+        if check_sorted and prev is not None and key <= prev:
+            raise UnsortedInput(f"rows not sorted by {key_cols} at {key}")
+        prev = key
+        yield key, row
+
+
+def _changed_columns(old_row, new_row, columns):
+    return [c for c in columns if (old_row.get(c) or "") != (new_row.get(c) or "")]
+
+
+class _Changes:
+    def __init__(self):
+        self.added = []
+        self.removed = []
+        self.modified = []
+        self.unchanged = 0
+
+    def compare(self, key, old_row, new_row, columns):
+        if row_digest(old_row, columns) == row_digest(new_row, columns):
+            self.unchanged += 1
+        else:
+            self.modified.append({"key": list(key), "columns": _changed_columns(old_row, new_row, columns)})
+
+
+def _streaming_pass(old_reader, new_reader, key_cols, columns):
+    """Merge-join two key-sorted readers in one pass."""
+    changes = _Changes()
+    old_it = _iter_keyed(old_reader, key_cols, True)
+    new_it = _iter_keyed(new_reader, key_cols, True)
+    old = next(old_it, None)
+    new = next(new_it, None)
+    while old is not None or new is not None:
+        if new is None or (old is not None and old[0] < new[0]):
+            changes.removed.append(list(old[0]))
+            old = next(old_it, None)
+        elif old is None or new[0] < old[0]:
+            changes.added.append(list(new[0]))
+            new = next(new_it, None)
+        else:
+            changes.compare(old[0], old[1], new[1], columns)
+            old = next(old_it, None)
+            new = next(new_it, None)
+    return changes
+
+
+def _indexed_pass(old_reader, new_reader, key_cols, columns):
+    """Fallback for unsorted inputs: index the old file by key, stream the new one."""
+    changes = _Changes()
+    old_index = {key: row for key, row in _iter_keyed(old_reader, key_cols, False)}
+    for key, row in _iter_keyed(new_reader, key_cols, False):
+        old_row = old_index.pop(key, None)
+        if old_row is None:
+            changes.added.append(list(key))
+        else:
+            changes.compare(key, old_row, row, columns)
+    changes.removed = sorted(list(k) for k in old_index)
+    changes.added.sort()
+    changes.modified.sort(key=lambda m: m["key"])
+    return changes
+
+
+def build_changelog(old_path, new_path, key_cols=KEY_COLS):
+    """Compare two CSV versions and return the changelog dict."""
+    key_cols = tuple(key_cols)
+
+    def run(pass_fn):
+        with open(old_path, newline="", encoding="utf-8") as fo, open(new_path, newline="", encoding="utf-8") as fn:
+            old_reader = csv.DictReader(fo)
+            new_reader = csv.DictReader(fn)
+            old_cols = old_reader.fieldnames or []
+            new_cols = new_reader.fieldnames or []
+            missing = [c for c in key_cols if c not in old_cols or c not in new_cols]
+            if missing:
+                raise KeyError(f"Key column(s) {missing} not found in both files")
+            columns = [c for c in new_cols if c in old_cols and c not in key_cols]
+            return pass_fn(old_reader, new_reader, key_cols, columns), old_cols, new_cols
+
+    try:
+        changes, old_cols, new_cols = run(_streaming_pass)
+    except UnsortedInput:
+        changes, old_cols, new_cols = run(_indexed_pass)
+
+    return {
+        "old": str(old_path),
+        "new": str(new_path),
+        "keys": list(key_cols),
+        "counts": {
+            "added": len(changes.added),
+            "removed": len(changes.removed),
+            "modified": len(changes.modified),
+            "unchanged": changes.unchanged,
+        },
+        "columns_added": [c for c in new_cols if c not in old_cols],
+        "columns_removed": [c for c in old_cols if c not in new_cols],
+        "added": changes.added,
+        "removed": changes.removed,
+        "modified": changes.modified,
+    }
+
+
+def write_changelog(changelog, out_path=DEFAULT_CHANGELOG):
+    Path(out_path).write_text(json.dumps(changelog, indent=1), encoding="utf-8")
+
+
+def load_changelog(path=DEFAULT_CHANGELOG):
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def affected_keys(changelog):
+    """Set of key tuples that were added, removed or modified."""
+    keys = {tuple(k) for k in changelog["added"]}
+    keys.update(tuple(k) for k in changelog["removed"])
+    keys.update(tuple(m["key"]) for m in changelog["modified"])
+    return keys
+
+
+def affected_units(changelog):
+    """Set of abbr values with any change (assumes the default (year, abbr) keys)."""
+    i = changelog["keys"].index("abbr")
+    return {k[i] for k in affected_keys(changelog)}
+
+
+def affected_years(changelog):
+    """Set of years with any change (assumes the default (year, abbr) keys)."""
+    i = changelog["keys"].index("year")
+    return {int(k[i]) for k in affected_keys(changelog)}
+
+
+def is_structural(changelog):
+    """True when columns were added/removed, i.e. every consumer should rebuild everything."""
+    return bool(changelog["columns_added"] or changelog["columns_removed"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Row-digest changelog between two versions of a keyed CSV")
+    parser.add_argument("old", help="Previous version of the CSV")
+    parser.add_argument("new", help="New version of the CSV")
+    parser.add_argument("--keys", default=",".join(KEY_COLS), help="Comma-separated key columns (default: year,abbr)")
+    parser.add_argument("--out", default=str(DEFAULT_CHANGELOG), help="Changelog JSON path")
+    args = parser.parse_args()
+
+    keys = [k.strip() for k in args.keys.split(",") if k.strip()]
+    changelog = build_changelog(args.old, args.new, keys)
+    write_changelog(changelog, args.out)
+    c = changelog["counts"]
+    print(f"added {c['added']}, removed {c['removed']}, modified {c['modified']}, unchanged {c['unchanged']}")
+    if "abbr" in keys and "year" in keys:
+        units = sorted(affected_units(changelog))
+        print(f"Affected units ({len(units)}): {', '.join(units[:30])}{' ...' if len(units) > 30 else ''}")
+    print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
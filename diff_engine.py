@@ -0,0 +1,261 @@
+"""Columnar, tolerance-aware diff of two keyed CSV files.
+
+Used by `compare_extend.py diff`. Both files are read with pandas as stripped text,
+aligned on the key columns with one sorted outer merge, and compared column by column
+in row blocks:
+
+- cells are equal when the stripped text matches
+- differing cells that parse as numbers on both sides are equal when
+  np.isclose(a, b, atol, rtol) holds, so fractional drift (e.g. in margins) is
+  reported instead of being truncated away, and 0.10 vs 0.1 is not a difference
+- anything else that differs is a text difference
+
+Detail rows carry the cells' source text (a_value / b_value), and the numeric
+difference in `diff` (exact for integers). Keys present in only one file get a
+detail row with column ONE_SIDED_COLUMN and 'present' / 'missing' values.
+
+Detail rows are yielded block by block so large files can be streamed straight to
+disk; the per-column summary is accumulated along the way.
+"""
+import csv
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+DETAIL_COLUMNS = ['key', 'column', 'a_value', 'b_value', 'diff']
+DEFAULT_BLOCK_SIZE = 50_000
+ONE_SIDED_COLUMN = '(row)'
+_INT_RE = r'[+-]?\d+'
+
+
+@dataclass
+class ColumnSummary:
+    column: str
+    compared: int = 0
+    differing: int = 0
+    numeric_differing: int = 0
+    text_differing: int = 0
+    max_abs_diff: float = 0.0
+    sum_abs_diff: float = 0.0
+
+    @property
+    def mean_abs_diff(self) -> float:
+        return self.sum_abs_diff / self.numeric_differing if self.numeric_differing else 0.0
+
+    def as_dict(self) -> Dict:
+        return {
+            'column': self.column,
+            'compared': self.compared,
+            'differing': self.differing,
+            'numeric_differing': self.numeric_differing,
+            'text_differing': self.text_differing,
+            'max_abs_diff': self.max_abs_diff,
+            'mean_abs_diff': self.mean_abs_diff,
+        }
+
+
+@dataclass
+class DiffSummary:
+    path_a: str
+    path_b: str
+    key_cols: List[str]
+    atol: float
+    rtol: float
+    shared_rows: int = 0
+    only_a: int = 0
+    only_b: int = 0
+    columns: Dict[str, ColumnSummary] = field(default_factory=dict)
+    only_a_columns: List[str] = field(default_factory=list)
+    only_b_columns: List[str] = field(default_factory=list)
+
+    @property
+    def differing_cells(self) -> int:
+        return sum(c.differing for c in self.columns.values())
+
+    def as_dict(self) -> Dict:
+        return {
+            'a': self.path_a,
+            'b': self.path_b,
+            'keys': self.key_cols,
+            'atol': self.atol,
+            'rtol': self.rtol,
+            'shared_rows': self.shared_rows,
+            'only_a_rows': self.only_a,
+            'only_b_rows': self.only_b,
+            'only_a_columns': self.only_a_columns,
+            'only_b_columns': self.only_b_columns,
+            'differing_cells': self.differing_cells,
+            'columns': [c.as_dict() for c in self.columns.values()],
+        }
+
+
+def read_keyed(path, key_cols) -> pd.DataFrame:
+    """
+    Read a CSV with every column as stripped text (empty cells are ''); numbers are
+    parsed per block, only where the text differs. One row per key: the last
+    duplicate wins, like compare_files.
+    """
+    df = pd.read_csv(path, dtype=str, keep_default_na=False, encoding='utf-8')
+    missing = [c for c in key_cols if c not in df.columns]
+    if missing:
+        raise KeyError(f"Key column(s) {missing} not found in {path}")
+    for c in df.columns:
+        df[c] = df[c].str.strip()
+    return df.drop_duplicates(subset=key_cols, keep='last')
+
+
+def align(a: pd.DataFrame, b: pd.DataFrame, key_cols, comp_columns):
+    """Sorted outer merge on the keys; returns (shared rows, only-A keys, only-B keys) frames."""
+    merged = pd.merge(
+        a[key_cols + comp_columns], b[key_cols + comp_columns],
+        on=key_cols, how='outer', sort=True, suffixes=('__a', '__b'), indicator=True,
+    )
+    side = merged.pop('_merge')
+    shared = merged[side == 'both'].reset_index(drop=True)
+    only_a = merged.loc[side == 'left_only', key_cols].reset_index(drop=True)
+    only_b = merged.loc[side == 'right_only', key_cols].reset_index(drop=True)
+    return shared, only_a, only_b
+
+
+def _join_keys(frame: pd.DataFrame, key_cols) -> pd.Series:
+    return frame[key_cols[0]].str.cat(frame[key_cols[1:]], sep='|') if len(key_cols) > 1 else frame[key_cols[0]]
+
+
+def one_sided_details(only_a: pd.DataFrame, only_b: pd.DataFrame, key_cols) -> pd.DataFrame:
+    """Detail rows for keys present in only one of the files."""
+    frames = [
+        pd.DataFrame({'key': _join_keys(keys, key_cols).to_numpy(), 'column': ONE_SIDED_COLUMN,
+                      'a_value': a_value, 'b_value': b_value, 'diff': 'N/A'})
+        for keys, a_value, b_value in ((only_a, 'present', 'missing'), (only_b, 'missing', 'present'))
+        if len(keys)
+    ]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=DETAIL_COLUMNS)
+
+
+def _as_float(values: pd.Series) -> np.ndarray:
+    return pd.to_numeric(values, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+
+
+def diff_block(block: pd.DataFrame, keys: pd.Series, column: str, summary: ColumnSummary,
+               atol: float, rtol: float) -> Optional[pd.DataFrame]:
+    """Compare one column over one block of aligned rows; returns detail rows or None."""
+    va = block[f'{column}__a']
+    vb = block[f'{column}__b']
+    n = len(block)
+    summary.compared += n
+
+    # text first; only cells whose text differs are tried as numbers
+    sa = va.to_numpy(dtype=str)
+    sb = vb.to_numpy(dtype=str)
+    differs = sa != sb
+    fa = np.full(n, np.nan)
+    fb = np.full(n, np.nan)
+    if differs.any():
+        fa[differs] = _as_float(va[differs])
+        fb[differs] = _as_float(vb[differs])
+        both = differs & ~np.isnan(fa) & ~np.isnan(fb)
+        differs[both] = ~np.isclose(fa[both], fb[both], atol=atol, rtol=rtol)
+
+    n_diff = int(differs.sum())
+    if not n_diff:
+        return None
+    numeric = ~np.isnan(fa) & ~np.isnan(fb)
+    num_diff = differs & numeric
+    abs_diff = np.abs(fa[num_diff] - fb[num_diff])
+    summary.differing += n_diff
+    summary.numeric_differing += int(num_diff.sum())
+    summary.text_differing += int((differs & ~numeric).sum())
+    if abs_diff.size:
+        summary.max_abs_diff = max(summary.max_abs_diff, float(abs_diff.max()))
+        summary.sum_abs_diff += float(abs_diff.sum())
+
+    delta = np.where(numeric, fa - fb, np.nan)[differs]
+    diff = np.where(np.isnan(delta), 'N/A', delta.astype(str)).astype(object)
+    # integer cells on both sides: exact integer difference instead of a float string
+    da, db = va[differs], vb[differs]
+    ints = (da.str.fullmatch(_INT_RE) & db.str.fullmatch(_INT_RE)).to_numpy()
+    if ints.any():
+        diff[ints] = (da[ints].astype(np.int64).to_numpy() - db[ints].astype(np.int64).to_numpy()).astype(str)
+    return pd.DataFrame({
+        'key': keys[differs].to_numpy(),
+        'column': column,
+        'a_value': da.to_numpy(),
+        'b_value': db.to_numpy(),
+        'diff': diff,
+    })
+
+
+def iter_diffs(path_a, path_b, key_cols, atol=1e-9, rtol=0.0, columns=None,
+               block_size=DEFAULT_BLOCK_SIZE, summary: Optional[DiffSummary] = None) -> Iterator[pd.DataFrame]:
+    """
+    Yield detail frames (DETAIL_COLUMNS) block by block. Pass a DiffSummary to have
+    it filled in as the blocks are produced.
+    """
+    a = read_keyed(path_a, key_cols)
+    b = read_keyed(path_b, key_cols)
+    comp_columns = [c for c in a.columns if c in b.columns and c not in key_cols]
+    if columns:
+        comp_columns = [c for c in comp_columns if c in columns]
+
+    if summary is None:
+        summary = DiffSummary(str(path_a), str(path_b), list(key_cols), atol, rtol)
+    summary.only_a_columns = [c for c in a.columns if c not in b.columns]
+    summary.only_b_columns = [c for c in b.columns if c not in a.columns]
+    summary.columns = {c: ColumnSummary(c) for c in comp_columns}
+
+    shared, only_a, only_b = align(a, b, list(key_cols), comp_columns)
+    summary.shared_rows = len(shared)
+    summary.only_a, summary.only_b = len(only_a), len(only_b)
+    del a, b
+    if len(only_a) or len(only_b):
+        yield one_sided_details(only_a, only_b, list(key_cols))
+
+    for start in range(0, len(shared), block_size):
+        block = shared.iloc[start:start + block_size]
+        keys = _join_keys(block, key_cols)
+        for column in comp_columns:
+            details = diff_block(block, keys, column, summary.columns[column], atol, rtol)
+            if details is not None:
+                yield details
+
+
+def diff_files(path_a, path_b, key_cols, out_path=None, atol=1e-9, rtol=0.0, columns=None,
+               block_size=DEFAULT_BLOCK_SIZE) -> DiffSummary:
+    """Run the diff, streaming detail rows to out_path (CSV) when given; returns the summary."""
+    summary = DiffSummary(str(path_a), str(path_b), list(key_cols), atol, rtol)
+    blocks = iter_diffs(path_a, path_b, key_cols, atol=atol, rtol=rtol, columns=columns,
+                        block_size=block_size, summary=summary)
+    if out_path is None:
+        for _ in blocks:
+            pass
+        return summary
+    with open(out_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(DETAIL_COLUMNS)
+        for details in blocks:
+            writer.writerows(details.itertuples(index=False, name=None))
+    return summary
+
+
+def format_summary(summary: DiffSummary) -> str:
+    lines = [
+        f"A: {summary.path_a}",
+        f"B: {summary.path_b}",
+        f"Keys: {', '.join(summary.key_cols)}  (atol={summary.atol:g}, rtol={summary.rtol:g})",
+        f"Shared rows: {summary.shared_rows:,}   only in A: {summary.only_a:,}   only in B: {summary.only_b:,}",
+    ]
+    if summary.only_a_columns:
+        lines.append(f"Columns only in A: {', '.join(summary.only_a_columns)}")
+    if summary.only_b_columns:
+        lines.append(f"Columns only in B: {', '.join(summary.only_b_columns)}")
+    lines.append(f"{'column':<36} {'differing':>10} {'numeric':>9} {'text':>7} {'max |diff|':>14} {'mean |diff|':>14}")
+    for c in summary.columns.values():
+        if not c.differing:
+            continue
+        lines.append(f"{c.column:<36} {c.differing:>10,} {c.numeric_differing:>9,} {c.text_differing:>7,} "
+                     f"{c.max_abs_diff:>14.6g} {c.mean_abs_diff:>14.6g}")
+    lines.append(f"Differing cells: {summary.differing_cells:,} across {len(summary.columns)} compared columns")
+    return '\n'.join(lines)
@@ -2,12 +2,14 @@ import argparse
 import os
 from typing import List, Tuple
 
-from statsmodels.nonparametric.smoothers_lowess import lowess
-from scipy.interpolate import UnivariateSpline
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
+# statsmodels (LOESS) and scipy (splines) are imported where the smoothing overlays are
+# drawn; they are slow to import and nothing else here needs them. The imports sit outside
+# the overlays' try blocks, so a missing package fails the build instead of every plot.
 
+import pipeline_trace
 import utils
 from params import SPECIAL_1968_STATES
 
@@ -30,7 +32,7 @@ def _apply_axes_styling(ax, years: np.ndarray, y_label: str, title: str, zero_li
     if y_tick_as_lean:
         y_vals = ax.get_yticks()
         ax.set_yticks(y_vals)
-        ax.set_yticklabels([utils.lean_str(v, third_party=lean_is_third_party) for v in y_vals], color="white")
+        ax.set_yticklabels(utils.lean_str_array(y_vals, third_party=lean_is_third_party).tolist(), color="white")
     ax.grid(True, alpha=0.3)
     if zero_line:
         ax.axhline(0, color="red", linestyle="--", linewidth=1)
@@ -69,11 +71,11 @@ def _line_margins(ax, years: np.ndarray, state_values: np.ndarray | None, nat_va
         ax.scatter(years, state_values, c=pres_colors, s=60, zorder=3, label=f"{state_label} Results")
 
     if label_points and nat_values is not None:
-        for (x, y) in zip(years, nat_values):
+        for x, y, label in zip(years, nat_values, utils.lean_str_array(np.asarray(nat_values, dtype=float)).tolist()):
             ax.text(
                 x,
                 y + (0.01 if y > 0 else -0.01),
-                f"{utils.lean_str(y)}",
+                label,
                 fontsize=12,
                 ha="center",
                 va="bottom" if y > 0 else "top",
@@ -118,14 +120,14 @@ def _bar_values(ax, years: np.ndarray, values: np.ndarray, title: str, y_label:
         else:
             colors = _color_by_sign(values, years, state, special_year=special_year_for_state)
     bars = ax.bar(x_idx, values, width=0.4, color=colors)
-    ax.bar_label(bars, labels=[utils.lean_str(v, third_party=lean_is_third_party) for v in values], padding=4,
+    ax.bar_label(bars, labels=utils.lean_str_array(np.asarray(values, dtype=float), third_party=lean_is_third_party).tolist(), padding=4,
                  fontsize=12, color="white")
     ax.set_title(title)
     ax.set_xlabel("Year")
     ax.set_ylabel(y_label)
     y_vals = ax.get_yticks()
     ax.set_yticks(y_vals)
-    ax.set_yticklabels([utils.lean_str(y, third_party=lean_is_third_party) for y in y_vals], color="white")
+    ax.set_yticklabels(utils.lean_str_array(y_vals, third_party=lean_is_third_party).tolist(), color="white")
     ax.grid(True, alpha=0.3)
     ax.axhline(0, color="red", linestyle="--", linewidth=1)
     ax.set_xticks(x_idx)
@@ -147,13 +149,13 @@ def _bar_deltas(ax, years: np.ndarray, deltas: np.ndarray, title: str, y_label:
     x_idx = np.arange(len(deltas))
     colors = ["deepskyblue" if d > 0 else "red" for d in deltas]
     bars = ax.bar(x_idx, deltas, width=0.4, color=colors)
-    ax.bar_label(bars, labels=[utils.lean_str(v) for v in deltas], padding=4, fontsize=12, color="white")
+    ax.bar_label(bars, labels=utils.lean_str_array(np.asarray(deltas, dtype=float)).tolist(), padding=4, fontsize=12, color="white")
     ax.set_title(title)
     ax.set_xlabel("Year")
     ax.set_ylabel(y_label)
     y_vals = ax.get_yticks()
     ax.set_yticks(y_vals)
-    ax.set_yticklabels([utils.lean_str(y) for y in y_vals], color="white")
+    ax.set_yticklabels(utils.lean_str_array(y_vals).tolist(), color="white")
     ax.grid(True, alpha=0.3)
     ax.axhline(0, color="red", linestyle="--", linewidth=1)
     ax.set_xticks(x_idx)
@@ -214,11 +216,11 @@ def _build_plot1(state: str, df: pd.DataFrame, out_dir: str, nat_only: bool = Fa
             ax2.scatter(years, state_3p, c=scatter_colors, s=60, zorder=3)
         else:
             # label text only if no state 3rd-party data
-            for (x, y) in zip(years, nat_3p):
+            for x, y, label in zip(years, nat_3p, utils.lean_str_array(np.asarray(nat_3p, dtype=float), third_party=True).tolist()):
                 ax2.text(
                     x,
                     y + 0.01,
-                    f"{utils.lean_str(y, third_party=True)}",
+                    label,
                     fontsize=12,
                     ha="center",
                     va="bottom",
@@ -266,6 +268,8 @@ def _build_plot2(state: str, df: pd.DataFrame, out_dir: str, include_LOESS: bool
 
         # LOESS
         if include_LOESS:
+            # imported outside the try: a missing statsmodels must fail the build, not each plot
+            from statsmodels.nonparametric.smoothers_lowess import lowess
             try:
                 frac = 0.6 if len(x_indices) >= 8 else max(0.25, 3 / max(4, len(x_indices)))
                 loess_res = lowess(rel_sorted, x_indices, frac=frac, return_sorted=True)
@@ -279,6 +283,7 @@ def _build_plot2(state: str, df: pd.DataFrame, out_dir: str, include_LOESS: bool
 
         # Spline with optional regularization (s parameter)
         if include_SPLINE:
+            from scipy.interpolate import UnivariateSpline
             try:
                 # s=0 yields interpolation; larger s yields smoother curve. When
                 # regularization is requested, increase s proportional to n.
@@ -368,6 +373,8 @@ def _build_plot3_two_party(state: str, df: pd.DataFrame, out_dir: str, nat_only:
                     title=f"{state} Relative Two-Party Margin", y_label="Relative Margin", state=state, color_values=color_vals_for_two)
 
         # Add LOESS and spline smoothing overlays for relative two-party margin
+        from scipy.interpolate import UnivariateSpline
+        from statsmodels.nonparametric.smoothers_lowess import lowess
         try:
             x_indices = np.arange(len(years))
             x_dense = np.linspace(x_indices.min(), x_indices.max(), 500)
@@ -410,7 +417,20 @@ def _build_plot3_two_party(state: str, df: pd.DataFrame, out_dir: str, nat_only:
     plt.close(fig)
 
 
-def main(start_year: int | None = None, end_year: int | None = 2024, clear_old_files: bool = False):
+def units_from_changelog(path: str) -> set | None:
+    """Units whose plots need rebuilding per a dataset_changelog.py changelog; None means all."""
+    import dataset_changelog
+    changelog = dataset_changelog.load_changelog(path)
+    units = dataset_changelog.affected_units(changelog)
+    # NATIONAL values are drawn on every state's plots
+    if dataset_changelog.is_structural(changelog) or "NATIONAL" in units:
+        return None
+    return units
+
+
+def main(start_year: int | None = None, end_year: int | None = 2024, clear_old_files: bool = False,
+         only_units: set | None = None, df: pd.DataFrame | None = None):
+    """Build every plot from presidential_margins.csv, or from `df` (same columns) when given."""
     plt.style.use("dark_background")
     # Make plot text larger and more readable across all generated figures
     plt.rcParams.update({
@@ -422,7 +442,8 @@ def main(start_year: int | None = None, end_year: int | None = 2024, clear_old_f
         "legend.fontsize": 12,
         "figure.titlesize": 18,
     })
-    df = pd.read_csv("presidential_margins.csv")
+    if df is None:
+        df = pd.read_csv("presidential_margins.csv")
     
     # Extract national colors for use across all state plots
     national_df = df[df["abbr"] == "NATIONAL"].copy()
@@ -451,32 +472,52 @@ def main(start_year: int | None = None, end_year: int | None = 2024, clear_old_f
     os.makedirs(output_dir, exist_ok=True)
 
     if clear_old_files:
+        # with only_units, clear just the plots about to be rebuilt (NATIONAL is saved as NAT_*)
+        keep_others = only_units is not None
+        clear_units = {"NAT" if u == "NATIONAL" else u for u in (only_units or ())}
         for file in os.listdir(output_dir):
             path = os.path.join(output_dir, file)
-            if os.path.isfile(path) and (file.endswith(".png") or file.endswith(".svg")):
-                os.remove(path)
+            if not (os.path.isfile(path) and (file.endswith(".png") or file.endswith(".svg"))):
+                continue
+            if keep_others and file.split("_plot")[0] not in clear_units:
+                continue
+            os.remove(path)
 
     # NATIONAL first (two plots)
     nat_df = df[df["abbr"] == "NATIONAL"].copy()
-    if not nat_df.empty:
-        _build_plot1("NAT", nat_df, output_dir, nat_only=True, national_colors_by_year=national_colors_by_year)
-        _build_plot3_two_party("NAT", nat_df, output_dir, nat_only=True, national_colors_by_year=national_colors_by_year)
+    if not nat_df.empty and (only_units is None or "NATIONAL" in only_units):
+        with pipeline_trace.span("plot1", cat="plot", unit="NAT", rows=len(nat_df)):
+            _build_plot1("NAT", nat_df, output_dir, nat_only=True, national_colors_by_year=national_colors_by_year)
+        with pipeline_trace.span("plot3_two_party", cat="plot", unit="NAT", rows=len(nat_df)):
+            _build_plot3_two_party("NAT", nat_df, output_dir, nat_only=True, national_colors_by_year=national_colors_by_year)
 
     # States
     for state in sorted(x for x in df["abbr"].unique() if x != "NATIONAL"):
+        if only_units is not None and state not in only_units:
+            continue
         state_df = df[df["abbr"] == state].copy()
         if state_df.empty:
             continue
-        _build_plot1(state, state_df, output_dir, national_colors_by_year=national_colors_by_year)
-        _build_plot2(state, state_df, output_dir)
-        _build_plot3_two_party(state, state_df, output_dir, national_colors_by_year=national_colors_by_year)
+        with pipeline_trace.span("plot1", cat="plot", unit=state, rows=len(state_df)):
+            _build_plot1(state, state_df, output_dir, national_colors_by_year=national_colors_by_year)
+        with pipeline_trace.span("plot2", cat="plot", unit=state, rows=len(state_df)):
+            _build_plot2(state, state_df, output_dir)
+        with pipeline_trace.span("plot3_two_party", cat="plot", unit=state, rows=len(state_df)):
+            _build_plot3_two_party(state, state_df, output_dir, national_colors_by_year=national_colors_by_year)
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Build new plot set (plot1, plot2, plot3_two_party) per state + NAT")
     parser.add_argument("--start-year", type=int, default=None)
     parser.add_argument("--end-year", type=int, default=2024)
-    parser.add_argument("--clear", action="store_true", help="Clear output directory images before writing")
+    parser.add_argument("--clear", action="store_true", help="Clear output directory images before writing (with --changelog: only the rebuilt units' images)")
+    parser.add_argument("--changelog", help="Only rebuild units changed per this dataset_changelog.py JSON")
+    parser.add_argument("--trace", help="Write a Chrome trace-event JSON of the plot builds here")
     args = parser.parse_args()
+    if args.trace:
+        pipeline_trace.enable(args.trace)
 
-    main(start_year=args.start_year, end_year=args.end_year, clear_old_files=args.clear)
\ No newline at end of file
+    only_units = units_from_changelog(args.changelog) if args.changelog else None
+    if only_units is not None:
+        print(f"Changelog: rebuilding plots for {len(only_units)} unit(s)")
+    main(start_year=args.start_year, end_year=args.end_year, clear_old_files=args.clear, only_units=only_units)
\ No newline at end of file
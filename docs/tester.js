@@ -66,11 +66,11 @@
 
   Promise.all([
     d3.csv('presidential_margins.csv'),
-    d3.csv('electoral_college.csv').catch(() => []),
+    d3.json('ev_matrix.json').catch(() => null),
     d3.csv('flip_results.csv').catch(() => []),
     d3.csv('flip_details.csv').catch(() => []),
     d3.csv('stop_colors.csv').catch(() => [])
-  ]).then(([margins, ec, flipResults, flipDetails, stopColors]) => {
+  ]).then(([margins, evMatrix, flipResults, flipDetails, stopColors]) => {
     (margins || []).forEach(r => {
       const year = +r.year;
       const unit = r.abbr;
@@ -88,12 +88,16 @@
       byYear.get(year).push(row);
       if (ev > 0) evByUnit.set(`${year}:${unit}`, ev);
     });
-    (ec || []).forEach(e => {
-      const year = +e.year;
-      const unit = e.abbr;
-      const ev = +e.electoral_votes;
-      if (year && unit && ev) evByUnit.set(`${year}:${unit}`, ev);
-    });
+    // dense year x unit EV matrix (ME/NE district rules already applied; see electoral_votes.py)
+    if (evMatrix && evMatrix.years && evMatrix.units && evMatrix.ev) {
+      evMatrix.years.forEach((year, i) => {
+        const row = evMatrix.ev[i] || [];
+        evMatrix.units.forEach((unit, j) => {
+          const ev = +row[j] || 0;
+          if (ev) evByUnit.set(`${year}:${unit}`, ev);
+        });
+      });
+    }
 
   // Build flip scenarios
     window._flipByYear = new Map(); // year -> { classic: [rows], no_majority: [rows] }
@@ -0,0 +1,184 @@
+"""
+Dense year x unit electoral-vote matrix built once from election_data/electoral_college.csv.
+
+The Maine / Nebraska district rules are applied here and nowhere else:
+
+- ME: from 1972 ME-AL gets 2 and ME-01/ME-02 get 1 each; before that ME-AL gets the
+  state total and the districts 0
+- NE: from 1992 NE-AL gets 2 and NE-01..NE-03 get 1 each; before that NE-AL gets the
+  state total and the districts 0
+- the plain ME / NE columns always hold the state total
+
+Rows are years, columns are the canonical unit index (sorted abbrs, districts included),
+and states with no EVs in a year (blank in the source) are 0. The matrix is persisted to
+docs/ev_matrix.json so the site (tester.js) reads the same numbers as the builders:
+
+  {"years": [...], "units": [...], "district_rules": {...}, "ev": [[row per year], ...]}
+
+Usage:
+  python electoral_votes.py                    # rebuild docs/ev_matrix.json
+  python electoral_votes.py --lookup 1968 ME-AL
+
+Only the stdlib is imported; EVMatrix.as_array() gives a NumPy array when needed.
+"""
+import argparse
+import csv
+import json
+import os
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SOURCE = os.path.join(ROOT, "election_data", "electoral_college.csv")
+DEFAULT_OUTPUT = os.path.join(ROOT, "docs", "ev_matrix.json")
+
+# state -> (at-large unit, district units, first year of district allocation)
+DISTRICT_RULES = {
+    "ME": ("ME-AL", ("ME-01", "ME-02"), 1972),
+    "NE": ("NE-AL", ("NE-01", "NE-02", "NE-03"), 1992),
+}
+
+
+class EVMatrix:
+    """EVs indexed by (year, unit); get() is two dict lookups and a list index."""
+
+    def __init__(self, years, units, ev):
+        self.years = list(years)
+        self.units = list(units)
+        self.ev = [list(row) for row in ev]
+        self.year_index = {y: i for i, y in enumerate(self.years)}
+        self.unit_index = {u: j for j, u in enumerate(self.units)}
+
+    def get(self, year, abbr):
+        """EVs of a unit in a year; unknown districts fall back to their state, unknown years are 0."""
+        i = self.year_index.get(year)
+        if i is None:
+            return 0
+        j = self.unit_index.get(abbr)
+        if j is None:
+            j = self.unit_index.get(abbr.split('-')[0])
+            if j is None:
+                return 0
+        return self.ev[i][j]
+
+    def year_row(self, year):
+        """{unit: ev} for one year (units with 0 EVs omitted)."""
+        i = self.year_index.get(year)
+        if i is None:
+            return {}
+        return {u: v for u, v in zip(self.units, self.ev[i]) if v}
+
+    def as_array(self):
+        import numpy as np
+        return np.array(self.ev, dtype=np.int16).reshape(len(self.years), len(self.units))
+
+    def to_json(self):
+        return {
+            "years": self.years,
+            "units": self.units,
+            "district_rules": {s: {"at_large": al, "districts": list(ds), "from_year": y}
+                               for s, (al, ds, y) in DISTRICT_RULES.items()},
+            "ev": self.ev,
+        }
+
+    @classmethod
+    def from_json(cls, obj):
+        return cls(obj["years"], obj["units"], obj["ev"])
+
+
+def read_state_evs(source=DEFAULT_SOURCE):
+    """{(year, abbr): ev} from electoral_college.csv; blank EVs are 0, rows without abbr skipped."""
+    state_evs = {}
+    with open(source, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            ab = row.get('abbr')
+            if not ab:
+                continue
+            try:
+                year = int(row.get('year') or 0)
+            except ValueError:
+                continue
+            try:
+                ev = int(float(row.get('electoral_votes') or 0))
+            except ValueError:
+                ev = 0
+            state_evs[(year, ab)] = ev
+    return state_evs
+
+
+def build_matrix(state_evs):
+    """EVMatrix from {(year, state abbr): ev}, with the district rules applied."""
+    years = sorted({y for y, _ in state_evs})
+    states = {ab for _, ab in state_evs}
+    units = set(states)
+    for state, (al, districts, _) in DISTRICT_RULES.items():
+        if state in states:
+            units.add(al)
+            units.update(districts)
+    units = sorted(units)
+    col = {u: j for j, u in enumerate(units)}
+
+    ev = []
+    for year in years:
+        row = [0] * len(units)
+        for ab in states:
+            row[col[ab]] = state_evs.get((year, ab), 0)
+        for state, (al, districts, start) in DISTRICT_RULES.items():
+            if state not in states:
+                continue
+            total = row[col[state]]
+            split = year >= start
+            row[col[al]] = 2 if split else total
+            for d in districts:
+                row[col[d]] = 1 if split else 0
+        ev.append(row)
+    return EVMatrix(years, units, ev)
+
+
+def write_matrix(matrix, out_path=DEFAULT_OUTPUT):
+    """One year row per line so diffs of the artifact stay readable."""
+    obj = matrix.to_json()
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    with open(out_path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write('{\n')
+        for key in ("years", "units", "district_rules"):
+            f.write(f'"{key}": {json.dumps(obj[key], separators=(",", ":"))},\n')
+        f.write('"ev": [\n')
+        f.write(',\n'.join(json.dumps(r, separators=(",", ":")) for r in obj["ev"]))
+        f.write('\n]}\n')
+
+
+def load_matrix(path=DEFAULT_OUTPUT, source=DEFAULT_SOURCE):
+    """
+    The persisted matrix, rebuilt (and rewritten) from the source CSV when the artifact is
+    missing or older than it.
+    """
+    if os.path.exists(path) and not (os.path.exists(source) and os.path.getmtime(source) > os.path.getmtime(path)):
+        with open(path, encoding='utf-8') as f:
+            return EVMatrix.from_json(json.load(f))
+    if not os.path.exists(source):
+        return EVMatrix([], [], [])
+    matrix = build_matrix(read_state_evs(source))
+    try:
+        write_matrix(matrix, path)
+    except OSError:
+        pass
+    return matrix
+
+
+def main(source=DEFAULT_SOURCE, out_path=DEFAULT_OUTPUT):
+    matrix = build_matrix(read_state_evs(source))
+    write_matrix(matrix, out_path)
+    print(f"Wrote {len(matrix.years)} years x {len(matrix.units)} units to {out_path}")
+    return matrix
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the dense year x unit EV matrix (docs/ev_matrix.json)")
+    parser.add_argument("--source", default=DEFAULT_SOURCE, help="electoral_college.csv")
+    parser.add_argument("--out", default=DEFAULT_OUTPUT, help="Output JSON")
+    parser.add_argument("--lookup", nargs=2, metavar=("YEAR", "UNIT"), help="Print one unit's EVs and exit")
+    args = parser.parse_args()
+    if args.lookup:
+        print(load_matrix(args.out, args.source).get(int(args.lookup[0]), args.lookup[1]))
+    else:
+        main(args.source, args.out)
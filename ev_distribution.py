@@ -0,0 +1,199 @@
+"""
+Exact electoral-vote distribution per year.
+
+Each unit is carried by the Democrat with probability p (from its margin through a
+configurable margin -> probability model, params.EV_PROB_MODEL / EV_PROB_SCALE), so the
+Democratic EV total is a weighted Poisson-binomial. Its PMF is the product of the
+per-unit generating polynomials (1 - p) + p * x^ev, multiplied pairwise in a balanced
+tree with NumPy FFT convolution (np.convolve for the small leaves). That is exact up to
+float rounding and deterministic, instead of sampling outcomes.
+
+A unit's margin in a scenario is relative_margin + pv, the same shift the home-page
+tester applies; pv defaults to the year's actual national margin. Third-party carries
+are not modeled: a unit the Democrat doesn't carry counts for the Republican.
+
+Output: docs/ev_distribution.csv, one row per (year, pv) with the D/R win and tie
+probabilities and the expected Democratic EVs; --pmf-out also writes the full PMFs.
+
+Usage:
+  python ev_distribution.py                         # every year at its actual PV
+  python ev_distribution.py --year 2016 --pv 0 0.02 # scenarios
+  python ev_distribution.py --pv-step 0.01          # -TESTER_PV_CAP..+TESTER_PV_CAP sweep
+"""
+import argparse
+import json
+import math
+import os
+import time
+
+import numpy as np
+
+import params
+import pipeline_trace
+import unit_records
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_INPUT = unit_records.DEFAULT_INPUT
+DEFAULT_OUTPUT = os.path.join(ROOT, "docs", "ev_distribution.csv")
+FIELDNAMES = ['year', 'pv', 'model', 'scale', 'total_ev', 'ev_to_win',
+              'expected_D_ev', 'D_win_prob', 'R_win_prob', 'tie_prob']
+
+# below this operand length np.convolve is faster than an FFT round trip
+DIRECT_CONV_MAX = 64
+
+
+def _normal_cdf(z):
+    erf = np.vectorize(math.erf, otypes=[float])
+    return 0.5 * (1.0 + erf(z / math.sqrt(2.0)))
+
+
+def win_probabilities(margins, model=None, scale=None):
+    """P(Democrat carries the unit) for an array of unit margins (D positive)."""
+    model = model or params.EV_PROB_MODEL
+    scale = params.EV_PROB_SCALE if scale is None else scale
+    m = np.asarray(margins, dtype=float)
+    if model == "step":
+        return np.where(m > 0, 1.0, np.where(m < 0, 0.0, 0.5))
+    if scale <= 0:
+        raise ValueError(f"scale must be positive for the {model!r} model")
+    if model == "normal":
+        return _normal_cdf(m / scale)
+    if model == "logistic":
+        return 0.5 * (1.0 + np.tanh(m / (2.0 * scale)))  # overflow-free logistic
+    raise ValueError(f"Unknown probability model: {model!r} (normal, logistic, step)")
+
+
+def _multiply(a, b):
+    """Polynomial product of two coefficient arrays."""
+    if min(len(a), len(b)) <= DIRECT_CONV_MAX:
+        return np.convolve(a, b)
+    n = len(a) + len(b) - 1
+    size = 1 << (n - 1).bit_length()
+    out = np.fft.irfft(np.fft.rfft(a, size) * np.fft.rfft(b, size), size)[:n]
+    # FFT round-off leaves ~1e-17 noise where the exact coefficient is 0
+    return np.clip(out, 0.0, None)
+
+
+def ev_pmf(evs, probs):
+    """PMF of the Democratic EV total: pmf[k] = P(D wins exactly k EVs)."""
+    polys = []
+    for ev, p in zip(evs, probs):
+        ev = int(ev)
+        if ev <= 0:
+            continue
+        poly = np.zeros(ev + 1)
+        poly[0] = 1.0 - p
+        poly[ev] += p
+        polys.append(poly)
+    if not polys:
+        return np.ones(1)
+    # balanced product tree: operand lengths stay similar, so the big FFTs happen only near the root
+    while len(polys) > 1:
+        nxt = [_multiply(polys[i], polys[i + 1]) for i in range(0, len(polys) - 1, 2)]
+        if len(polys) % 2:
+            nxt.append(polys[-1])
+        polys = nxt
+    pmf = polys[0]
+    return pmf / pmf.sum()
+
+
+def summarize(pmf):
+    """Win / tie probabilities and expected D EVs of a PMF over 0..total EVs."""
+    total = len(pmf) - 1
+    need = total // 2 + 1
+    tie = float(pmf[total // 2]) if total % 2 == 0 else 0.0
+    d_win = float(pmf[need:].sum())
+    return {
+        'total_ev': total,
+        'ev_to_win': need,
+        'expected_D_ev': float(np.dot(np.arange(total + 1), pmf)),
+        'D_win_prob': d_win,
+        'R_win_prob': max(0.0, 1.0 - d_win - tie),
+        'tie_prob': tie,
+    }
+
+
+def year_units(records):
+    """(units with EVs, national margin) for one year's UnitYear records."""
+    units = [r for r in records if not r.is_national and r.electoral_votes > 0]
+    nat = next((r.national_margin for r in records if r.is_national), None)
+    if nat is None:
+        ms = [r.national_margin for r in records if r.national_margin]
+        nat = sum(ms) / len(ms) if ms else 0.0
+    return units, nat
+
+
+def year_distribution(records, pv=None, model=None, scale=None):
+    """(pmf, summary) for one year's records at national margin pv (default: actual)."""
+    units, nat = year_units(records)
+    pv = nat if pv is None else pv
+    evs = np.array([u.electoral_votes for u in units], dtype=np.int64)
+    probs = win_probabilities(np.array([u.relative_margin for u in units]) + pv, model, scale)
+    pmf = ev_pmf(evs, probs)
+    summary = summarize(pmf)
+    summary['pv'] = pv
+    return pmf, summary
+
+
+def pv_grid(step, cap=params.TESTER_PV_CAP):
+    n = int(round(cap / step))
+    return [round(i * step, 10) for i in range(-n, n + 1)]
+
+
+def compute(records_by_year, pvs=None, model=None, scale=None, keep_pmf=False):
+    """Summary rows (and PMFs when keep_pmf) for every year and scenario pv."""
+    model = model or params.EV_PROB_MODEL
+    scale = params.EV_PROB_SCALE if scale is None else scale
+    rows, pmfs = [], []
+    for year in sorted(records_by_year):
+        for pv in (pvs or [None]):
+            pmf, summary = year_distribution(records_by_year[year], pv, model, scale)
+            rows.append({'year': year, 'model': model, 'scale': scale, **summary})
+            if keep_pmf:
+                pmfs.append({'year': year, 'pv': summary['pv'], 'pmf': [round(float(x), 12) for x in pmf]})
+    return rows, pmfs
+
+
+def write_rows(rows, outfile=DEFAULT_OUTPUT):
+    out = []
+    for r in rows:
+        r = dict(r)
+        r['pv'] = f"{r['pv']:.6f}"
+        r['expected_D_ev'] = f"{r['expected_D_ev']:.4f}"
+        for k in ('D_win_prob', 'R_win_prob', 'tie_prob'):
+            r[k] = f"{r[k]:.10f}"
+        out.append({k: r[k] for k in FIELDNAMES})
+    unit_records.write_csv(out, FIELDNAMES, outfile)
+
+
+def main(infile=DEFAULT_INPUT, outfile=DEFAULT_OUTPUT, years=None, pvs=None, model=None, scale=None, pmf_out=None):
+    by_year = unit_records.load_by_year(infile, years, "ev_distribution")
+    t0 = time.perf_counter()
+    with pipeline_trace.span("ev_distribution.compute", years=len(by_year), scenarios=len(pvs or [None])):
+        rows, pmfs = compute(by_year, pvs, model, scale, keep_pmf=bool(pmf_out))
+    elapsed = time.perf_counter() - t0
+    with pipeline_trace.span("ev_distribution.write", rows=len(rows)):
+        write_rows(rows, outfile)
+        if pmf_out:
+            with open(pmf_out, 'w', encoding='utf-8') as f:
+                json.dump(pmfs, f, separators=(",", ":"))
+    per = elapsed * 1000 / max(1, len(rows))
+    print(f"Wrote {len(rows)} rows to {outfile} ({elapsed * 1000:.1f} ms, {per:.2f} ms per year/scenario)")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exact EV-total distribution per year (docs/ev_distribution.csv)")
+    unit_records.add_engine_args(parser, DEFAULT_OUTPUT)
+    parser.add_argument("--pv", type=float, nargs="*", help="National margin scenarios (default: actual)")
+    parser.add_argument("--pv-step", type=float, help="Sweep pv from -TESTER_PV_CAP to +TESTER_PV_CAP in this step")
+    parser.add_argument("--model", choices=["normal", "logistic", "step"], default=None,
+                        help=f"Margin -> probability model (default {params.EV_PROB_MODEL})")
+    parser.add_argument("--scale", type=float, default=None, help=f"Model scale (default {params.EV_PROB_SCALE})")
+    parser.add_argument("--pmf-out", help="Also write the full PMFs as JSON here")
+    args = unit_records.parse_engine_args(parser)
+    pvs = args.pv
+    if args.pv_step:
+        pvs = sorted(set((pvs or []) + pv_grid(args.pv_step)))
+    main(args.input, args.out, args.year, pvs, args.model, args.scale, args.pmf_out)
@@ -0,0 +1,186 @@
+"""Single entry point for the build and data tools.
+
+  python margin_matters.py <command> [command args...]
+
+Commands run the existing scripts as if started directly (same flags, same working
+directory assumptions), so `margin_matters.py flips --trace t.json` is
+`build_flip_results.py --trace t.json`:
+
+  build      pipeline.py                full build (margins -> flips -> stops -> plots -> site)
+  margins    build_presidential_margins.py
+  evs        electoral_votes.py
+  flips      build_flip_results.py
+  contingent contingent_flip.py
+  stops      build_stop_colors.py
+  evdist     ev_distribution.py
+  power      power_index.py
+  paths      paths_to_victory.py
+  cube       build_scenario_cube.py
+  plots      do_all_plots.py
+  site       build_site.py
+  scrape     tools/wikipedia_scraper.py
+  diff       compare_extend.py diff
+  validate   validate_votes.py
+
+This module imports only the stdlib at startup; a command's dependencies (pandas,
+matplotlib, scipy, requests, ...) load when that command's script runs.
+
+  --import-report        re-run the command under `python -X importtime` and print the
+                         slowest imports (cumulative), e.g. `--import-report flips --help`
+  startup-check          time `<command> --help` for the quick commands in fresh
+                         interpreters; exit 1 if any exceeds its budget or imports a
+                         module it shouldn't need
+"""
+import os
+import runpy
+import subprocess
+import sys
+import time
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+COMMANDS = {
+    "build": ("pipeline.py", [], "Full build (margins, flips, stop colors, plots, site)"),
+    "margins": ("build_presidential_margins.py", [], "Build presidential_margins.csv"),
+    "evs": ("electoral_votes.py", [], "Dense year x unit EV matrix (docs/ev_matrix.json)"),
+    "flips": ("build_flip_results.py", [], "Minimal vote flips per year (docs/flip_*.csv)"),
+    "contingent": ("contingent_flip.py", [], "Cheapest flips forcing a contingent election (docs/contingent_flip*.csv)"),
+    "stops": ("build_stop_colors.py", [], "Tester stop colors (docs/stop_colors.csv)"),
+    "evdist": ("ev_distribution.py", [], "Exact EV distribution / win probabilities (docs/ev_distribution.csv)"),
+    "power": ("power_index.py", [], "Banzhaf / Shapley-Shubik power per unit (docs/power_index.csv)"),
+    "paths": ("paths_to_victory.py", [], "Paths to victory / minimal winning sets (docs/paths_to_victory.csv)"),
+    "cube": ("build_scenario_cube.py", [], "Year x pv x unit uniform-swing winner cube (memory-mapped .npy)"),
+    "plots": ("do_all_plots.py", [], "Per-unit plots"),
+    "site": ("build_site.py", [], "Static site into docs/"),
+    "scrape": (os.path.join("tools", "wikipedia_scraper.py"), [], "Scrape Wikipedia results"),
+    "diff": ("compare_extend.py", ["diff"], "Tolerance-aware CSV diff"),
+    "validate": ("validate_votes.py", [], "Validate ingested vote data"),
+}
+
+# `<command> --help` wall-time budgets (ms, fresh interpreter) and modules each must not import
+STARTUP_BUDGETS_MS = {
+    "": 150,
+    "flips": 250,
+    "stops": 250,
+    "margins": 250,
+    "validate": 1500,
+    "diff": 250,
+}
+HEAVY_MODULES = ("pandas", "numpy", "matplotlib", "scipy", "statsmodels", "requests", "bs4")
+ALLOWED_HEAVY = {
+    "validate": {"pandas", "numpy"},
+}
+
+
+def usage():
+    lines = [__doc__.split("\n\n")[0], "", "commands:"]
+    for name, (_, _, desc) in COMMANDS.items():
+        lines.append(f"  {name:<14} {desc}")
+    lines.append(f"  {'startup-check':<14} Check startup-time budgets of the quick commands")
+    lines.append("")
+    lines.append("options: --import-report (before the command), -h/--help")
+    return "\n".join(lines)
+
+
+def run_command(name, argv):
+    """Run a command's script in this interpreter as __main__."""
+    script, prefix, _ = COMMANDS[name]
+    path = os.path.join(ROOT, script)
+    # mimic `python <script>`: script dir first on sys.path, argv[0] is the script
+    sys.path.insert(0, os.path.dirname(path))
+    sys.argv = [path] + prefix + list(argv)
+    runpy.run_path(path, run_name="__main__")
+
+
+def parse_importtime(stderr):
+    """[(cumulative_us, self_us, module)] from `-X importtime` output."""
+    out = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            out.append((int(parts[1]), int(parts[0]), parts[2].rstrip()))
+        except ValueError:
+            continue
+    return out
+
+
+def import_report(argv, top=25):
+    """Re-run this CLI under -X importtime and print the slowest imports."""
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", os.path.abspath(__file__)] + list(argv),
+                          stderr=subprocess.PIPE, text=True)
+    wall = time.perf_counter() - t0
+    rows = parse_importtime(proc.stderr)
+    # top-level imports (no leading indentation) add up to the total import time
+    total_us = sum(cum for cum, _, mod in rows if not mod.startswith("  "))
+    print(f"\nImport report for: {' '.join(argv) or '(no command)'}")
+    print(f"  wall {wall * 1000:.0f} ms, imports {total_us / 1000:.0f} ms, {len(rows)} modules")
+    print(f"  {'cumulative ms':>13} {'self ms':>8}  module")
+    for cum, own, mod in sorted(rows, reverse=True)[:top]:
+        print(f"  {cum / 1000:>13.1f} {own / 1000:>8.1f}  {mod.strip()}")
+    return proc.returncode
+
+
+def startup_check(argv):
+    import argparse
+    parser = argparse.ArgumentParser(prog="margin_matters.py startup-check",
+                                     description="Check `<command> --help` startup time against budgets")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per command; the best time is checked")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget (slow machines/CI)")
+    args = parser.parse_args(argv)
+
+    failures = []
+    print(f"{'command':<10} {'best ms':>8} {'budget':>7}  heavy imports")
+    for name, budget in STARTUP_BUDGETS_MS.items():
+        cmd = [sys.executable, "-X", "importtime", os.path.abspath(__file__)] + ([name] if name else []) + ["--help"]
+        best = float("inf")
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+            best = min(best, time.perf_counter() - t0)
+        ms = best * 1000
+        loaded = {mod.strip().split(".")[0] for _, _, mod in parse_importtime(proc.stderr)}
+        heavy = sorted(m for m in HEAVY_MODULES if m in loaded)
+        unexpected = [m for m in heavy if m not in ALLOWED_HEAVY.get(name, set())]
+        limit = budget * args.scale
+        label = name or "(none)"
+        print(f"{label:<10} {ms:>8.0f} {limit:>7.0f}  {', '.join(heavy) or '-'}")
+        if proc.returncode != 0:
+            failures.append(f"{label}: exited {proc.returncode}")
+        if ms > limit:
+            failures.append(f"{label}: {ms:.0f} ms > {limit:.0f} ms budget")
+        if unexpected:
+            failures.append(f"{label}: imports {', '.join(unexpected)}")
+    if failures:
+        print("❌ Startup budget exceeded:")
+        for f in failures:
+            print(f"  {f}")
+        return 1
+    print("✅ All commands within startup budget")
+    return 0
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if argv and argv[0] == "--import-report":
+        return import_report(argv[1:])
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return 0
+    name, rest = argv[0], argv[1:]
+    if name == "startup-check":
+        return startup_check(rest)
+    if name not in COMMANDS:
+        print(f"Unknown command: {name}\n\n{usage()}", file=sys.stderr)
+        return 2
+    run_command(name, rest)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
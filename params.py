@@ -77,6 +77,21 @@ INTERACTIVE_TESTER: bool = True
 # Clamp for PV slider in tester (in fraction units, e.g. 0.25 = +/-25pp)
 TESTER_PV_CAP: float = 0.5
 
+# EV distribution engine (ev_distribution.py): unit margin (relative_margin + PV) ->
+# probability the Democrat carries the unit.
+#   "normal":   Phi(margin / scale)
+#   "logistic": 1 / (1 + exp(-margin / scale))
+#   "step":     1 if margin > 0, 0 if margin < 0, 0.5 at exactly 0 (deterministic)
+EV_PROB_MODEL: str = "normal"
+EV_PROB_SCALE: float = 0.05
+
+# Flip cost models (build_flip_results.py), solved side by side:
+#   persuasion: switch runner-up voters,  margin // 2 + 1  (the classic numbers)
+#   turnout:    add new runner-up voters, margin + 1
+#   hybrid:     this share of the added effort is switching, the rest new voters:
+#               ceil((margin + 1) / (1 + share))
+FLIP_HYBRID_PERSUASION_SHARE: float = 0.5
+
 # Optional: define a custom table column ordering and labels for the HTML tables.
 # If set to None the code will fall back to the built-in heuristic order.
 # Example formats accepted:
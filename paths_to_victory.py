@@ -0,0 +1,218 @@
+"""
+Paths to victory over a year's competitive units.
+
+Units are ordered by relative_margin (most Democratic first); the tipping point is the
+unit whose EVs carry the Democrat past the majority in that order. Units within
++/-window of the tipping-point margin are competitive; everything more Democratic is
+banked for D, everything more Republican for R. Then, over the competitive units:
+
+- paths: how many of the 2^n outcomes give D a majority, R a majority, or a tie. A DP
+  over EV totals counts outcomes per D total exactly (Python ints, so any n works).
+- minimal winning sets: the smallest sets of competitive units that win for a side
+  where dropping any unit loses. Found by branch and bound over units sorted by EVs
+  (largest first): a branch stops once it wins (supersets aren't minimal), when the
+  remaining EVs can't reach the majority, or when even the largest remaining units
+  can't finish in fewer units than the current worst kept set.
+
+Output: docs/paths_to_victory.csv (one row per year) and docs/paths_minimal_sets.csv
+(the --sets N smallest minimal sets per year and side, default 10; --sets 0 skips it).
+"""
+import argparse
+import bisect
+import os
+import time
+
+import numpy as np
+
+import params
+import pipeline_trace
+import unit_records
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_INPUT = unit_records.DEFAULT_INPUT
+DEFAULT_OUTPUT = os.path.join(ROOT, "docs", "paths_to_victory.csv")
+DEFAULT_SETS_OUTPUT = os.path.join(ROOT, "docs", "paths_minimal_sets.csv")
+DEFAULT_WINDOW = params.SWING_MARGIN
+DEFAULT_SETS = 10
+FIELDNAMES = ['year', 'window', 'tipping_point', 'tipping_unit', 'competitive_units', 'competitive_ev',
+              'D_base_ev', 'R_base_ev', 'ev_to_win', 'D_paths', 'R_paths', 'tie_paths', 'total_paths']
+SET_FIELDNAMES = ['year', 'side', 'rank', 'size', 'ev', 'units']
+
+
+def tipping_point(units):
+    """(tipping unit, quota) for UnitYear units with EVs."""
+    total = sum(u.electoral_votes for u in units)
+    need = total // 2 + 1
+    acc = 0
+    for u in sorted(units, key=lambda u: -u.relative_margin):
+        acc += u.electoral_votes
+        if acc >= need:
+            return u, need
+    return None, need
+
+
+def split_units(units, window):
+    """(competitive, D-banked EVs, R-banked EVs, tipping unit, quota)."""
+    tip, need = tipping_point(units)
+    if tip is None:
+        return [], 0, 0, None, need
+    tp = tip.relative_margin
+    comp, d_base, r_base = [], 0, 0
+    for u in units:
+        if u.relative_margin > tp + window:
+            d_base += u.electoral_votes
+        elif u.relative_margin < tp - window:
+            r_base += u.electoral_votes
+        else:
+            comp.append(u)
+    return comp, d_base, r_base, tip, need
+
+
+def outcome_counts(evs):
+    """counts[s] = number of outcomes in which the Democrat wins exactly s of these EVs."""
+    counts = np.zeros(sum(evs) + 1, dtype=object)
+    counts[:] = 0
+    counts[0] = 1
+    for w in evs:
+        if w:
+            counts[w:] = counts[w:] + counts[:len(counts) - w]
+        else:
+            counts = counts * 2
+    return counts
+
+
+def count_paths(evs, d_base, r_base, need):
+    """(D paths, R paths, ties) over all outcomes of the competitive EVs."""
+    counts = outcome_counts(evs)
+    comp_total = len(counts) - 1
+    d = r = tie = 0
+    for s, c in enumerate(counts.tolist()):
+        if not c:
+            continue
+        if d_base + s >= need:
+            d += c
+        elif r_base + comp_total - s >= need:
+            r += c
+        else:
+            tie += c
+    return d, r, tie
+
+
+def minimal_winning_sets(units, need, limit=10):
+    """
+    Up to `limit` minimal winning sets with the fewest units, as (size, ev, abbrs) sorted
+    by size, then EVs, then names. `need` is the EVs the side still needs from these units.
+    """
+    if need <= 0:
+        return [(0, 0, ())]
+    units = sorted(units, key=lambda u: (-u.electoral_votes, u.abbr))
+    evs = [u.electoral_votes for u in units]
+    n = len(units)
+    suffix = [0] * (n + 1)
+    for i in range(n - 1, -1, -1):
+        suffix[i] = suffix[i + 1] + evs[i]
+    if suffix[0] < need:
+        return []
+
+    kept = []  # sorted (size, ev, abbrs), at most `limit` long
+
+    def worst_size():
+        return kept[-1][0] if len(kept) >= limit else n + 1
+
+    def fewest_more(i, deficit):
+        # units i.. are sorted by EVs, so the next k are the largest k remaining
+        got = 0
+        for k in range(i, n):
+            got += evs[k]
+            if got >= deficit:
+                return k - i + 1
+        return n + 1
+
+    chosen = []
+
+    def search(i, total):
+        if total >= need:
+            # the last unit added is the smallest; minimal iff dropping it loses
+            if total - evs[chosen[-1]] < need:
+                key = (len(chosen), total, tuple(sorted(units[j].abbr for j in chosen)))
+                if len(kept) < limit or key < kept[-1]:
+                    bisect.insort(kept, key)
+                    del kept[limit:]
+            return
+        if i >= n or total + suffix[i] < need:
+            return
+        if len(chosen) + fewest_more(i, need - total) > worst_size():
+            return
+        chosen.append(i)
+        search(i + 1, total + evs[i])
+        chosen.pop()
+        search(i + 1, total)
+
+    search(0, 0)
+    return kept
+
+
+def year_paths(records, window=DEFAULT_WINDOW, sets=0):
+    """(summary row, minimal-set rows) for one year's records."""
+    units = [r for r in records if not r.is_national and r.electoral_votes > 0]
+    comp, d_base, r_base, tip, need = split_units(units, window)
+    year = records[0].year
+    evs = [u.electoral_votes for u in comp]
+    d, r, tie = count_paths(evs, d_base, r_base, need)
+    row = {
+        'year': year, 'window': window,
+        'tipping_point': tip.relative_margin if tip else 0.0,
+        'tipping_unit': tip.abbr if tip else '',
+        'competitive_units': len(comp), 'competitive_ev': sum(evs),
+        'D_base_ev': d_base, 'R_base_ev': r_base, 'ev_to_win': need,
+        'D_paths': d, 'R_paths': r, 'tie_paths': tie, 'total_paths': 2 ** len(comp),
+    }
+    set_rows = []
+    if sets:
+        for side, base in (('D', d_base), ('R', r_base)):
+            for rank, (size, ev, abbrs) in enumerate(minimal_winning_sets(comp, need - base, sets), 1):
+                set_rows.append({'year': year, 'side': side, 'rank': rank, 'size': size,
+                                 'ev': ev, 'units': ' '.join(abbrs)})
+    return row, set_rows
+
+
+def compute(records_by_year, window=DEFAULT_WINDOW, sets=0):
+    rows, set_rows = [], []
+    for year in sorted(records_by_year):
+        row, srows = year_paths(records_by_year[year], window, sets)
+        rows.append(row)
+        set_rows.extend(srows)
+    return rows, set_rows
+
+
+def write_rows(rows, set_rows=None, outfile=DEFAULT_OUTPUT, sets_out=DEFAULT_SETS_OUTPUT):
+    unit_records.write_csv([{**r, 'tipping_point': f"{r['tipping_point']:.6f}"} for r in rows], FIELDNAMES, outfile)
+    if set_rows:
+        unit_records.write_csv(set_rows, SET_FIELDNAMES, sets_out)
+
+
+def main(infile=DEFAULT_INPUT, outfile=DEFAULT_OUTPUT, years=None, window=DEFAULT_WINDOW,
+         sets=DEFAULT_SETS, sets_out=DEFAULT_SETS_OUTPUT):
+    by_year = unit_records.load_by_year(infile, years, "paths")
+    t0 = time.perf_counter()
+    with pipeline_trace.span("paths.compute", years=len(by_year), window=window, sets=sets):
+        rows, set_rows = compute(by_year, window, sets)
+    elapsed = time.perf_counter() - t0
+    with pipeline_trace.span("paths.write", rows=len(rows)):
+        write_rows(rows, set_rows if sets else None, outfile, sets_out)
+    print(f"Wrote {len(rows)} years to {outfile}" + (f" and {len(set_rows)} minimal sets to {sets_out}" if sets else "")
+          + f" ({elapsed * 1000:.0f} ms)")
+    return rows, set_rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Count paths to victory over competitive units (docs/paths_to_victory.csv)")
+    unit_records.add_engine_args(parser, DEFAULT_OUTPUT)
+    parser.add_argument("--window", type=float, default=DEFAULT_WINDOW,
+                        help=f"Competitive = relative_margin within +/- this of the tipping point (default {DEFAULT_WINDOW})")
+    parser.add_argument("--sets", type=int, default=DEFAULT_SETS,
+                        help=f"List this many smallest minimal winning sets per side (default {DEFAULT_SETS}, 0 = none)")
+    parser.add_argument("--sets-out", default=DEFAULT_SETS_OUTPUT, help="Output CSV for --sets")
+    args = unit_records.parse_engine_args(parser)
+    main(args.input, args.out, args.year, args.window, args.sets, args.sets_out)
@@ -0,0 +1,206 @@
+"""Library API for the whole build: margins -> flips -> stop colors -> plots -> site.
+
+File mode (the default) runs each stage's script main() in turn, so every stage
+re-reads presidential_margins.csv, exactly like running the scripts by hand.
+
+In-memory mode (--in-memory / run(in_memory=True)) builds the margins table once and
+passes typed rows between stages instead:
+
+  build_margins()     typed rows from build_presidential_margins.compute_margins()
+                      (float margins, int votes; no 12-digit string round-trip)
+  flip_tables()       build_flip_results.compute_flip_tables() on those rows (plus the
+                      k-best / Pareto rows of compute_kbest_tables())
+  stop_rows()         build_stop_colors.build_stop_rows() on those rows
+  unit_years()        {year: [UnitYear]} of those rows for the engine stages:
+                      ev_distribution.compute(), power_index.compute(),
+                      paths_to_victory.compute(), contingent_flip.compute()
+  margins_frame()     a DataFrame with the same columns pd.read_csv() would give the plots
+
+Published artifacts (presidential_margins.csv, docs/flip_*.csv, docs/stop_colors.csv,
+docs/ev_distribution.csv, docs/power_index.csv, docs/paths_*.csv, docs/contingent_flip*.csv,
+plots/, docs/) are written only after every table has been computed. The site gets the
+formatted CSV rows directly, so its pages match a file-mode build.
+
+Paths are relative to the repo root (the stage scripts assume it as the working
+directory); the CLI changes into it.
+
+Run:
+  python pipeline.py [--in-memory] [--no-plots] [--no-site] [--skip-validation] [--trace out.json]
+"""
+import argparse
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import build_flip_results
+import build_presidential_margins
+import build_stop_colors
+import contingent_flip
+import ev_distribution
+import paths_to_victory
+import pipeline_trace
+import power_index
+import unit_records
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STOP_COLORS_CSV = os.path.join("docs", "stop_colors.csv")
+
+
+@dataclass
+class PipelineTables:
+    margins: List[Dict]                       # compute_margins() rows (typed)
+    flip_summary: List[Dict] = field(default_factory=list)
+    flip_details: List[Dict] = field(default_factory=list)
+    flip_kbest: List[Dict] = field(default_factory=list)
+    stops: List[Dict] = field(default_factory=list)
+    by_year: Dict = field(default_factory=dict)   # unit_years(margins)
+    ev_distribution: List[Dict] = field(default_factory=list)
+    power: List[Dict] = field(default_factory=list)
+    paths: List[Dict] = field(default_factory=list)
+    path_sets: List[Dict] = field(default_factory=list)
+    contingent: List[Dict] = field(default_factory=list)
+    contingent_details: List[Dict] = field(default_factory=list)
+    frame: object = None                      # margins_frame(margins)
+
+
+def build_margins(infile=None, old_margins=None, validate=True) -> List[Dict]:
+    infile = infile or build_presidential_margins.DEFAULT_INPUT
+    if validate:
+        from validate_votes import validate_or_exit
+        with pipeline_trace.span("margins.validate"):
+            validate_or_exit(infile)
+    with pipeline_trace.span("margins.read") as sp:
+        rows = build_presidential_margins.read_input(infile)
+        sp.set(rows=len(rows))
+    with pipeline_trace.span("margins.compute") as sp:
+        out = build_presidential_margins.compute_margins(rows, old_margins or build_presidential_margins.DEFAULT_OLD_MARGINS)
+        sp.set(rows=len(out))
+    return out
+
+
+def flip_tables(margin_rows, kbest=build_flip_results.KBEST_K):
+    """(summary_rows, detail_rows, kbest_rows) for docs/flip_results.csv, flip_details.csv, flip_kbest.csv."""
+    rows = build_flip_results.rows_from_margins(margin_rows)
+    summary, details = build_flip_results.compute_flip_tables(rows)
+    return summary, details, build_flip_results.compute_kbest_tables(rows, kbest) if kbest else []
+
+
+def stop_rows(margin_rows):
+    with pipeline_trace.span("stops.build") as sp:
+        out = build_stop_colors.build_stop_rows(margin_rows)
+        sp.set(rows=len(out))
+    return out
+
+
+def unit_years(margin_rows):
+    """{year: [UnitYear]} of the margins rows, as unit_records.load_by_year() reads them from the CSV."""
+    return unit_records.group_by_year(build_flip_results.rows_from_margins(margin_rows))
+
+
+def margins_frame(margin_rows):
+    """DataFrame of the margins table as the plots would read it from the CSV."""
+    import pandas as pd
+    df = pd.DataFrame(margin_rows, columns=build_presidential_margins.FIELDNAMES)
+    # missing deltas are written as '0'
+    fixed = list(build_presidential_margins.FIXED_FIELDS)
+    df[fixed] = df[fixed].astype(float).fillna(0.0)
+    return df
+
+
+def compute_tables(infile=None, old_margins=None, validate=True) -> PipelineTables:
+    tables = PipelineTables(margins=build_margins(infile, old_margins, validate))
+    tables.flip_summary, tables.flip_details, tables.flip_kbest = flip_tables(tables.margins)
+    tables.stops = stop_rows(tables.margins)
+    tables.by_year = unit_years(tables.margins)
+    with pipeline_trace.span("ev_distribution.compute", years=len(tables.by_year)):
+        tables.ev_distribution, _ = ev_distribution.compute(tables.by_year)
+    with pipeline_trace.span("power.compute", years=len(tables.by_year)):
+        tables.power = power_index.compute(tables.by_year)
+    with pipeline_trace.span("paths.compute", years=len(tables.by_year)):
+        tables.paths, tables.path_sets = paths_to_victory.compute(tables.by_year, sets=paths_to_victory.DEFAULT_SETS)
+    tables.contingent, tables.contingent_details = contingent_flip.compute(tables.by_year)
+    tables.frame = margins_frame(tables.margins)
+    return tables
+
+
+def write_tables(tables: PipelineTables, margins_csv=None):
+    """Write the CSV artifacts for computed tables."""
+    margins_csv = margins_csv or build_presidential_margins.DEFAULT_OUTPUT
+    with pipeline_trace.span("margins.write", rows=len(tables.margins)):
+        build_presidential_margins.write_margins(tables.margins, margins_csv)
+    with pipeline_trace.span("flip.write", rows=len(tables.flip_details)):
+        build_flip_results.write_flip_tables(tables.flip_summary, tables.flip_details)
+        if tables.flip_kbest:
+            build_flip_results.write_kbest_table(tables.flip_kbest)
+    with pipeline_trace.span("stops.write", rows=len(tables.stops)):
+        os.makedirs(os.path.dirname(STOP_COLORS_CSV), exist_ok=True)
+        build_stop_colors.write_stop_rows(tables.stops, STOP_COLORS_CSV)
+    with pipeline_trace.span("ev_distribution.write", rows=len(tables.ev_distribution)):
+        ev_distribution.write_rows(tables.ev_distribution)
+    with pipeline_trace.span("power.write", rows=len(tables.power)):
+        power_index.write_rows(tables.power)
+    with pipeline_trace.span("paths.write", rows=len(tables.paths)):
+        paths_to_victory.write_rows(tables.paths, tables.path_sets)
+    with pipeline_trace.span("contingent.write", rows=len(tables.contingent)):
+        contingent_flip.write_rows(tables.contingent, tables.contingent_details)
+    print(f"Wrote {margins_csv} ({len(tables.margins)} rows), flip tables ({len(tables.flip_summary)} years) "
+          f"and {STOP_COLORS_CSV} ({len(tables.stops)} rows)")
+
+
+def run(in_memory=False, plots=True, site=True, validate=True, only_units=None) -> Optional[PipelineTables]:
+    """Run the whole build; returns the computed tables in in-memory mode."""
+    if not in_memory:
+        build_presidential_margins.main(validate=validate)
+        with pipeline_trace.span("flip"):
+            build_flip_results.main()
+        with pipeline_trace.span("stop_colors"):
+            build_stop_colors.main()
+        ev_distribution.main()
+        power_index.main()
+        paths_to_victory.main()
+        contingent_flip.main()
+        if plots:
+            import do_all_plots
+            do_all_plots.main(only_units=only_units)
+        if site:
+            from site_builder.main import build_site
+            with pipeline_trace.span("site"):
+                build_site()
+        return None
+
+    tables = compute_tables(validate=validate)
+    write_tables(tables)
+    if plots:
+        import do_all_plots
+        do_all_plots.main(only_units=only_units, df=tables.frame)
+    if site:
+        from site_builder.main import build_site
+        with pipeline_trace.span("site"):
+            build_site(rows=[build_presidential_margins.format_row(r) for r in tables.margins])
+    return tables
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the full build (margins, flips, stop colors, plots, site)")
+    parser.add_argument("--in-memory", action="store_true", help="Pass typed tables between stages instead of re-reading CSVs")
+    parser.add_argument("--no-plots", action="store_true", help="Skip do_all_plots")
+    parser.add_argument("--no-site", action="store_true", help="Skip the site build")
+    parser.add_argument("--skip-validation", action="store_true", help="Don't run validate_votes.py checks first")
+    parser.add_argument("--changelog", help="Only rebuild plots for units changed per this dataset_changelog.py JSON")
+    parser.add_argument("--trace", help="Write a Chrome trace-event JSON of the build here")
+    args = parser.parse_args()
+    if args.trace:
+        pipeline_trace.enable(os.path.abspath(args.trace))
+
+    only_units = None
+    if args.changelog:
+        import do_all_plots
+        only_units = do_all_plots.units_from_changelog(args.changelog)
+    os.chdir(ROOT)
+    run(in_memory=args.in_memory, plots=not args.no_plots, site=not args.no_site,
+        validate=not args.skip_validation, only_units=only_units)
+
+
+if __name__ == "__main__":
+    main()
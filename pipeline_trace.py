@@ -0,0 +1,207 @@
+"""Opt-in pipeline instrumentation with Chrome/Perfetto trace-event output.
+
+Wrap a stage, page, plot or solve in a span:
+
+    import pipeline_trace
+    with pipeline_trace.span("margins.compute", rows=len(rows)):
+        ...
+
+or, around a loop body that is awkward to re-indent:
+
+    sp = pipeline_trace.span("page", cat="page", unit=st).start()
+    ...
+    sp.finish(rows=len(table_rows))
+
+Each span records wall time, CPU time, the tracemalloc peak above its starting
+allocation (nested spans are handled: a child's peak also counts toward its parent)
+and optional row counts / extra args.
+
+Disabled by default. When disabled, span() returns one shared no-op object, so an
+instrumented call site costs a global flag check and nothing else; tracemalloc is
+never started.
+
+Enable with the MARGIN_MATTERS_TRACE=<path.json> environment variable or a
+script's --trace <path.json> flag (which calls enable()). At exit the trace is
+written as trace-event JSON (open it in chrome://tracing or ui.perfetto.dev) and a
+top-N summary table is printed. Set MARGIN_MATTERS_TRACE_MEMORY=0 to skip
+tracemalloc when only timings matter (it slows plotting several-fold).
+"""
+import atexit
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+ENV_VAR = "MARGIN_MATTERS_TRACE"
+MEMORY_ENV_VAR = "MARGIN_MATTERS_TRACE_MEMORY"
+
+_enabled = False
+_memory = False
+_out_path = None
+_events = []
+_stack = []
+_t0_ns = 0
+
+
+class _NullSpan:
+    """Shared no-op span returned while tracing is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def start(self):
+        return self
+
+    def finish(self, **args):
+        pass
+
+    def set(self, **args):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span:
+    __slots__ = ("name", "cat", "args", "_wall0", "_cpu0", "_mem0", "peak")
+
+    def __init__(self, name, cat, args):
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.peak = 0
+
+    def set(self, **args):
+        """Attach extra args (e.g. rows=...) before the span finishes."""
+        self.args.update(args)
+
+    def start(self):
+        if _memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if _stack:
+                # fold the parent's peak so far in before resetting the global peak
+                parent = _stack[-1]
+                parent.peak = max(parent.peak, peak)
+            tracemalloc.reset_peak()
+            self._mem0 = current
+        _stack.append(self)
+        self._cpu0 = time.process_time_ns()
+        self._wall0 = time.perf_counter_ns()
+        return self
+
+    def finish(self, **args):
+        wall1 = time.perf_counter_ns()
+        cpu1 = time.process_time_ns()
+        if args:
+            self.args.update(args)
+        if _stack and _stack[-1] is self:
+            _stack.pop()
+        elif self in _stack:
+            _stack.remove(self)
+        event_args = dict(self.args)
+        event_args["cpu_ms"] = round((cpu1 - self._cpu0) / 1e6, 3)
+        if _memory:
+            _, peak = tracemalloc.get_traced_memory()
+            self.peak = max(self.peak, peak)
+            event_args["peak_kb"] = round(max(0, self.peak - self._mem0) / 1024, 1)
+            if _stack:
+                parent = _stack[-1]
+                parent.peak = max(parent.peak, self.peak)
+        _events.append({
+            "name": self.name,
+            "cat": self.cat,
+            "ph": "X",
+            "ts": (self._wall0 - _t0_ns) / 1000,
+            "dur": (wall1 - self._wall0) / 1000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": event_args,
+        })
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.finish()
+        return False
+
+
+def span(name, cat="stage", **args):
+    """Return a span for `name` (a shared no-op when tracing is disabled)."""
+    if not _enabled:
+        return NULL_SPAN
+    return Span(name, cat, args)
+
+
+def enabled():
+    return _enabled
+
+
+def enable(out_path=None, memory=None):
+    """
+    Start collecting spans; the trace is written to out_path at exit.
+    memory defaults to on unless MARGIN_MATTERS_TRACE_MEMORY=0 (tracemalloc slows
+    allocation-heavy stages such as matplotlib several-fold).
+    """
+    global _enabled, _memory, _out_path, _t0_ns
+    if memory is None:
+        memory = os.environ.get(MEMORY_ENV_VAR, "1") != "0"
+    if _enabled:
+        if out_path:
+            _out_path = out_path
+        return
+    _enabled = True
+    _memory = memory
+    _out_path = out_path
+    _t0_ns = time.perf_counter_ns()
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    atexit.register(_at_exit)
+
+
+def events():
+    return list(_events)
+
+
+def write_chrome_trace(path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": _events, "displayTimeUnit": "ms"}, f)
+
+
+def summary(top=15):
+    """Top-N span names by total wall time, as a printable table."""
+    agg = {}
+    for e in _events:
+        a = agg.setdefault(e["name"], {"count": 0, "wall": 0.0, "cpu": 0.0, "peak_kb": 0.0, "rows": 0})
+        a["count"] += 1
+        a["wall"] += e["dur"] / 1000
+        a["cpu"] += e["args"].get("cpu_ms", 0.0)
+        a["peak_kb"] = max(a["peak_kb"], e["args"].get("peak_kb", 0.0))
+        rows = e["args"].get("rows")
+        if isinstance(rows, int):
+            a["rows"] += rows
+    ranked = sorted(agg.items(), key=lambda kv: kv[1]["wall"], reverse=True)[:top]
+    lines = [f"{'span':<32} {'count':>6} {'wall ms':>10} {'cpu ms':>10} {'peak KB':>10} {'rows':>9}"]
+    for name, a in ranked:
+        lines.append(f"{name[:32]:<32} {a['count']:>6} {a['wall']:>10.1f} {a['cpu']:>10.1f} "
+                     f"{a['peak_kb']:>10.1f} {a['rows'] or '':>9}")
+    return "\n".join(lines)
+
+
+def _at_exit():
+    if not _events:
+        return
+    if _out_path:
+        write_chrome_trace(_out_path)
+        print(f"Wrote trace ({len(_events)} spans) to {_out_path}")
+    print(summary())
+
+
+if os.environ.get(ENV_VAR):
+    enable(os.environ[ENV_VAR])
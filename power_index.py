@@ -0,0 +1,192 @@
+"""
+Banzhaf and Shapley-Shubik voting power of every unit in every year.
+
+The game per year is the electoral college as a weighted majority game: the units with
+EVs are the players, weights are their EVs, and a coalition wins with a majority of the
+year's total (total // 2 + 1). Instead of enumerating 2^n coalitions:
+
+- Banzhaf: one DP over EV totals counts the coalitions of all units reaching each total
+  (the coefficients of prod(1 + x^w)). A unit's coalitions-of-the-others are recovered by
+  dividing its factor back out ("unconvolution", an alternating cumulative sum along
+  each residue class mod w), and its swings are the others' coalitions with totals in
+  [quota - w, quota - 1].
+- Shapley-Shubik: the same with a DP over coalition size x EV total; the swings of each
+  size k are weighted k! (n - 1 - k)! / n!. The unconvolution runs for all units at once.
+
+Counts stay exact in int64 (at most 2^n with n < 63). Output: docs/power_index.csv,
+one row per (year, unit):
+
+  banzhaf_swings    coalitions of the other units the unit turns from losing to winning
+  banzhaf_index     swings normalized to sum to 1 within the year
+  banzhaf_absolute  swings / 2^(n-1): probability the unit is pivotal under random coalitions
+  shapley_shubik    probability the unit is pivotal in a random ordering (sums to 1)
+"""
+import argparse
+import math
+import os
+import time
+
+import numpy as np
+
+import pipeline_trace
+import unit_records
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_INPUT = unit_records.DEFAULT_INPUT
+DEFAULT_OUTPUT = os.path.join(ROOT, "docs", "power_index.csv")
+FIELDNAMES = ['year', 'abbr', 'electoral_votes', 'ev_share', 'banzhaf_swings',
+              'banzhaf_index', 'banzhaf_absolute', 'shapley_shubik']
+MAX_PLAYERS = 62  # int64 coalition counts stay exact below 2^63
+
+
+def quota(weights):
+    return int(sum(weights)) // 2 + 1
+
+
+def coalition_counts(weights):
+    """counts[s] = number of coalitions with total weight s."""
+    weights = np.asarray(weights, dtype=np.int64)
+    counts = np.zeros(int(weights.sum()) + 1, dtype=np.int64)
+    counts[0] = 1
+    for w in weights.tolist():
+        if w:
+            counts[w:] = counts[w:] + counts[:len(counts) - w]
+        else:
+            counts *= 2
+    return counts
+
+
+def _remove_player(counts, w):
+    """Counts of the coalitions without one player of weight w (divide out 1 + x^w)."""
+    if w == 0:
+        return counts // 2
+    n = len(counts)
+    rows = -(-n // w)
+    padded = np.zeros(rows * w, dtype=np.int64)
+    padded[:n] = counts
+    grid = padded.reshape(rows, w)
+    # c[k] = counts[k] - c[k-1] along each residue class: c[k] = (-1)^k * cumsum((-1)^j counts[j])
+    sign = np.where(np.arange(rows) % 2 == 0, 1, -1).astype(np.int64)[:, None]
+    return (sign * np.cumsum(sign * grid, axis=0)).ravel()[:n - w]
+
+
+def banzhaf_swings(weights):
+    """Swing counts per player (np.int64 array)."""
+    weights = np.asarray(weights, dtype=np.int64)
+    q = quota(weights)
+    counts = coalition_counts(weights)
+    swings = np.zeros(len(weights), dtype=np.int64)
+    for i, w in enumerate(weights.tolist()):
+        others = _remove_player(counts, w)
+        lo, hi = max(q - w, 0), min(q - 1, len(others) - 1)
+        if hi >= lo:
+            swings[i] = others[lo:hi + 1].sum()
+    return swings
+
+
+def size_counts(weights):
+    """counts[k, s] = number of coalitions of k players with total weight s."""
+    weights = np.asarray(weights, dtype=np.int64)
+    n, total = len(weights), int(weights.sum())
+    counts = np.zeros((n + 1, total + 1), dtype=np.int64)
+    counts[0, 0] = 1
+    for w in weights.tolist():
+        counts[1:, w:] = counts[1:, w:] + counts[:-1, :total + 1 - w]
+    return counts
+
+
+def shapley_shubik(weights):
+    """Shapley-Shubik index per player (float array summing to 1)."""
+    weights = np.asarray(weights, dtype=np.int64)
+    n = len(weights)
+    if n == 0:
+        return np.zeros(0)
+    q = quota(weights)
+    counts = size_counts(weights)
+    width = counts.shape[1]
+
+    # others[u, s] for coalition size k, built for every player at once:
+    # others_k = counts[k] - others_{k-1} shifted right by w_u
+    src = np.arange(width)[None, :] - weights[:, None]
+    valid = src >= 0
+    src = np.where(valid, src, 0)
+    lo = np.maximum(q - weights, 0)
+    hi = np.full(n, q)  # exclusive
+    rows = np.arange(n)
+
+    others = np.zeros((n, width), dtype=np.int64)
+    others[:, 0] = 1  # k = 0: the empty coalition
+    # weight of a size-k swing: k! (n-1-k)! / n! = 1 / (n * C(n-1, k))
+    ss = np.zeros(n)
+    for k in range(n):
+        if k:
+            shifted = np.take_along_axis(others, src, axis=1) * valid
+            others = counts[k][None, :] - shifted
+        csum = np.concatenate([np.zeros((n, 1), dtype=np.int64), np.cumsum(others, axis=1)], axis=1)
+        swings_k = csum[rows, np.minimum(hi, width)] - csum[rows, np.minimum(lo, width)]
+        ss += swings_k / (n * math.comb(n - 1, k))
+    return ss
+
+
+def year_power(units):
+    """Output rows for one year's units (UnitYear records with EVs)."""
+    if len(units) > MAX_PLAYERS:
+        raise ValueError(f"{len(units)} units exceed the exact int64 limit of {MAX_PLAYERS}")
+    weights = np.array([u.electoral_votes for u in units], dtype=np.int64)
+    total = int(weights.sum())
+    swings = banzhaf_swings(weights)
+    ss = shapley_shubik(weights)
+    swing_total = int(swings.sum())
+    pivotal_den = 2.0 ** (len(units) - 1)
+    rows = []
+    for u, sw, s in zip(units, swings.tolist(), ss.tolist()):
+        rows.append({
+            'year': u.year,
+            'abbr': u.abbr,
+            'electoral_votes': u.electoral_votes,
+            'ev_share': u.electoral_votes / total if total else 0.0,
+            'banzhaf_swings': sw,
+            'banzhaf_index': sw / swing_total if swing_total else 0.0,
+            'banzhaf_absolute': sw / pivotal_den,
+            'shapley_shubik': s,
+        })
+    return rows
+
+
+def compute(records_by_year):
+    out = []
+    for year in sorted(records_by_year):
+        units = [r for r in records_by_year[year] if not r.is_national and r.electoral_votes > 0]
+        units.sort(key=lambda u: u.abbr)
+        out.extend(year_power(units))
+    return out
+
+
+def write_rows(rows, outfile=DEFAULT_OUTPUT):
+    out = []
+    for r in rows:
+        r = dict(r)
+        for k in ('ev_share', 'banzhaf_index', 'banzhaf_absolute', 'shapley_shubik'):
+            r[k] = f"{r[k]:.10f}"
+        out.append(r)
+    unit_records.write_csv(out, FIELDNAMES, outfile)
+
+
+def main(infile=DEFAULT_INPUT, outfile=DEFAULT_OUTPUT, years=None):
+    by_year = unit_records.load_by_year(infile, years, "power")
+    t0 = time.perf_counter()
+    with pipeline_trace.span("power.compute", years=len(by_year)):
+        rows = compute(by_year)
+    elapsed = time.perf_counter() - t0
+    with pipeline_trace.span("power.write", rows=len(rows)):
+        write_rows(rows, outfile)
+    print(f"Wrote {len(rows)} rows for {len(by_year)} years to {outfile} ({elapsed * 1000:.0f} ms)")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Banzhaf / Shapley-Shubik power per unit per year (docs/power_index.csv)")
+    unit_records.add_engine_args(parser, DEFAULT_OUTPUT)
+    args = unit_records.parse_engine_args(parser)
+    main(args.input, args.out, args.year)
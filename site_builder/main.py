@@ -4,30 +4,41 @@ import re
 from pathlib import Path
 
 import params
+import pipeline_trace
 from .config import CSV_PATH, OUT_DIR, STATE_DIR, UNIT_DIR, PLOTS_DST, PLOTS_SRC, LAST_UPDATED
 from .io_utils import ensure_dirs, write_text, read_csv
 from .pages import build_pages, make_data_page, make_methods_page, make_state_pages, make_index
-from .templates import BASE_CSS, FAVICON_SVG, TESTER_JS
+from .templates import BASE_CSS, FAVICON_SVG
 from .ranker import build_ranker_page
 from .header import make_header
 
 
-def build_site():
+def build_site(rows=None):
+    """
+    Build docs/ from presidential_margins.csv, or from `rows` (the CSV's rows as string
+    dicts, e.g. build_presidential_margins.format_row() output) when given.
+    """
     ensure_dirs()
     write_text(OUT_DIR / "styles.css", BASE_CSS)
     write_text(OUT_DIR / "favicon.svg", FAVICON_SVG)
 
     if PLOTS_SRC.exists() and PLOTS_SRC.is_dir():
-        PLOTS_DST.mkdir(parents=True, exist_ok=True)
-        for item in PLOTS_SRC.iterdir():
-            if item.is_file():
-                shutil.copy2(item, PLOTS_DST / item.name)
+        with pipeline_trace.span("site.copy_plots", cat="io"):
+            PLOTS_DST.mkdir(parents=True, exist_ok=True)
+            for item in PLOTS_SRC.iterdir():
+                if item.is_file():
+                    shutil.copy2(item, PLOTS_DST / item.name)
 
-    rows = read_csv(CSV_PATH)
-    states = build_pages(rows)
+    if rows is None:
+        with pipeline_trace.span("site.read_csv") as sp:
+            rows = read_csv(CSV_PATH)
+            sp.set(rows=len(rows))
+    with pipeline_trace.span("site.pages", rows=len(rows)):
+        states = build_pages(rows)
     # Build State Pages index
     try:
-        make_state_pages(states)
+        with pipeline_trace.span("site.state_pages_index"):
+            make_state_pages(states)
     except Exception as e:
         print(f"Warning: couldn't build state-pages.html: {e}")
 
@@ -37,20 +48,23 @@ def build_site():
         pass
 
     try:
-        make_data_page(rows)
+        with pipeline_trace.span("site.data_page", rows=len(rows)):
+            make_data_page(rows)
     except Exception:
         pass
 
     # Build methods page
     try:
-        make_methods_page()
+        with pipeline_trace.span("site.methods_page"):
+            make_methods_page()
     except Exception as e:
         print(f"Warning: couldn't build methods page: {e}")
 
     # Build index (Home) with auto-updated header/footer and optional tester block
     try:
         # Build index using rows to derive year range and tester UI
-        make_index(states, rows)
+        with pipeline_trace.span("site.index"):
+            make_index(states, rows)
     except Exception as e:
         print(f"Warning: couldn't build index.html: {e}")
 
@@ -2,6 +2,7 @@ from collections import defaultdict
 from typing import List, Dict
 
 import params
+import pipeline_trace
 from .config import OUT_DIR, STATE_DIR, UNIT_DIR, SMALL_STATES, ME_NE_STATES, LAST_UPDATED, FOOTER_TEXT, EXPLANATION_TEXT
 from .io_utils import write_text
 from .tables import split_columns_into_three, group_by_abbr, render_table, render_info_box
@@ -171,6 +172,7 @@ def build_pages(rows: List[Dict]):
 
     # State pages
     for st in states:
+        page_span = pipeline_trace.span("page.state", cat="page", unit=st).start()
         table_rows = by_abbr.get(st, [])
         extra_links = ""
         if st in ME_NE_STATES:
@@ -239,11 +241,13 @@ def build_pages(rows: List[Dict]):
         )
         page = page.replace("%LAST_UPDATED%", LAST_UPDATED)
         write_text(STATE_DIR / f"{st[:2]}.html", page)
+        page_span.finish(rows=len(table_rows))
 
     # District/unit pages
     for unit in district_units:
         if unit.endswith('-AL'):
             continue
+        page_span = pipeline_trace.span("page.unit", cat="page", unit=unit).start()
         table_rows = by_abbr.get(unit, [])
         dlist = sorted([u for u in district_units if u.startswith(unit[:2] + '-')])
         extra_links = ""
@@ -312,8 +316,10 @@ def build_pages(rows: List[Dict]):
         )
         page = page.replace("%LAST_UPDATED%", LAST_UPDATED)
         write_text(UNIT_DIR / f"{unit}.html", page)
+        page_span.finish(rows=len(table_rows))
 
     # NATIONAL page
+    page_span = pipeline_trace.span("page.national", cat="page", unit="NAT").start()
     year_groups = defaultdict(list)
     for r in rows:
         try:
@@ -414,6 +420,7 @@ def build_pages(rows: List[Dict]):
     )
     page = page.replace("%LAST_UPDATED%", LAST_UPDATED)
     write_text(STATE_DIR / f"NAT.html", page)
+    page_span.finish()
 
     return states
 
@@ -4,6 +4,9 @@ import pandas as pd
 import re
 import time
 from pathlib import Path
+import argparse
+
+from fetch_cache import fetch, OfflineCacheMiss
 
 def clean_number(text):
     """Extract integer from text containing numbers with commas, etc."""
@@ -24,24 +27,20 @@ def clean_percentage(text):
     except ValueError:
         return 0.0
 
-def scrape_2024_wikipedia():
+def scrape_2024_wikipedia(offline=False):
     """
     Scrape 2024 presidential election results from Wikipedia.
     Returns DataFrame with same structure as Kenneth Black data.
+    With offline=True the page is replayed from the snapshot cache.
     """
     
     url = "https://en.wikipedia.org/wiki/2024_United_States_presidential_election"
     
     print("Fetching 2024 election data from Wikipedia...")
     
-    # Set up headers to avoid blocking
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
+        # Conditional GET through the snapshot cache (headers set by fetch_cache)
+        response = fetch(url, offline=offline)
         
         soup = BeautifulSoup(response.content, 'html.parser')
         
@@ -169,6 +168,9 @@ def scrape_2024_wikipedia():
         
         return df
         
+    except OfflineCacheMiss as e:
+        print(f"Error: {e}")
+        return None
     except requests.RequestException as e:
         print(f"Error fetching Wikipedia page: {e}")
         return None
@@ -197,7 +199,7 @@ def get_state_code(state_name):
     
     return state_mapping.get(state_name.lower().strip())
 
-def scrape_maine_nebraska_districts():
+def scrape_maine_nebraska_districts(offline=False):
     """
     Attempt to scrape Maine and Nebraska congressional district results.
     These might be on separate pages or sections.
@@ -217,12 +219,7 @@ def scrape_maine_nebraska_districts():
         try:
             print(f"  Checking {state} district results...")
             
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
+            response = fetch(url, offline=offline)
             
             soup = BeautifulSoup(response.content, 'html.parser')
             
@@ -267,7 +264,8 @@ def scrape_maine_nebraska_districts():
                             district_data.append(record)
                             print(f"    Found {state}-{district}: R={trump_votes:,} D={harris_votes:,}")
             
-            time.sleep(1)  # Be nice to Wikipedia
+            if response.from_network:
+                time.sleep(1)  # Be nice to Wikipedia
             
         except Exception as e:
             print(f"  Could not get {state} district data: {e}")
@@ -277,11 +275,15 @@ def scrape_maine_nebraska_districts():
 def main():
     """Main function to scrape 2024 data and save it"""
     
+    parser = argparse.ArgumentParser(description="Scrape 2024 presidential election results from Wikipedia")
+    parser.add_argument("--offline", action="store_true", help="Parse only from cached snapshots; never hit the network")
+    args = parser.parse_args()
+    
     print("🗳️  2024 Presidential Election Wikipedia Scraper")
     print("=" * 60)
     
     # Scrape main state-level results
-    state_df = scrape_2024_wikipedia()
+    state_df = scrape_2024_wikipedia(offline=args.offline)
     
     if state_df is None:
         print("❌ Failed to scrape state-level data")
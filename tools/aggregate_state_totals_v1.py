@@ -9,8 +9,15 @@ Special rules:
 - For ME and NE, also keep each congressional-district row (abbr = ME-01, ME-02, ...), padding numeric districts to two digits.
 - Add a row per year with abbr = NATIONAL that sums all states.
 - All vote fields are integers in the output.
+
+The aggregation is vectorized (categorical state/district columns, padding done once per
+distinct district value) and can stream inputs in chunks (--chunksize) so precinct- or
+county-level files that don't fit in memory go through the same rules.
 """
+import argparse
 from pathlib import Path
+
+import numpy as np
 import pandas as pd
 
 
@@ -20,114 +27,152 @@ IN_CSVS = [
 ]
 OUT_CSV = Path("election_data/state_totals_by_year.csv")
 
+VOTE_COLS = ["D_votes", "R_votes", "T_votes", "total_votes"]
+DISTRICT_STATES = ("ME", "NE")
+READ_DTYPES = {"year": int, "state": "category", "district": "category"}
 
-def pad_district(d):
-    """Return district string padded to two digits for numeric districts, or unchanged for 'AL' or other strings."""
-    if pd.isna(d):
-        return d
-    s = str(d)
-    if s.upper() == "AL":
-        return "AL"
-    try:
-        n = int(s)
-        return f"{n:02d}"
-    except Exception:
-        return s
 
+def pad_districts(districts: pd.Series) -> pd.Series:
+    """Pad numeric districts to two digits ("AL" and other strings unchanged): the distinct values are padded with string ops, then the codes remapped."""
+    cat = districts.astype("category")
+    values = pd.Series(cat.cat.categories.astype(str))
+    stripped = values.str.strip()
+    is_int = stripped.str.fullmatch(r"[+-]?\d+")
+    padded = values.where(~is_int, pd.to_numeric(stripped.where(is_int)).astype("Int64").astype(str).str.zfill(2))
+    padded = padded.where(values.str.upper() != "AL", "AL")
 
-def main():
-    # Read all available input CSVs and concatenate
-    parts = []
-    for p in IN_CSVS:
-        if p.exists():
-            parts.append(pd.read_csv(p, dtype={"year": int, "state": str, "district": str}))
-    if not parts:
-        raise FileNotFoundError(f"No input CSVs found among: {IN_CSVS}")
-    df = pd.concat(parts, ignore_index=True)
+    new_categories, remap = np.unique(padded.to_numpy(dtype=str), return_inverse=True)
+    codes = cat.cat.codes.to_numpy()
+    new_codes = np.where(codes >= 0, remap[np.maximum(codes, 0)], -1)
+    return pd.Series(pd.Categorical.from_codes(new_codes, new_categories), index=districts.index)
+
+
+def partial_aggregates(df: pd.DataFrame):
+    """
+    Aggregate one frame (a whole input or a chunk of one).
 
-    # Ensure numeric vote columns and convert to ints (remove any .0)
-    vote_cols = ["D_votes", "R_votes", "T_votes", "total_votes"]
-    for c in vote_cols:
+    Returns (state_sums, district_keys, district_sums):
+    - state_sums: vote sums per (year, state)
+    - district_keys: distinct (year, state, district_padded) numbered districts, for EV counts
+    - district_sums: vote sums per (year, abbr) for ME/NE district rows
+    """
+    for c in VOTE_COLS:
         df[c] = pd.to_numeric(df[c], errors="coerce").fillna(0).astype(int)
+    # state / district stay categorical: groupbys work on the codes, and strings are only
+    # built for the aggregated rows
+    df["state"] = df["state"].astype("category")
+    df["district_padded"] = pad_districts(df["district"])
+
+    state_sums = df.groupby(["year", "state"], sort=False, observed=True)[VOTE_COLS].sum().reset_index()
+
+    numbered = df[df["district_padded"].notna() & (df["district_padded"] != "AL")]
+    district_keys = numbered[["year", "state", "district_padded"]].drop_duplicates()
+
+    me_ne = numbered[numbered["state"].isin(DISTRICT_STATES)]
+    district_sums = me_ne.groupby(["year", "state", "district_padded"], sort=False, observed=True)[VOTE_COLS].sum().reset_index()
+    district_sums.insert(1, "abbr", district_sums["state"].astype(str) + "-" + district_sums["district_padded"].astype(str))
+    district_sums = district_sums[["year", "abbr"] + VOTE_COLS]
+    return state_sums, district_keys, district_sums
 
-    # Combined state totals (one row per state per year)
-    state_sums = (
-        df.groupby(["year", "state"], sort=False)[vote_cols]
-        .sum()
-        .reset_index()
-    )
 
-    # Compute number of districts per state/year (exclude 'AL' combined rows).
-    # Pad district values first so numeric districts are normalized.
-    df["district_padded"] = df["district"].apply(pad_district)
-    # Count unique numeric districts per (year, state) excluding 'AL' and NaNs
+def combine_partials(partials):
+    """Merge per-chunk partial aggregates into whole-dataset aggregates."""
+    state_parts, key_parts, district_parts = zip(*partials)
+    state_sums = pd.concat(state_parts, ignore_index=True).groupby(["year", "state"], sort=False, observed=True)[VOTE_COLS].sum().reset_index()
+    district_keys = pd.concat(key_parts, ignore_index=True).drop_duplicates()
+    district_sums = pd.concat(district_parts, ignore_index=True).groupby(["year", "abbr"], sort=False)[VOTE_COLS].sum().reset_index()
+    return state_sums, district_keys, district_sums
+
+
+def build_totals(state_sums, district_keys, district_sums) -> pd.DataFrame:
+    """Apply the output rules (EV counts, ME/NE naming, NATIONAL rows, FL 2000) to the aggregates."""
+    # Number of distinct numbered districts per state/year determines electoral votes
     district_counts = (
-        df[df["district_padded"].notna() & (df["district_padded"] != "AL")]
-        .groupby(["year", "state"])["district_padded"]
+        district_keys.groupby(["year", "state"], observed=True)["district_padded"]
         .nunique()
         .reset_index()
         .rename(columns={"district_padded": "num_districts"})
     )
-
-    # merge district_counts into state_sums to compute electoral votes
+    # one row per state and year from here on, so plain strings cost nothing
+    state_sums = state_sums.astype({"state": str})
+    district_counts = district_counts.astype({"state": str})
     state_sums = state_sums.merge(district_counts, on=["year", "state"], how="left")
     # where we don't have per-district rows, assume at least 1 district so EV >= 3
     state_sums["num_districts"] = state_sums["num_districts"].fillna(1).astype(int)
     state_sums["electoral_votes"] = state_sums["num_districts"] + 2
 
     # For ME and NE: combined row should be named ME-AL / NE-AL
-    state_sums["abbr"] = state_sums.apply(
-        lambda r: f"{r['state']}-AL" if r["state"] in ("ME", "NE") else r["state"],
-        axis=1,
-    )
+    is_split = state_sums["state"].isin(DISTRICT_STATES)
+    state_sums["abbr"] = np.where(is_split, state_sums["state"] + "-AL", state_sums["state"])
 
     # Force combined ME-AL and NE-AL to always have exactly 2 electoral votes
     # (the statewide "-AL" rows should represent the two at-large electors)
-    state_sums.loc[state_sums["abbr"].isin(["ME-AL", "NE-AL"]), "electoral_votes"] = 2
+    state_sums.loc[is_split, "electoral_votes"] = 2
 
-    combined = state_sums[["year", "abbr"] + vote_cols + ["electoral_votes"]]
+    combined = state_sums[["year", "abbr"] + VOTE_COLS + ["electoral_votes"]]
 
-    # Keep district rows only for ME and NE (but drop the AL row to avoid double-counting the combined one)
-    me_ne = df[df["state"].isin(("ME", "NE"))].copy()
-    me_ne["district_padded"] = me_ne["district"].apply(pad_district)
-    # drop the AL rows here because combined already contains the statewide AL row
-    me_ne = me_ne[me_ne["district_padded"] != "AL"]
-    me_ne["abbr"] = me_ne["state"] + "-" + me_ne["district_padded"].astype(str)
-    me_ne = me_ne[["year", "abbr"] + vote_cols]
     # district rows (ME/NE) each carry 1 electoral vote for the district
+    me_ne = district_sums[["year", "abbr"] + VOTE_COLS].copy()
     me_ne["electoral_votes"] = 1
 
     # NATIONAL row per year (sum of state combined rows)
-    national = (
-        state_sums.groupby("year")[vote_cols].sum().reset_index()
-    )
+    national = state_sums.groupby("year")[VOTE_COLS + ["electoral_votes"]].sum().reset_index()
     national["abbr"] = "NATIONAL"
-    # national electoral votes = sum of state electoral votes
-    national_ev = state_sums.groupby("year")["electoral_votes"].sum().reset_index()
-    national = national.merge(national_ev, on="year", how="left")
-    national = national[["year", "abbr"] + vote_cols + ["electoral_votes"]]
+    national = national[["year", "abbr"] + VOTE_COLS + ["electoral_votes"]]
 
     # Final assembly: combined (all states), plus ME/NE district rows, plus national
     final = pd.concat([combined, me_ne, national], ignore_index=True)
 
     # Ensure integer dtypes (should already be ints)
-    for c in vote_cols:
+    for c in VOTE_COLS:
         final[c] = final[c].astype(int)
 
     # Sort for readability: year asc, abbr (NATIONAL last)
     final = final.sort_values(by=["year", "abbr"], key=lambda col: col.astype(str))
-    
+
     # correct results for the 2000 Florida recount
     FL_2000_data = {'D_votes': 2912253, 'R_votes': 2912790, 'total_votes': 5963110}
-    final.loc[(final['year'] == 2000) & (final['abbr'] == 'FL'), 'D_votes'] = FL_2000_data['D_votes']
-    final.loc[(final['year'] == 2000) & (final['abbr'] == 'FL'), 'R_votes'] = FL_2000_data['R_votes']
-    final.loc[(final['year'] == 2000) & (final['abbr'] == 'FL'), 'total_votes'] = FL_2000_data['total_votes']
-    final.loc[(final['year'] == 2000) & (final['abbr'] == 'FL'), 'T_votes'] = FL_2000_data['total_votes'] - FL_2000_data['D_votes'] - FL_2000_data['R_votes']
+    fl_2000 = (final['year'] == 2000) & (final['abbr'] == 'FL')
+    final.loc[fl_2000, 'D_votes'] = FL_2000_data['D_votes']
+    final.loc[fl_2000, 'R_votes'] = FL_2000_data['R_votes']
+    final.loc[fl_2000, 'total_votes'] = FL_2000_data['total_votes']
+    final.loc[fl_2000, 'T_votes'] = FL_2000_data['total_votes'] - FL_2000_data['D_votes'] - FL_2000_data['R_votes']
+    return final
+
+
+def iter_input_frames(paths, chunksize=None):
+    """Yield input frames: one per file, or chunks of chunksize rows when streaming."""
+    usecols = list(READ_DTYPES) + VOTE_COLS
+    for p in paths:
+        if chunksize:
+            yield from pd.read_csv(p, dtype=READ_DTYPES, usecols=usecols, chunksize=chunksize)
+        else:
+            yield pd.read_csv(p, dtype=READ_DTYPES, usecols=usecols)
+
+
+def aggregate(paths, chunksize=None) -> pd.DataFrame:
+    """Aggregate the given input CSVs; with chunksize, never hold more than one chunk of raw rows in memory."""
+    paths = [Path(p) for p in paths if Path(p).exists()]
+    if not paths:
+        raise FileNotFoundError(f"No input CSVs found among: {IN_CSVS}")
+    partials = [partial_aggregates(frame) for frame in iter_input_frames(paths, chunksize)]
+    return build_totals(*combine_partials(partials))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate district-level presidential results into state/national totals")
+    parser.add_argument("--inputs", nargs="+", default=[str(p) for p in IN_CSVS], help="Input CSVs (year,state,district,D_votes,R_votes,T_votes,total_votes)")
+    parser.add_argument("--out", default=str(OUT_CSV), help="Output CSV path")
+    parser.add_argument("--chunksize", type=int, default=None, help="Stream inputs in chunks of this many rows (for precinct/county-level files)")
+    args = parser.parse_args()
+
+    final = aggregate(args.inputs, chunksize=args.chunksize)
 
-    OUT_CSV.parent.mkdir(parents=True, exist_ok=True)
-    final.to_csv(OUT_CSV, index=False)
+    out_csv = Path(args.out)
+    out_csv.parent.mkdir(parents=True, exist_ok=True)
+    final.to_csv(out_csv, index=False)
 
-    print(f"Wrote {OUT_CSV} with {len(final):,} rows")
+    print(f"Wrote {out_csv} with {len(final):,} rows")
     print(final.head(20).to_string(index=False))
 
 
@@ -0,0 +1,77 @@
+"""Benchmark the bs4 and lxml scraper backends over saved Wikipedia snapshots.
+
+Pages come from the snapshot cache (tools/fetch_cache.py); populate it once with
+`python tools/wikipedia_scraper.py --years 1916-2024`. Nothing here touches the network.
+
+For every year with a snapshot this times table discovery + parsing for each backend
+and checks that both backends extract identical records.
+
+Run:
+  python tools/bench_wikipedia_parsers.py [--years 1916-2024] [--repeat 3]
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from fetch_cache import read_snapshot, CACHE_DIR
+from wikipedia_scraper import election_url, parse_election_page, parse_years_arg
+
+START_YEAR = 1916
+END_YEAR = 2024
+BACKENDS = ('bs4', 'lxml')
+
+
+def time_backend(content, year, parser, repeat):
+    """Return (best_seconds, records) for parsing one page with one backend."""
+    best = float('inf')
+    records = None
+    for _ in range(repeat):
+        sink = io.StringIO()
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(sink):
+            df = parse_election_page(content, year, parser=parser)
+        best = min(best, time.perf_counter() - t0)
+        records = None if df is None else df.to_dict('records')
+    return best, records
+
+
+def main():
+    all_years = list(range(START_YEAR, END_YEAR + 1, 4))
+    parser = argparse.ArgumentParser(description="Benchmark Wikipedia results-table parser backends on cached pages")
+    parser.add_argument("--years", default=f"{START_YEAR}-{END_YEAR}", help="Years/ranges, e.g. '1960,1968' or '1916-2024'")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per page; the best time is reported")
+    parser.add_argument("--cache-dir", default=str(CACHE_DIR), help="Snapshot cache directory")
+    args = parser.parse_args()
+
+    totals = {b: 0.0 for b in BACKENDS}
+    mismatches = []
+    missing = []
+    print(f"{'year':>6} {'KB':>7} " + " ".join(f"{b + ' ms':>10}" for b in BACKENDS) + "  match")
+    for year in parse_years_arg(args.years, all_years):
+        content, _ = read_snapshot(election_url(year), args.cache_dir)
+        if content is None:
+            missing.append(year)
+            continue
+        results = {b: time_backend(content, year, b, args.repeat) for b in BACKENDS}
+        for b in BACKENDS:
+            totals[b] += results[b][0]
+        same = results['bs4'][1] == results['lxml'][1]
+        if not same:
+            mismatches.append(year)
+        print(f"{year:>6} {len(content) / 1024:>7.0f} "
+              + " ".join(f"{results[b][0] * 1000:>10.1f}" for b in BACKENDS)
+              + f"  {'yes' if same else 'NO'}")
+
+    print("-" * 48)
+    print(f"{'total':>14} " + " ".join(f"{totals[b] * 1000:>10.1f}" for b in BACKENDS))
+    if totals['lxml'] > 0:
+        print(f"Speedup (bs4 / lxml): {totals['bs4'] / totals['lxml']:.1f}x")
+    if missing:
+        print(f"No snapshot for: {missing}")
+    if mismatches:
+        print(f"⚠️  Backends disagree for: {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
@@ -7,24 +7,38 @@ and `2024_info.csv` to obtain state abbreviations and 2024 EVs.
 Output columns: year,abbr,state,electoral_votes
 Includes historical rows (abbr filled when found) and a 2024 row per state
 using `evs_2024` from `2024_info.csv`.
+
+Also rewrites the dense year x unit EV matrix (`docs/ev_matrix.json`, see
+electoral_votes.py) from the new CSV so every consumer sees the same EVs.
 """
 import csv
+import functools
 import os
 import re
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import electoral_votes  # noqa: E402
 
-ROOT = os.path.dirname(__file__)
 EC_SRC = os.path.join(ROOT, 'election_data', 'Electoral_College_to_2020.csv')
 INFO_2024 = os.path.join(ROOT, '2024_info.csv')
 OUT = os.path.join(ROOT, 'election_data', 'electoral_college.csv')
 
 
+_PUNCT_RE = re.compile(r"[\.,\'\"]")
+_SPACE_RE = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=None)
 def normalize(name: str) -> str:
+    # the source repeats ~50 state names across every year, so each is normalized once
     if name is None:
         return ''
     s = name.strip().lower()
     # remove punctuation like periods and commas
-    s = re.sub(r"[\.,\'\"]", '', s)
-    s = re.sub(r"\s+", ' ', s)
+    s = _PUNCT_RE.sub('', s)
+    s = _SPACE_RE.sub(' ', s)
     return s
 
 
@@ -101,6 +115,10 @@ def build():
 
     print(f'Wrote {len(rows_out)} rows to {OUT}')
 
+    matrix = electoral_votes.build_matrix(electoral_votes.read_state_evs(OUT))
+    electoral_votes.write_matrix(matrix)
+    print(f'Wrote {len(matrix.years)} x {len(matrix.units)} EV matrix to {electoral_votes.DEFAULT_OUTPUT}')
+
 
 if __name__ == '__main__':
     build()
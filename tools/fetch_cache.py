@@ -0,0 +1,135 @@
+"""Shared on-disk HTTP snapshot cache for the Wikipedia scrapers.
+
+Raw response bodies are stored under CACHE_DIR keyed by a hash of the URL, next to a
+small JSON sidecar holding the URL, ETag, Last-Modified header and fetch time.
+
+- Online fetches revalidate with conditional GETs (If-None-Match / If-Modified-Since),
+  so an unchanged article costs a 304 instead of a full download.
+- Offline fetches never touch the network and replay the stored snapshot, which makes
+  iterating on parser fixes instant and reproducible.
+"""
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+CACHE_DIR = Path("election_data/wikipedia/snapshots")
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+
+class OfflineCacheMiss(Exception):
+    """Raised when offline replay is requested for a URL that has no stored snapshot."""
+
+
+class CachedResponse:
+    """Response body plus where it came from.
+
+    status is one of:
+    - 'fetched': full download (new or changed page)
+    - 'not_modified': server answered 304, body replayed from the snapshot
+    - 'cached': served from the snapshot without any network request
+    """
+
+    def __init__(self, url, content, status, meta):
+        self.url = url
+        self.content = content
+        self.status = status
+        self.meta = meta
+
+    @property
+    def from_network(self):
+        return self.status in ('fetched', 'not_modified')
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+
+def cache_key(url):
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()[:24]
+
+
+def snapshot_paths(url, cache_dir=CACHE_DIR):
+    """Return (body_path, meta_path) for a URL."""
+    cache_dir = Path(cache_dir)
+    key = cache_key(url)
+    return cache_dir / f"{key}.html", cache_dir / f"{key}.json"
+
+
+def read_snapshot(url, cache_dir=CACHE_DIR):
+    """Return (content, meta) for a stored snapshot, or (None, None) if missing."""
+    body_path, meta_path = snapshot_paths(url, cache_dir)
+    if not body_path.exists():
+        return None, None
+    meta = {}
+    if meta_path.exists():
+        try:
+            meta = json.loads(meta_path.read_text(encoding='utf-8'))
+        except Exception:
+            meta = {}
+    return body_path.read_bytes(), meta
+
+
+def _atomic_write(path, data):
+    tmp = path.with_suffix(path.suffix + '.tmp')
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def write_snapshot(url, content, meta, cache_dir=CACHE_DIR):
+    body_path, meta_path = snapshot_paths(url, cache_dir)
+    body_path.parent.mkdir(parents=True, exist_ok=True)
+    _atomic_write(body_path, content)
+    _atomic_write(meta_path, json.dumps(meta, indent=2).encode('utf-8'))
+
+
+def fetch(url, headers=None, offline=False, cache_dir=CACHE_DIR, max_age=None, timeout=30):
+    """Fetch a URL through the snapshot cache.
+
+    - offline: replay the stored snapshot only; raise OfflineCacheMiss if there is none.
+    - max_age: if set (seconds), a snapshot younger than this is returned without revalidating.
+
+    Raises requests.RequestException on network/HTTP errors (online mode).
+    """
+    content, meta = read_snapshot(url, cache_dir)
+
+    if offline:
+        if content is None:
+            raise OfflineCacheMiss(f"No cached snapshot for {url} in {cache_dir}")
+        return CachedResponse(url, content, 'cached', meta)
+
+    if content is not None and max_age is not None:
+        if time.time() - meta.get('fetched_at', 0) < max_age:
+            return CachedResponse(url, content, 'cached', meta)
+
+    import requests
+
+    request_headers = dict(DEFAULT_HEADERS)
+    request_headers.update(headers or {})
+    if content is not None:
+        if meta.get('etag'):
+            request_headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            request_headers['If-Modified-Since'] = meta['last_modified']
+
+    response = requests.get(url, headers=request_headers, timeout=timeout)
+
+    if response.status_code == 304 and content is not None:
+        meta['fetched_at'] = time.time()
+        write_snapshot(url, content, meta, cache_dir)
+        return CachedResponse(url, content, 'not_modified', meta)
+
+    response.raise_for_status()
+    meta = {
+        'url': url,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'fetched_at': time.time(),
+        'sha256': hashlib.sha256(response.content).hexdigest(),
+    }
+    write_snapshot(url, response.content, meta, cache_dir)
+    return CachedResponse(url, response.content, 'fetched', meta)
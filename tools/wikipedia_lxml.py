@@ -0,0 +1,227 @@
+"""lxml parser backend for the Wikipedia election scraper.
+
+Streams through the raw page bytes to the results table using cheap signals: each
+`<table>` tag's class attribute and its `<tr>` count are read straight from the byte
+span, and only tables that pass those checks are handed to lxml for full-text
+extraction. The chosen table is normalized once into a dense rowspan/colspan grid
+that drives header analysis.
+
+The returned table exposes the small subset of the BeautifulSoup API that
+wikipedia_scraper.parse_results_table uses (find_all / get_text / get), so the
+per-year special cases in that function stay in one place for both backends.
+"""
+import re
+
+from lxml import etree
+
+# text() nodes that BeautifulSoup's get_text() would include (it skips <style>/<script>)
+_TEXT_XPATH = etree.XPath('.//text()[not(ancestor::style) and not(ancestor::script)]')
+_ROWS_XPATH = etree.XPath('./tr | ./thead/tr | ./tbody/tr | ./tfoot/tr')
+_CELLS_XPATH = etree.XPath('./td | ./th')
+
+MIN_RESULT_ROWS = 30
+
+
+def element_text(el):
+    return ''.join(_TEXT_XPATH(el))
+
+
+class Cell:
+    """A td/th element with cached text, mimicking bs4's Tag.get_text()/get()."""
+
+    __slots__ = ('el', '_text')
+
+    def __init__(self, el):
+        self.el = el
+        self._text = None
+
+    def get_text(self):
+        if self._text is None:
+            self._text = element_text(self.el)
+        return self._text
+
+    def get(self, key, default=None):
+        return self.el.get(key, default)
+
+
+class Row:
+    __slots__ = ('cells',)
+
+    def __init__(self, tr):
+        self.cells = [Cell(c) for c in _CELLS_XPATH(tr)]
+
+    def find_all(self, names=None):
+        return self.cells
+
+
+class ResultsTable:
+    """Results table wrapper: raw rows (bs4-compatible) plus the dense header grid."""
+
+    def __init__(self, el):
+        self.el = el
+        self.rows = [Row(tr) for tr in _ROWS_XPATH(el)]
+        self.grid = dense_grid(self.rows)
+
+    def find_all(self, name=None):
+        return self.rows
+
+    def get_text(self):
+        return element_text(self.el)
+
+
+def _span(cell, attr):
+    try:
+        return max(1, int(cell.get(attr, 1)))
+    except (TypeError, ValueError):
+        return 1
+
+
+def dense_grid(rows):
+    """
+    Expand rowspan/colspan into a dense grid: grid[r][c] is the Cell covering that
+    position (the same Cell object repeats across the positions it spans), or None.
+    """
+    grid = []
+    pending = {}  # (row, col) -> Cell carried down by a rowspan
+    for r, row in enumerate(rows):
+        out = []
+        c = 0
+        for cell in row.cells:
+            while (r, c) in pending:
+                out.append(pending.pop((r, c)))
+                c += 1
+            colspan = _span(cell, 'colspan')
+            rowspan = _span(cell, 'rowspan')
+            for dc in range(colspan):
+                out.append(cell)
+                for dr in range(1, rowspan):
+                    pending[(r + dr, c + dc)] = cell
+            c += colspan
+        # rowspans that hang past the last cell of this row
+        while (r, c) in pending:
+            out.append(pending.pop((r, c)))
+            c += 1
+        grid.append(out)
+    width = max((len(g) for g in grid), default=0)
+    for g in grid:
+        g.extend([None] * (width - len(g)))
+    return grid
+
+
+def column_descriptions(grid, header_rows=4):
+    """Lower-cased text of every distinct cell covering each column in the first header_rows rows."""
+    width = len(grid[0]) if grid else 0
+    descriptions = []
+    for c in range(width):
+        seen = []
+        parts = []
+        for row in grid[:header_rows]:
+            cell = row[c]
+            if cell is None or any(cell is s for s in seen):
+                continue
+            seen.append(cell)
+            parts.append(cell.get_text().strip().lower())
+        descriptions.append(' '.join(parts).strip())
+    return descriptions
+
+
+def analyze_header_grid(grid, rep_keywords, dem_keywords):
+    """
+    Grid-based equivalent of wikipedia_scraper.analyze_table_header.
+    Returns {'r_col', 'd_col', 'total_col'} or None.
+    """
+    col_descriptions = column_descriptions(grid)
+    num_cols = len(col_descriptions)
+    if num_cols < 3:
+        return None
+
+    r_col = None
+    d_col = None
+    total_col = None
+    for i, desc in enumerate(col_descriptions):
+        if i == 0:
+            continue
+        has_vote = 'votes' in desc or 'vote' in desc or re.search(r'\d', desc)
+        if not r_col and any(k in desc for k in rep_keywords + ['republican', 'rep', 'gop']) and has_vote:
+            r_col = i
+        if not d_col and any(k in desc for k in dem_keywords + ['democratic', 'democrat', 'dem']) and has_vote:
+            d_col = i
+        if not total_col and 'total' in desc:
+            if 'votes' in desc or 'vote' in desc or '#' in desc or 'state total' in desc:
+                total_col = i
+
+    # Fallback: assume standard layout (state, rep_votes, dem_votes, ...)
+    if not r_col or not d_col:
+        r_col, d_col = 1, 2
+        if num_cols >= 4:
+            total_col = num_cols - 1
+
+    return {'r_col': r_col, 'd_col': d_col, 'total_col': total_col}
+
+
+def _looks_like_results(table_el):
+    table_text = element_text(table_el).lower()
+    indicators = [
+        'state' in table_text and ('votes' in table_text or '#' in table_text),
+        'alabama' in table_text and 'alaska' in table_text,
+        'electoral' in table_text or "ev" in table_text and ('republican' in table_text or 'democratic' in table_text),
+    ]
+    return all(indicators) and re.search(r'\d{1,3}(,\d{3})+', table_text) is not None
+
+
+_TABLE_OPEN = re.compile(rb'<table\b[^>]*>', re.I)
+_TABLE_TAG = re.compile(rb'<table\b|</table\s*>', re.I)
+_TR_OPEN = re.compile(rb'<tr\b', re.I)
+_CLASS_ATTR = re.compile(rb'class\s*=\s*["\']([^"\']*)["\']', re.I)
+
+
+def _table_end(content, start):
+    """Byte offset just past the </table> matching the <table> at start (nesting-aware)."""
+    depth = 0
+    for m in _TABLE_TAG.finditer(content, start):
+        if m.group(0)[1:2] == b'/':
+            depth -= 1
+            if depth == 0:
+                return m.end()
+        else:
+            depth += 1
+    return len(content)
+
+
+def iter_wikitable_spans(content):
+    """Yield (start, end, n_rows) for every wikitable in document order, without parsing HTML."""
+    for m in _TABLE_OPEN.finditer(content):
+        cls = _CLASS_ATTR.search(m.group(0))
+        if not cls or b'wikitable' not in cls.group(1).split():
+            continue
+        end = _table_end(content, m.start())
+        yield m.start(), end, len(_TR_OPEN.findall(content, m.start(), end))
+
+
+def parse_table_span(content, start, end):
+    """Parse one table's bytes with lxml and return its <table> element."""
+    text = content[start:end].decode('utf-8', errors='replace')
+    root = etree.fromstring(text, etree.HTMLParser())
+    return root.find('.//table')
+
+
+def find_results_table(content, year=None):
+    """
+    Return a ResultsTable for the results table on the page, or None.
+
+    Same selection rules as wikipedia_scraper.find_results_table: the first wikitable
+    passing every indicator, else the wikitable with the most rows. Class and row
+    count come from the raw bytes; only tables with enough rows are parsed by lxml.
+    """
+    largest, largest_rows = None, -1
+    for start, end, n_rows in iter_wikitable_spans(content):
+        if n_rows > largest_rows:
+            largest, largest_rows = (start, end), n_rows
+        if n_rows > MIN_RESULT_ROWS:
+            table = parse_table_span(content, start, end)
+            if table is not None and _looks_like_results(table):
+                return ResultsTable(table)
+    if largest is None:
+        return None
+    table = parse_table_span(content, *largest)
+    return ResultsTable(table) if table is not None else None
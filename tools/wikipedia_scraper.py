@@ -5,6 +5,11 @@ import re
 import time
 from pathlib import Path
 import sys
+import argparse
+import hashlib
+import json
+
+from fetch_cache import fetch, OfflineCacheMiss
 
 def clean_number(text):
     """Extract integer from text containing numbers with commas, etc."""
@@ -72,60 +77,86 @@ def get_candidate_parties(year):
     
     return candidates.get(year, (['republican'], ['democratic']))
 
-def scrape_wikipedia_election(year):
+def election_url(year):
+    return f"https://en.wikipedia.org/wiki/{year}_United_States_presidential_election"
+
+def fetch_election_page(year, offline=False):
     """
-    Scrape presidential election results for a given year from Wikipedia.
+    Fetch the raw article HTML for a given year through the snapshot cache.
+    Returns a fetch_cache.CachedResponse (check .from_network to see if the network was hit).
+    """
+    url = election_url(year)
+    page = fetch(url, offline=offline)
+    source = {'fetched': 'downloaded', 'not_modified': 'not modified (304), using snapshot', 'cached': 'offline snapshot'}[page.status]
+    print(f"  🌐 {url}: {source}")
+    return page
+
+def parse_election_page(content, year, parser='lxml'):
+    """
+    Parse raw article HTML for a given year.
     Returns DataFrame with state-level results.
+
+    parser: 'lxml' (streaming, see wikipedia_lxml.py) or 'bs4' (BeautifulSoup html.parser).
     """
+    header_info = None
+    if parser == 'lxml':
+        import wikipedia_lxml
+        results_table = wikipedia_lxml.find_results_table(content, year)
+    else:
+        soup = BeautifulSoup(content, 'html.parser')
+        # Find the results table
+        results_table = find_results_table(soup, year)
     
-    url = f"https://en.wikipedia.org/wiki/{year}_United_States_presidential_election"
+    if not results_table:
+        print(f"  ❌ Could not find results table for {year}")
+        return None
     
-    print(f"Scraping {year} election from: {url}")
+    print(f"  ✅ Found results table")
     
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
+    # Get candidate info for this year
+    rep_keywords, dem_keywords = get_candidate_parties(year)
+    print(f"  🗳️  Looking for Republican keywords: {rep_keywords}, Democratic keywords: {dem_keywords}")
+    
+    if parser == 'lxml':
+        header_info = wikipedia_lxml.analyze_header_grid(results_table.grid, rep_keywords, dem_keywords)
+    
+    # Parse the table
+    election_data = parse_results_table(results_table, year, rep_keywords, dem_keywords, header_info=header_info)
+    
+    if not election_data:
+        print(f"  ❌ No data extracted from table")
+        return None
+    
+    # Convert to DataFrame
+    df = pd.DataFrame(election_data)
+    
+    print(f"  ✅ Extracted {len(df)} state records")
+    
+    # Validate data
+    total_votes = df['total_votes'].sum()
+    total_r = df['R_votes'].sum()
+    total_d = df['D_votes'].sum()
+    
+    print(f"  📊 Totals: R={total_r:,} D={total_d:,} Total={total_votes:,}")
+    
+    return df
+
+def scrape_wikipedia_election(year, offline=False, parser='lxml'):
+    """
+    Scrape presidential election results for a given year from Wikipedia.
+    Returns DataFrame with state-level results.
+    With offline=True the page is replayed from the snapshot cache without any network access.
+    """
+    
+    print(f"Scraping {year} election")
     
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Find the results table
-        results_table = find_results_table(soup, year)
-        
-        if not results_table:
-            print(f"  ❌ Could not find results table for {year}")
-            return None
-        
-        print(f"  ✅ Found results table")
-        
-        # Get candidate info for this year
-        rep_keywords, dem_keywords = get_candidate_parties(year)
-        print(f"  🗳️  Looking for Republican keywords: {rep_keywords}, Democratic keywords: {dem_keywords}")
-        
-        # Parse the table
-        election_data = parse_results_table(results_table, year, rep_keywords, dem_keywords)
-        
-        if not election_data:
-            print(f"  ❌ No data extracted from table")
-            return None
-        
-        # Convert to DataFrame
-        df = pd.DataFrame(election_data)
-        
-        print(f"  ✅ Extracted {len(df)} state records")
-        
-        # Validate data
-        total_votes = df['total_votes'].sum()
-        total_r = df['R_votes'].sum()
-        total_d = df['D_votes'].sum()
-        
-        print(f"  📊 Totals: R={total_r:,} D={total_d:,} Total={total_votes:,}")
-        
-        return df
+        page = fetch_election_page(year, offline=offline)
+        return parse_election_page(page.content, year, parser=parser)
         
+    except OfflineCacheMiss as e:
+        print(f"  ❌ {e}")
+        return None
     except requests.RequestException as e:
         print(f"  ❌ Error fetching page: {e}")
         return None
@@ -164,11 +195,12 @@ def find_results_table(soup, year):
     
     return None
 
-def parse_results_table(table, year, rep_keywords, dem_keywords):
+def parse_results_table(table, year, rep_keywords, dem_keywords, header_info=None):
     """
     Parse the results table and extract vote data.
     This is the tricky part - table structures vary by year.
     Look for "Results by state" or similar headers.
+    header_info: precomputed column layout (e.g. from the lxml dense grid); derived from the first rows if None.
     """
     
     rows = table.find_all('tr')
@@ -183,7 +215,8 @@ def parse_results_table(table, year, rep_keywords, dem_keywords):
         pass # something weird is happening in this year
     
     # Analyze header to understand column structure
-    header_info = analyze_table_header(rows[0:4], rep_keywords, dem_keywords)
+    if header_info is None:
+        header_info = analyze_table_header(rows[0:4], rep_keywords, dem_keywords)
     
     if not header_info:
         print(f"    Could not understand table structure")
@@ -433,15 +466,92 @@ def analyze_table_header(header_rows, rep_keywords, dem_keywords):
         'total_col': total_col
     }
 
-def scrape_multiple_years(years, output_dir="election_data/wikipedia"):
+REVISIONS_FILE = "revisions.json"
+COMBINED_FILE = "wikipedia_presidential_elections_combined.csv"
+COMBINED_COLUMNS = ['year', 'abbr', 'D_votes', 'R_votes', 'T_votes', 'total_votes']
+
+def page_revision(content):
+    """
+    Identify the article version a page was rendered from.
+    Returns {'revision_id': int or None, 'sha256': hex digest of the raw HTML}.
+    """
+    m = re.search(rb'"wgRevisionId"\s*:\s*(\d+)', content)
+    return {
+        'revision_id': int(m.group(1)) if m else None,
+        'sha256': hashlib.sha256(content).hexdigest(),
+    }
+
+def parser_fingerprint(parser):
+    """Hash of the parsing code + backend, so parser fixes invalidate previously recorded years."""
+    h = hashlib.sha256(parser.encode('utf-8'))
+    here = Path(__file__).resolve().parent
+    for name in ('wikipedia_scraper.py', 'wikipedia_lxml.py'):
+        path = here / name
+        if path.exists():
+            h.update(path.read_bytes())
+    return h.hexdigest()[:16]
+
+def load_revisions(output_path):
+    path = Path(output_path) / REVISIONS_FILE
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding='utf-8'))
+    except Exception:
+        print(f"  Warning: could not read {path}; treating every year as changed")
+        return {}
+
+def save_revisions(output_path, revisions):
+    path = Path(output_path) / REVISIONS_FILE
+    path.write_text(json.dumps(dict(sorted(revisions.items())), indent=2) + "\n", encoding='utf-8')
+
+def is_unchanged(entry, revision, fingerprint):
+    """True when the recorded entry matches this page version and parser."""
+    if not entry or entry.get('parser') != fingerprint:
+        return False
+    if revision['revision_id'] is not None and entry.get('revision_id') is not None:
+        return entry['revision_id'] == revision['revision_id']
+    return entry.get('sha256') == revision['sha256']
+
+def splice_combined(combined_file, changed, output_path):
+    """
+    Rebuild the combined CSV by replacing only the rows of changed years.
+    changed: {year: DataFrame}. Falls back to the per-year files when no combined file exists yet.
+    """
+    if combined_file.exists():
+        base = pd.read_csv(combined_file)
+        base = base[~base['year'].isin(list(changed))]
+        parts = [base] + list(changed.values())
+    else:
+        parts = list(changed.values())
+        for year_file in sorted(Path(output_path).glob("wikipedia_[0-9][0-9][0-9][0-9].csv")):
+            year = int(year_file.stem.split('_')[1])
+            if year not in changed:
+                parts.append(pd.read_csv(year_file))
+    combined_df = pd.concat(parts, ignore_index=True)
+    # sort by year and state
+    combined_df = combined_df.sort_values(by=['year', 'abbr'])
+    # set column order
+    return combined_df[COMBINED_COLUMNS]
+
+def scrape_multiple_years(years, output_dir="election_data/wikipedia", offline=False, parser='lxml', force=False):
     """
     Scrape multiple election years and save results.
+    With offline=True every page is replayed from the snapshot cache (no network, no delays).
+
+    Incremental: the article revision id (or content hash) and parser fingerprint of each
+    year are recorded in revisions.json. Years whose page and parser are unchanged since the
+    last run are neither parsed nor rewritten, and the combined CSV is only regenerated
+    (by splicing in the changed years) when something changed. force=True reparses everything.
     """
     
     output_path = Path(output_dir)
     output_path.mkdir(exist_ok=True)
     
-    all_data = []
+    revisions = load_revisions(output_path)
+    fingerprint = parser_fingerprint(parser)
+    changed = {}
+    unchanged_years = []
     successful_years = []
     
     print(f"🗳️  Wikipedia Presidential Election Scraper")
@@ -451,64 +561,105 @@ def scrape_multiple_years(years, output_dir="election_data/wikipedia"):
     for year in years:
         print(f"\n📊 Processing {year}...")
         
-        df = scrape_wikipedia_election(year)
+        page = None
+        df = None
+        year_file = output_path / f"wikipedia_{year}.csv"
+        try:
+            page = fetch_election_page(year, offline=offline)
+            revision = page_revision(page.content)
+            if not force and year_file.exists() and is_unchanged(revisions.get(str(year)), revision, fingerprint):
+                print(f"  ⏭️  Unchanged since last run (revision {revision['revision_id']}), skipping parse and write")
+                unchanged_years.append(year)
+                successful_years.append(year)
+            else:
+                df = parse_election_page(page.content, year, parser=parser)
+        except OfflineCacheMiss as e:
+            print(f"  ❌ {e}")
+        except requests.RequestException as e:
+            print(f"  ❌ Error fetching page: {e}")
+        except Exception as e:
+            print(f"  ❌ Error processing data: {e}")
         
         if df is not None and len(df) > 0:
             # Save individual year file
-            year_file = output_path / f"wikipedia_{year}.csv"
             df.to_csv(year_file, index=False)
             print(f"  💾 Saved: {year_file}")
             
-            all_data.append(df)
+            changed[year] = df
             successful_years.append(year)
+            revisions[str(year)] = dict(revision, parser=fingerprint, url=page.url, rows=len(df))
             
             # Show a sample for verification
             print(f"  📋 Sample data:")
             sample = df.head(3)
             for _, row in sample.iterrows():
                 print(f"    {row['abbr']}: R={row['R_votes']:,} D={row['D_votes']:,} T={row['T_votes']:,}, Total={row['total_votes']:,}")
-        else:
+        elif year not in unchanged_years:
             print(f"  ❌ Failed to scrape {year}")
         
-        # Be nice to Wikipedia
-        time.sleep(2)
-    
-    # Combine all successful years
-    if all_data:
-        combined_df = pd.concat(all_data, ignore_index=True)
-        # sort by year and state
-        combined_df = combined_df.sort_values(by=['year', 'abbr'])
-        # set column order
-        combined_df = combined_df[['year', 'abbr', 'D_votes', 'R_votes', 'T_votes', 'total_votes']]
-        
-        # Save combined file
-        combined_file = output_path / "wikipedia_presidential_elections_combined.csv"
-        combined_df.to_csv(combined_file, index=False)
-        
-        print(f"\n{'='*60}")
-        print(f"✅ SCRAPING COMPLETE")
-        print(f"{'='*60}")
-        print(f"Successful years: {successful_years}")
-        print(f"Total records: {len(combined_df):,}")
-        print(f"Combined file: {combined_file}")
-        
-        # Summary statistics
-        print(f"\n📈 SUMMARY BY YEAR:")
-        for year in sorted(successful_years):
-            year_data = combined_df[combined_df['year'] == year]
-            total_r = year_data['R_votes'].sum()
-            total_d = year_data['D_votes'].sum()
-            total_votes = year_data['total_votes'].sum()
-            print(f"  {year}: R={total_r:,} D={total_d:,} Total={total_votes:,}")
-        
-        return combined_df
-    else:
+        # Be nice to Wikipedia (only needed when we actually hit the network)
+        if page is not None and page.from_network:
+            time.sleep(2)
+    
+    if not successful_years:
         print(f"\n❌ No data was successfully scraped")
         return None
+    
+    combined_file = output_path / COMBINED_FILE
+    if changed:
+        # Splice the changed years into the combined file
+        combined_df = splice_combined(combined_file, changed, output_path)
+        combined_df.to_csv(combined_file, index=False)
+        save_revisions(output_path, revisions)
+    elif combined_file.exists():
+        combined_df = pd.read_csv(combined_file)
+    else:
+        combined_df = splice_combined(combined_file, {}, output_path)
+        combined_df.to_csv(combined_file, index=False)
+    
+    print(f"\n{'='*60}")
+    print(f"✅ SCRAPING COMPLETE")
+    print(f"{'='*60}")
+    print(f"Changed years: {sorted(changed)}")
+    print(f"Unchanged years (skipped): {unchanged_years}")
+    print(f"Total records: {len(combined_df):,}")
+    print(f"Combined file: {combined_file}{'' if changed else ' (not rewritten)'}")
+    
+    # Summary statistics
+    print(f"\n📈 SUMMARY BY YEAR:")
+    for year in sorted(changed):
+        year_data = combined_df[combined_df['year'] == year]
+        total_r = year_data['R_votes'].sum()
+        total_d = year_data['D_votes'].sum()
+        total_votes = year_data['total_votes'].sum()
+        print(f"  {year}: R={total_r:,} D={total_d:,} Total={total_votes:,}")
+    
+    return combined_df
+
+def parse_years_arg(text, all_years):
+    """Parse a --years value like '1960,1968,1984' or '1916-2024' into a list of election years."""
+    years = []
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            lo, hi = (int(x) for x in part.split('-', 1))
+            years.extend(y for y in all_years if lo <= y <= hi)
+        else:
+            years.append(int(part))
+    return years
 
 def main():
     """Main function"""
     
+    parser = argparse.ArgumentParser(description="Scrape Wikipedia presidential election results by state")
+    parser.add_argument("--years", help="Comma-separated years and/or ranges, e.g. '1960,1968,1984' or '1916-2024' (skips the interactive prompt)")
+    parser.add_argument("--offline", action="store_true", help="Parse only from cached snapshots; never hit the network")
+    parser.add_argument("--parser", choices=["lxml", "bs4"], default="lxml", help="HTML parser backend (default: lxml)")
+    parser.add_argument("--force", action="store_true", help="Reparse and rewrite every year even if its article revision is unchanged")
+    args = parser.parse_args()
+    
     # Define years to scrape
     # Start with recent years that are most likely to work
     priority_years = [2020, 2016, 2012, 2008, 2004, 2000]
@@ -517,6 +668,14 @@ def main():
     all_years = list(range(END_YEAR, START_YEAR - 1, -4))
     #all_years = [2024, 2020, 2016, 2012, 2008, 2004, 2000, 1996, 1992, 1988, 1984, 1980, 1976, 1972, 1968, 1964]
     
+    if args.years:
+        years_to_scrape = parse_years_arg(args.years, all_years)
+        print(f"\nScraping years: {years_to_scrape}")
+        result_df = scrape_multiple_years(years_to_scrape, offline=args.offline, parser=args.parser, force=args.force)
+        if result_df is None:
+            sys.exit(1)
+        return
+    
     print("Which years would you like to scrape?")
     print("1. Priority years (2000-2020) - most reliable")
     print(f"2. All years ({START_YEAR}-{END_YEAR}) - comprehensive but may have some failures")
@@ -539,7 +698,7 @@ def main():
     print(f"\nScraping years: {years_to_scrape}")
     
     # Run the scraper
-    result_df = scrape_multiple_years(years_to_scrape)
+    result_df = scrape_multiple_years(years_to_scrape, offline=args.offline, parser=args.parser, force=args.force)
     
     if result_df is not None:
         print(f"\n🎉 SUCCESS!")# Wikipedia data is ready for comparison with Kenneth Black dataset.")
@@ -0,0 +1,157 @@
+"""Compact unit-year records shared by the flip solver, the stop builder and simulations.
+
+UnitYear is a __slots__ class (no per-instance dict) holding one row of the margins
+table, with the winner, runner-up and votes_to_flip computed once at construction
+instead of by every consumer:
+
+  party_win         'D' / 'R' / 'T' by raw votes (ties go D, then R)
+  winner_votes      the winner's votes
+  runner_up_votes   the best of the other two
+  votes_to_flip     (winner_votes - runner_up_votes) // 2 + 1
+
+SPLIT_SLATES / allocation() hold the EVs each party gets from a unit, with Alabama's
+split slates (1960: 5 D + 6 unpledged, 1948: all 11 Dixiecrat unless R carries it); the
+flip solver, the contingent solver and the scenario cube all allocate through them.
+
+from_margin_row() accepts a presidential_margins.csv row as read by csv.DictReader
+(strings) or a typed build_presidential_margins.compute_margins() row. Only the stdlib
+is imported, so the flip solver keeps a fast startup.
+
+The per-year engines (power_index, paths_to_victory, contingent_flip, ev_distribution,
+build_scenario_cube) share load_by_year() for input, write_csv() for output and
+add_engine_args() / parse_engine_args() for their --input / --out / --year / --trace flags.
+"""
+import csv
+import os
+from collections import defaultdict
+
+import pipeline_trace
+
+
+NATIONAL_ABBRS = ("NATIONAL", "NAT")
+PARTIES = ('D', 'R', 'T')
+DEFAULT_INPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "presidential_margins.csv")
+
+# (year, abbr) -> {carrying party: (D, R, T) EVs}; 'T' stands for unpledged / Dixiecrat electors
+SPLIT_SLATES = {
+    (1960, 'AL'): {'D': (5, 0, 6), 'T': (5, 0, 6), 'R': (0, 11, 0)},
+    (1948, 'AL'): {'D': (0, 0, 11), 'T': (0, 0, 11), 'R': (0, 11, 0)},
+}
+
+
+class UnitYear:
+    __slots__ = (
+        "year", "abbr", "D_votes", "R_votes", "T_votes", "total_votes", "electoral_votes",
+        "relative_margin", "third_party_share", "national_margin",
+        "party_win", "winner_votes", "runner_up_votes", "votes_to_flip",
+    )
+
+    def __init__(self, year, abbr, D_votes, R_votes, T_votes, total_votes, electoral_votes,
+                 relative_margin=0.0, third_party_share=0.0, national_margin=0.0):
+        self.year = year
+        self.abbr = abbr
+        self.D_votes = D_votes
+        self.R_votes = R_votes
+        self.T_votes = T_votes
+        self.total_votes = total_votes
+        self.electoral_votes = electoral_votes
+        self.relative_margin = relative_margin
+        self.third_party_share = third_party_share
+        self.national_margin = national_margin
+
+        d, r, t = D_votes, R_votes, T_votes
+        if d >= r and d >= t:
+            self.party_win, self.winner_votes, self.runner_up_votes = 'D', d, max(r, t)
+        elif r >= d and r >= t:
+            self.party_win, self.winner_votes, self.runner_up_votes = 'R', r, max(d, t)
+        else:
+            self.party_win, self.winner_votes, self.runner_up_votes = 'T', t, max(d, r)
+        self.votes_to_flip = (self.winner_votes - self.runner_up_votes) // 2 + 1
+
+    @property
+    def is_national(self):
+        return self.abbr in NATIONAL_ABBRS
+
+    def __repr__(self):
+        return (f"UnitYear({self.year}, {self.abbr!r}, D={self.D_votes}, R={self.R_votes}, T={self.T_votes}, "
+                f"ev={self.electoral_votes}, win={self.party_win})")
+
+
+def allocation(u, party):
+    """(D, R, T) EVs the unit gives when `party` carries it."""
+    split = SPLIT_SLATES.get((u.year, u.abbr))
+    if split:
+        return split[party]
+    ev = u.electoral_votes
+    return tuple(ev if p == party else 0 for p in PARTIES)
+
+
+def _num(v, default=0.0):
+    if v is None or v == '':
+        return default
+    try:
+        return float(v)
+    except Exception:
+        return default
+
+
+def from_margin_row(r):
+    """UnitYear from a margins row (csv strings or typed values); unparseable numbers are 0."""
+    return UnitYear(
+        int(float(r['year'])), r['abbr'],
+        int(_num(r.get('D_votes'))), int(_num(r.get('R_votes'))), int(_num(r.get('T_votes'))),
+        int(_num(r.get('total_votes'))), int(_num(r.get('electoral_votes'))),
+        _num(r.get('relative_margin')), _num(r.get('third_party_share')), _num(r.get('national_margin')),
+    )
+
+
+def from_margin_rows(rows):
+    return [from_margin_row(r) for r in rows]
+
+
+def group_by_year(records):
+    by = defaultdict(list)
+    for r in records:
+        by[r.year].append(r)
+    return dict(by)
+
+
+def load_by_year(infile=DEFAULT_INPUT, years=None, stage="records"):
+    """{year: [UnitYear]} from a margins CSV, limited to `years` when given (traced as <stage>.load)."""
+    with pipeline_trace.span(f"{stage}.load") as sp:
+        with open(infile, newline='', encoding='utf-8') as f:
+            records = from_margin_rows(csv.DictReader(f))
+        by_year = group_by_year(records)
+        if years:
+            wanted = set(years)
+            by_year = {y: v for y, v in by_year.items() if y in wanted}
+        sp.set(rows=len(records), years=len(by_year))
+    return by_year
+
+
+def write_csv(rows, fieldnames, outfile):
+    """Write dict rows with a header, creating the output directory."""
+    os.makedirs(os.path.dirname(outfile) or ".", exist_ok=True)
+    with open(outfile, 'w', newline='', encoding='utf-8') as f:
+        w = csv.DictWriter(f, fieldnames=fieldnames)
+        w.writeheader()
+        w.writerows(rows)
+
+
+def add_engine_args(parser, default_out=None, out_help="Output CSV", years=True):
+    """The flags every per-year engine takes: --input, --out (when default_out), --year, --trace."""
+    parser.add_argument("--input", default=DEFAULT_INPUT, help="presidential_margins.csv")
+    if default_out is not None:
+        parser.add_argument("--out", default=default_out, help=out_help)
+    if years:
+        parser.add_argument("--year", type=int, nargs="*", help="Only these years")
+    parser.add_argument("--trace", help="Write a Chrome trace-event JSON of the stages here")
+    return parser
+
+
+def parse_engine_args(parser):
+    """parse_args(), enabling tracing when --trace was given."""
+    args = parser.parse_args()
+    if args.trace:
+        pipeline_trace.enable(args.trace)
+    return args
@@ -18,6 +18,74 @@ def lean_str(lean, third_party=False) -> str:
     else:
         return "0" if third_party else "EVEN"
 
+# Vectorized lean_str: magnitudes are rounded to integer counts of 0.1 (or 0.01 for
+# third-party percentages) and looked up in a table of preformatted strings, so the
+# per-element work is an index instead of a branch plus an f-string.
+_LEAN_TABLES = {}
+_LEAN_TABLE_LIMIT = 1_000_000  # magnitudes past this (or NaN/inf) use lean_str itself
+
+
+def _lean_table(third_party, n_max):
+    """Strings for counts 0..n_max, interleaved: [2n] = first prefix, [2n+1] = second."""
+    import numpy as np
+    table = _LEAN_TABLES.get(third_party)
+    if table is None or len(table) < 2 * (n_max + 1):
+        size = max(4096, 1 << int(n_max + 1).bit_length())
+        if third_party:
+            # pick = sign bit: '' / '-'
+            mags = [f"{n // 100}.{n % 100:02d}" for n in range(size)]
+            strs = [s for m in mags for s in (f"{m}%", f"-{m}%")]
+        else:
+            # pick = lean > 0: 'R+' / 'D+'
+            mags = [f"{n // 10}.{n % 10}" for n in range(size)]
+            strs = [s for m in mags for s in (f"R+{m}", f"D+{m}")]
+        table = np.array(strs)
+        _LEAN_TABLES[third_party] = table
+    return table
+
+
+def lean_str_array(leans, third_party=False, none_str='0'):
+    """
+    Vectorized lean_str over a sequence/array of leans; returns a NumPy string array
+    with exactly lean_str's output per element. None becomes none_str.
+    """
+    import numpy as np
+    if isinstance(leans, np.ndarray) and leans.dtype.kind == 'f':
+        values = leans.astype(float, copy=False)
+        none = None
+    else:
+        leans = list(leans)
+        none = np.array([v is None for v in leans], dtype=bool)
+        values = np.array([0.0 if v is None else v for v in leans], dtype=float)
+
+    if third_party:
+        # f"{x:.2%}" formats x * 100 with two decimals
+        scaled = values * 100
+        t = np.abs(scaled) * 100
+        pick = np.signbit(scaled)
+    else:
+        t = np.abs(values * 100) * 10
+        pick = values > 0
+    ok = np.isfinite(t) & (t < _LEAN_TABLE_LIMIT)
+    t = np.where(ok, t, 0.0)
+    # a product within 1e-9 of a .5 tie may round differently from the exact decimal
+    ok &= np.abs(t - np.floor(t) - 0.5) > 1e-9
+    n = np.rint(t).astype(np.int64)
+    table = _lean_table(third_party, int(n.max()) if n.size else 0)
+    out = table[2 * n + pick]
+    if not third_party:
+        out = np.where(values == 0, 'EVEN', out)
+
+    slow = np.flatnonzero(~ok)
+    if slow.size:
+        exact = [lean_str(v, third_party=third_party) for v in values[slow].tolist()]
+        out = out.astype(f"<U{max(out.dtype.itemsize // 4, max(map(len, exact)))}")
+        out[slow] = exact
+    if none is not None and none.any():
+        out = np.where(none, none_str, out)
+    return out
+
+
 def emoji_from_lean(
     lean,
     use_swing=False,
@@ -79,4 +147,61 @@ def final_margin_color_key(margin) -> str:
             return key
 
     # If no explicit threshold matched (e.g., margin between small negative and small positive)
-    return "BLUE"
\ No newline at end of file
+    return "BLUE"
+
+
+# Array versions of the two scans above: cutoffs are precomputed once and each value is
+# placed with np.searchsorted. side='right' counts cutoffs <= x, i.e. the first category
+# with x < cutoff (strict, like categorize_relative_margin); side='left' counts cutoffs
+# < m, i.e. the first key with m <= cutoff (like final_margin_color_key).
+_CUTOFF_ARRAYS = {}
+
+
+def _cutoffs(name, thresholds):
+    import numpy as np
+    cached = _CUTOFF_ARRAYS.get(name)
+    if cached is None or cached[0] != list(thresholds.items()):
+        cutoffs = np.array(list(thresholds.values()), dtype=float)
+        if np.any(np.diff(cutoffs) < 0):
+            raise ValueError(f"{name} cutoffs must be ascending for the array lookup")
+        cached = (list(thresholds.items()), cutoffs, np.array(list(thresholds.keys())))
+        _CUTOFF_ARRAYS[name] = cached
+    return cached[1], cached[2]
+
+
+def _to_float_array(values):
+    """(float array, missing mask) where None / unparseable values are missing."""
+    import numpy as np
+    if isinstance(values, np.ndarray) and values.dtype.kind in 'fiu':
+        return values.astype(float, copy=False), np.zeros(len(values), dtype=bool)
+    out = np.empty(len(values), dtype=float)
+    missing = np.zeros(len(values), dtype=bool)
+    for i, v in enumerate(values):
+        try:
+            out[i] = float(v)
+        except (ValueError, TypeError):
+            out[i] = 0.0
+            missing[i] = True
+    return out, missing
+
+
+def categorize_relative_margin_array(values):
+    """categorize_relative_margin for every value of an array (string array)."""
+    import numpy as np
+    thresholds = {cat: params.CATEGORY_THRESHOLDS[cat] for cat in params.CATEGORY_ORDER}
+    cutoffs, names = _cutoffs("CATEGORY_THRESHOLDS", thresholds)
+    x = np.asarray(values, dtype=float)
+    idx = np.searchsorted(cutoffs, x, side='right')
+    return names[np.minimum(idx, len(names) - 1)]
+
+
+def final_margin_color_key_array(margins):
+    """final_margin_color_key for every value of a sequence/array (string array)."""
+    import numpy as np
+    cutoffs, names = _cutoffs("FINAL_MARGIN_THRESHOLDS", params.FINAL_MARGIN_THRESHOLDS)
+    m, missing = _to_float_array(margins)
+    idx = np.searchsorted(cutoffs, m, side='left')
+    keys = np.append(names, "BLUE")[idx]
+    if missing.any():
+        keys = np.where(missing, "swing", keys)
+    return keys
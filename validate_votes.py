@@ -0,0 +1,245 @@
+"""Bulk validation of ingested vote data before the margins build.
+
+Runs every invariant as a vectorized pandas check over the whole dataset:
+
+- schema: required columns present, key columns non-empty
+- duplicate_keys: one row per (year, abbr)
+- nonnegative: no negative vote counts
+- total_covers_parties: total_votes >= D_votes + R_votes + T_votes
+- national_sums: per year, state rows (ME-AL/NE-AL, not the district rows) sum to the
+  NATIONAL row within a relative tolerance; any nonzero gap is a warning
+- ev_coverage: the states present each year are exactly the states with electoral
+  votes in election_data/electoral_college.csv
+- ev_totals: when the input has an electoral_votes column, per-state EVs (AL + district
+  rows) match electoral_college.csv
+
+The report is JSON-serializable; build_presidential_margins.py calls validate_or_exit()
+so a bad ingest stops the build before anything is written.
+
+Run:
+  python validate_votes.py [--input ...] [--report validation_report.json]
+"""
+import argparse
+import json
+import os
+import sys
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_INPUT = os.path.join(ROOT, "election_data", "wikipedia", "wikipedia_presidential_elections_combined.csv")
+DEFAULT_EC = os.path.join(ROOT, "election_data", "electoral_college.csv")
+
+VOTE_COLS = ["D_votes", "R_votes", "T_votes", "total_votes"]
+KEY_COLS = ["year", "abbr"]
+NATIONAL = "NATIONAL"
+# Wikipedia state rows vs the national row differ by design in a few years
+# (e.g. 1948 AL Thurmond votes counted as D, 1960 unpledged electors), so small gaps warn.
+NATIONAL_REL_TOL = 0.01
+MAX_EXAMPLES = 20
+
+
+@dataclass
+class CheckResult:
+    name: str
+    status: str = "ok"          # ok | warning | error
+    message: str = ""
+    failures: List[Dict] = field(default_factory=list)
+    failure_count: int = 0
+
+    def fail(self, status, message, rows: pd.DataFrame):
+        self.status = status
+        self.message = message
+        self.failure_count = len(rows)
+        self.failures = json.loads(rows.head(MAX_EXAMPLES).to_json(orient="records"))
+        return self
+
+
+def base_abbr(abbr: pd.Series) -> pd.Series:
+    """'ME-AL' / 'ME-01' -> 'ME'."""
+    return abbr.str.split("-", n=1).str[0]
+
+
+def check_schema(df) -> CheckResult:
+    res = CheckResult("schema")
+    missing = [c for c in KEY_COLS + VOTE_COLS if c not in df.columns]
+    if missing:
+        res.status = "error"
+        res.message = f"missing columns: {missing}"
+        return res
+    bad = df[df["year"].isna() | df["abbr"].isna() | (df["abbr"].astype(str).str.strip() == "")]
+    if len(bad):
+        return res.fail("error", f"{len(bad)} row(s) with empty year/abbr", bad[KEY_COLS])
+    return res
+
+
+def check_duplicate_keys(df) -> CheckResult:
+    res = CheckResult("duplicate_keys")
+    dup = df[df.duplicated(KEY_COLS, keep=False)]
+    if len(dup):
+        return res.fail("error", f"{len(dup)} row(s) share a (year, abbr) key", dup[KEY_COLS])
+    return res
+
+
+def check_nonnegative(df) -> CheckResult:
+    res = CheckResult("nonnegative")
+    bad = df[(df[VOTE_COLS] < 0).any(axis=1)]
+    if len(bad):
+        return res.fail("error", f"{len(bad)} row(s) with negative vote counts", bad[KEY_COLS + VOTE_COLS])
+    return res
+
+
+def check_total_covers_parties(df) -> CheckResult:
+    res = CheckResult("total_covers_parties")
+    parties = df["D_votes"] + df["R_votes"] + df["T_votes"]
+    bad = df.assign(party_sum=parties)[df["total_votes"] < parties]
+    if len(bad):
+        return res.fail("error", f"{len(bad)} row(s) with total_votes < D+R+T",
+                        bad[KEY_COLS + VOTE_COLS + ["party_sum"]])
+    return res
+
+
+def check_national_sums(df, rel_tol=NATIONAL_REL_TOL) -> CheckResult:
+    res = CheckResult("national_sums")
+    is_nat = df["abbr"] == NATIONAL
+    is_district = df["abbr"].str.contains("-") & ~df["abbr"].str.endswith("-AL")
+    national = df[is_nat].groupby("year")[VOTE_COLS].sum()
+    states = df[~is_nat & ~is_district].groupby("year")[VOTE_COLS].sum()
+    states = states.reindex(national.index, fill_value=0)
+
+    gap = states - national
+    # gaps are measured against the year's national total_votes
+    rel = gap.abs().max(axis=1) / national["total_votes"].where(national["total_votes"] != 0, 1)
+    off = gap[(gap != 0).any(axis=1)]
+    if off.empty:
+        res.message = f"{len(national)} year(s) checked"
+        return res
+    report = off.add_suffix("_gap").assign(max_rel_gap=rel[off.index]).reset_index()
+    errors = report[report["max_rel_gap"] > rel_tol]
+    if len(errors):
+        return res.fail("error", f"{len(errors)} year(s) where state rows miss NATIONAL by more than {rel_tol:.2%}", errors)
+    return res.fail("warning", f"{len(report)} year(s) with small state/NATIONAL gaps (<= {rel_tol:.2%})", report)
+
+
+def load_electoral_college(path=DEFAULT_EC) -> pd.DataFrame:
+    ec = pd.read_csv(path, usecols=["year", "abbr", "electoral_votes"])
+    ec["electoral_votes"] = pd.to_numeric(ec["electoral_votes"], errors="coerce").fillna(0).astype(int)
+    return ec[ec["electoral_votes"] > 0]
+
+
+def check_ev_coverage(df, ec) -> CheckResult:
+    res = CheckResult("ev_coverage")
+    years = df["year"].unique()
+    ec = ec[ec["year"].isin(years)]
+    present = pd.DataFrame({"year": df["year"], "abbr": base_abbr(df["abbr"])})
+    present = present[present["abbr"] != NATIONAL].drop_duplicates()
+    both = present.merge(ec[["year", "abbr"]], on=["year", "abbr"], how="outer", indicator=True)
+    bad = both[both["_merge"] != "both"].copy()
+    if len(bad):
+        bad["problem"] = np.where(bad["_merge"] == "left_only", "no electoral votes that year", "state missing from data")
+        return res.fail("error", f"{len(bad)} state-year(s) disagree with electoral_college.csv",
+                        bad[["year", "abbr", "problem"]].sort_values(["year", "abbr"]))
+    res.message = f"{len(present)} state-years match"
+    return res
+
+
+def check_ev_totals(df, ec) -> CheckResult:
+    res = CheckResult("ev_totals")
+    if "electoral_votes" not in df.columns:
+        res.message = "input has no electoral_votes column; skipped"
+        return res
+    units = df[df["abbr"] != NATIONAL]
+    got = units.assign(abbr=base_abbr(units["abbr"])).groupby(["year", "abbr"], as_index=False)["electoral_votes"].sum()
+    cmp = got.merge(ec, on=["year", "abbr"], how="inner", suffixes=("", "_expected"))
+    bad = cmp[cmp["electoral_votes"] != cmp["electoral_votes_expected"]]
+    if len(bad):
+        return res.fail("error", f"{len(bad)} state-year(s) with EVs different from electoral_college.csv", bad)
+    return res
+
+
+def validate(df: pd.DataFrame, ec: pd.DataFrame, rel_tol=NATIONAL_REL_TOL, fail_fast=False) -> Dict:
+    """Run every check; with fail_fast, stop after the first check that errors."""
+    checks = [
+        check_schema,
+        check_duplicate_keys,
+        check_nonnegative,
+        check_total_covers_parties,
+        lambda d: check_national_sums(d, rel_tol),
+        lambda d: check_ev_coverage(d, ec),
+        lambda d: check_ev_totals(d, ec),
+    ]
+    results = []
+    for check in checks:
+        res = check(df)
+        results.append(res)
+        if res.status == "error" and (fail_fast or res.name == "schema"):
+            break
+    return {
+        "rows": int(len(df)),
+        "years": int(df["year"].nunique()) if "year" in df.columns else 0,
+        "ok": all(r.status != "error" for r in results),
+        "errors": sum(r.status == "error" for r in results),
+        "warnings": sum(r.status == "warning" for r in results),
+        "checks": [asdict(r) for r in results],
+    }
+
+
+def read_votes(path=DEFAULT_INPUT) -> pd.DataFrame:
+    df = pd.read_csv(path, dtype={"abbr": str})
+    for c in VOTE_COLS + (["electoral_votes"] if "electoral_votes" in df.columns else []):
+        if c in df.columns:
+            df[c] = pd.to_numeric(df[c], errors="coerce").fillna(0).astype(np.int64)
+    return df
+
+
+def validate_file(path=DEFAULT_INPUT, ec_path=DEFAULT_EC, rel_tol=NATIONAL_REL_TOL, fail_fast=False) -> Dict:
+    report = validate(read_votes(path), load_electoral_college(ec_path), rel_tol=rel_tol, fail_fast=fail_fast)
+    report["input"] = str(path)
+    return report
+
+
+def format_report(report) -> str:
+    icon = {"ok": "✅", "warning": "⚠️ ", "error": "❌"}
+    lines = [f"Validated {report['rows']:,} rows over {report['years']} years: "
+             f"{report['errors']} error(s), {report['warnings']} warning(s)"]
+    for c in report["checks"]:
+        lines.append(f"  {icon[c['status']]} {c['name']}: {c['message'] or 'ok'}")
+    return "\n".join(lines)
+
+
+def validate_or_exit(path=DEFAULT_INPUT, ec_path=DEFAULT_EC, report_path=None):
+    """Validate and exit(1) on any error; used as the pre-build gate."""
+    report = validate_file(path, ec_path, fail_fast=True)
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if not report["ok"]:
+        print(format_report(report))
+        sys.exit(1)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate ingested presidential vote data")
+    parser.add_argument("--input", default=DEFAULT_INPUT, help="Combined votes CSV (year,abbr,D_votes,R_votes,T_votes,total_votes)")
+    parser.add_argument("--ec", default=DEFAULT_EC, help="electoral_college.csv")
+    parser.add_argument("--rel-tol", type=float, default=NATIONAL_REL_TOL, help="Relative tolerance for state vs NATIONAL sums")
+    parser.add_argument("--fail-fast", action="store_true", help="Stop at the first failing check")
+    parser.add_argument("--report", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    report = validate_file(args.input, args.ec, rel_tol=args.rel_tol, fail_fast=args.fail_fast)
+    print(format_report(report))
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.report}")
+    sys.exit(0 if report["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()